@@ -42,23 +42,12 @@ class Economy(commands.Cog):
             return
         self._wallets_checked = True
 
-        total_created = 0
-        for guild in self.bot.guilds:
-            for member in guild.members:
-                if not member.bot:
-                    if await self.ensure_wallet_exists(member.id):
-                        total_created += 1
+        # One batched insert; new joins are handled by the onboarding queue.
+        member_ids = {m.id for guild in self.bot.guilds for m in guild.members if not m.bot}
+        total_created = await self.bot.onboarding.create_wallets(member_ids)
 
         logger.debug(f"Completed wallet checks. Created {total_created} new wallets.")
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        """Create wallet for new members on join."""
-        if member.bot:
-            return
-        if await self.ensure_wallet_exists(member.id):
-            logger.info(f"[Economy] Created wallet for new member {member.id} ({member.display_name}).")
-
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
         """
@@ -32,13 +32,11 @@ class EventsCog(commands.Cog):
 
     async def is_owner(self, user_id: int, sub_id: int) -> bool:
         """Check if a user is an owner of a sub."""
-        row = await self.bot.db.fetchrow("SELECT 1 FROM sub_ownership WHERE sub_id=$1 AND user_id=$2;", sub_id, user_id)
-        return row is not None
+        return self.bot.ownership_graph.is_owner(user_id, sub_id)
 
     async def get_sub_owners(self, sub_id: int):
         """Get all owners of a sub (user_ids)."""
-        rows = await self.bot.db.fetch("SELECT user_id FROM sub_ownership WHERE sub_id=$1;", sub_id)
-        return [r["user_id"] for r in rows]
+        return self.bot.ownership_graph.owner_ids(sub_id)
 
     async def get_event(self, event_id: int):
         """Retrieve an event by its ID."""
@@ -309,10 +309,11 @@ class ModerationCog(commands.Cog):
         member: Option(discord.Member, "(Optional) User's roles to clear - leave blank to clear all user's roles.", required=False)
     ):
         logger.debug("Clearing roles...")
-        owner_role = discord.utils.get(ctx.guild.roles, name="Owner")  # Adjust role name as needed
-        boss_role = discord.utils.get(ctx.guild.roles, name="Boss")  # Adjust role name as needed
-        underboss_role = discord.utils.get(ctx.guild.roles, name="Underboss")  # Adjust role name as needed
-        consigliere_role = discord.utils.get(ctx.guild.roles, name="Consigliere")  # Adjust role name as needed
+        role_index = self.bot.role_index
+        owner_role = role_index.get(ctx.guild, "Owner")  # Adjust role name as needed
+        boss_role = role_index.get(ctx.guild, "Boss")  # Adjust role name as needed
+        underboss_role = role_index.get(ctx.guild, "Underboss")  # Adjust role name as needed
+        consigliere_role = role_index.get(ctx.guild, "Consigliere")  # Adjust role name as needed
         
         safe_roles = [boss_role, underboss_role, consigliere_role, owner_role]
         
@@ -333,10 +334,21 @@ class ModerationCog(commands.Cog):
             roles_to_remove = [role for role in target_member.roles if role != ctx.guild.default_role and role not in safe_roles]
             logger.debug(f"For user: {target_member.display_name} - Attempting to remove roles: {roles_to_remove}")
             await target_member.remove_roles(*roles_to_remove, reason="Clear all roles command used.")
+            cleared.append(target_member.id)
 
+        async def mark_cleared():
+            # Keep the daily role reconciliation from restoring the roles that were just removed.
+            if cleared:
+                await self.bot.db.execute(
+                    "UPDATE user_roles SET roles_cleared_at = NOW() WHERE user_id = ANY($1::bigint[]);",
+                    cleared
+                )
+
+        cleared = []
         if member:
             try:
                 await remove_roles(member)
+                await mark_cleared()
                 await ctx.respond(f"All roles (except Boss) have been cleared for {member.mention}.", ephemeral=True, delete_after=60)
             except discord.HTTPException as e:
                 await ctx.respond(f"Failed to clear roles for {member.mention}. Error: {e}", ephemeral=True)
@@ -348,6 +360,40 @@ class ModerationCog(commands.Cog):
                 await ctx.respond("All roles (except Boss) have been cleared for all members.", ephemeral=True, delete_after=60)
             except discord.HTTPException as e:
                 await ctx.respond(f"Failed to clear roles for all members. Error: {e}", ephemeral=True)
+            finally:
+                await mark_cleared()
+
+    @moderation_group.command(name="raid_mode", description="Pause or resume non-essential onboarding work during a join raid.")
+    @commands.has_any_role("Boss", "Underboss", "Consigliere")
+    async def raid_mode(
+        self,
+        ctx: discord.ApplicationContext,
+        enabled: Option(bool, "Turn raid mode on or off")
+    ):
+        self.bot.onboarding.set_raid_mode(enabled, reason=f"set by {ctx.author} ({ctx.author.id})")
+        await ctx.respond(f"Raid mode is now **{'on' if enabled else 'off'}**.", ephemeral=True, delete_after=60)
+
+    @moderation_group.command(name="onboarding_status", description="Show join rate and onboarding queue depth.")
+    @commands.has_any_role("Boss", "Underboss", "Consigliere")
+    async def onboarding_status(self, ctx: discord.ApplicationContext):
+        onboarding = self.bot.onboarding
+        embed = discord.Embed(
+            title="Onboarding",
+            color=discord.Color.red() if onboarding.raid_mode else discord.Color.green()
+        )
+        embed.add_field(name="Raid mode", value="On" if onboarding.raid_mode else "Off", inline=True)
+        embed.add_field(name="Joins (last minute)", value=f"{onboarding.join_rate} / {onboarding.raid_threshold}", inline=True)
+        embed.add_field(name="Role queue", value=str(onboarding.queue_depth), inline=True)
+        embed.add_field(name="Pending wallets", value=str(len(onboarding.pending_wallets)), inline=True)
+        embed.add_field(
+            name="Since startup",
+            value=(
+                f"{onboarding.total_joins} joins, {onboarding.roles_applied} roles applied, "
+                f"{onboarding.wallets_created} wallets created"
+            ),
+            inline=False
+        )
+        await ctx.respond(embed=embed, ephemeral=True)
 
 def setup(bot: "MoguMoguBot"):
     bot.add_cog(ModerationCog(bot))
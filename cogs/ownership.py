@@ -3,7 +3,7 @@ import datetime
 from discord.ext import commands, tasks
 from discord.commands import SlashCommandGroup, Option
 from loguru import logger
-from typing import Optional, Tuple, TYPE_CHECKING, Union
+from typing import Dict, Optional, Tuple, TYPE_CHECKING, Union
 import asyncio
 import time
 import hashlib
@@ -18,13 +18,100 @@ from ownership_views import (
     PartialClaimModal,
     DirectClaimModal,
     TransactModal,
-    AskForDMApprovalView
+    AskForDMApprovalView,
+    build_user_browser_embed
 )
 
 if TYPE_CHECKING:
     from main import MoguMoguBot
 
 
+# Approves a claim, rewrites the sub's ownership and auto-rejects its other open claims.
+# Returns the sub's owner rows (kind 'owner') and the rejected claims (kind 'rejected').
+FINALIZE_CLAIM_SQL = """
+WITH claim AS (
+    SELECT id, sub_id, owner_id, majority_owner_id,
+           COALESCE(requested_percentage, 100) AS pct,
+           (majority_owner_id IS NOT NULL
+            AND majority_owner_id <> owner_id
+            AND requested_percentage > 0
+            AND requested_percentage < 100) AS partial
+      FROM claims
+     WHERE id = $1
+       AND status IN ('pending', 'countered')
+       FOR UPDATE
+),
+current_owners AS (
+    SELECT o.user_id, o.percentage, o.acquired_at
+      FROM sub_ownership o
+      JOIN claim c ON o.sub_id = c.sub_id
+       FOR UPDATE OF o
+),
+approved AS (
+    UPDATE claims
+       SET status = 'approved'
+      FROM claim c
+     WHERE claims.id = c.id
+    RETURNING claims.id
+),
+rejected AS (
+    UPDATE claims r
+       SET status = 'auto_rejected',
+           rejection_reason = 'Another claim was accepted first'
+      FROM claim c
+     WHERE r.sub_id = c.sub_id
+       AND r.id <> c.id
+       AND r.status IN ('pending', 'countered')
+    RETURNING r.id, r.sub_id, r.owner_id, r.justification
+),
+decremented AS (
+    UPDATE sub_ownership o
+       SET percentage = o.percentage - c.pct
+      FROM claim c
+     WHERE c.partial
+       AND o.sub_id = c.sub_id
+       AND o.user_id = c.majority_owner_id
+    RETURNING o.user_id, o.percentage, o.acquired_at
+),
+removed AS (
+    DELETE FROM sub_ownership o
+     USING claim c
+     WHERE NOT c.partial
+       AND o.sub_id = c.sub_id
+       AND o.user_id <> c.owner_id
+    RETURNING o.user_id
+),
+granted AS (
+    INSERT INTO sub_ownership (sub_id, user_id, percentage)
+    SELECT c.sub_id, c.owner_id, CASE WHEN c.partial THEN c.pct ELSE 100 END
+      FROM claim c
+    ON CONFLICT (sub_id, user_id) DO UPDATE
+       SET percentage = CASE WHEN (SELECT partial FROM claim)
+                             THEN sub_ownership.percentage + EXCLUDED.percentage
+                             ELSE 100 END,
+           acquired_at = CASE WHEN (SELECT partial FROM claim)
+                              THEN sub_ownership.acquired_at
+                              ELSE NOW() END
+    RETURNING user_id, percentage, acquired_at
+)
+SELECT 'owner' AS kind, user_id, percentage, acquired_at,
+       NULL::int AS id, NULL::bigint AS sub_id, NULL::bigint AS owner_id, NULL::text AS justification
+  FROM granted
+UNION ALL
+SELECT 'owner', user_id, percentage, acquired_at, NULL, NULL, NULL, NULL
+  FROM decremented
+UNION ALL
+SELECT 'owner', co.user_id, co.percentage, co.acquired_at, NULL, NULL, NULL, NULL
+  FROM current_owners co, claim c
+ WHERE c.partial
+   AND co.user_id <> c.owner_id
+   AND co.user_id <> c.majority_owner_id
+UNION ALL
+SELECT 'rejected', NULL, NULL, NULL, id, sub_id, owner_id, justification
+  FROM rejected;
+"""
+
+
 class OwnershipCog(commands.Cog):
     """
     Main logic and commands for the Ownership system.
@@ -64,9 +151,29 @@ class OwnershipCog(commands.Cog):
         self.mag_react_cooldowns = {}  # In-memory reaction cooldowns (resets on bot restart)
         self.dm_request_cooldowns = {}  # In-memory DM request cooldowns
 
+        # Prebuilt `/ownership info` embeds keyed by sub_id. Entries are dropped whenever
+        # the ownership graph changes for the sub or a `sub_info_changed` event is dispatched.
+        self.sub_info_cache: Dict[int, discord.Embed] = {}
+        # Bumped on every invalidation so a build that raced with one isn't cached.
+        self.sub_info_generations: Dict[int, int] = {}
+        self.sub_info_epoch = 0
+        self.sub_info_hits = 0
+        self.sub_info_misses = 0
+        self.bot.ownership_graph.add_listener(self.invalidate_sub_info)
+
+        # Mirror of unexpired `user_cooldowns` rows (user_id -> until). Loaded once, then
+        # updated by every cooldown write, so claim checks never need a DB round trip.
+        self.user_cooldowns: Dict[int, datetime.datetime] = {}
+        self._cooldowns_loaded = False
+        self._cooldowns_lock = asyncio.Lock()
+
         # Start tasks
         self.expiry_loop.start()
 
+    def cog_unload(self):
+        self.expiry_loop.cancel()
+        self.bot.ownership_graph.remove_listener(self.invalidate_sub_info)
+
     # ------------------------------------------------------------------
     # on_ready reattachment of legacy and DM-based views
     # ------------------------------------------------------------------
@@ -82,6 +189,8 @@ class OwnershipCog(commands.Cog):
             return
         self._reattached = True
 
+        await self.load_user_cooldowns()
+
         # === Reattach legacy claim views (staff/sub) ===
         pending_claims = await self.bot.db.fetch(
             "SELECT id, staff_msg_id, sub_msg_id FROM claims WHERE status='pending';"
@@ -187,78 +296,15 @@ class OwnershipCog(commands.Cog):
 
         target_user = message.author
 
-        # Query details for the user browser.
-        query = """
-        SELECT 
-            w.balance AS wallet_balance,
-            u.age_range,
-            u.gender_role,
-            u.relationship,
-            u.location,
-            u.orientation,
-            u.dm_status,
-            array_to_string(u.here_for, ', ') AS here_for,
-            array_to_string(u.kinks, ', ') AS kinks,
-            CASE 
-                WHEN dm_perms.user2_id IS NOT NULL THEN 'Yes'
-                ELSE 'No'
-            END AS has_dm_permission,
-            array_agg(o.user_id) AS owners
-        FROM wallets w
-        LEFT JOIN user_roles u ON w.user_id = u.user_id
-        LEFT JOIN open_dm_perms dm_perms 
-            ON (dm_perms.user1_id = $1 AND dm_perms.user2_id = $2)
-            OR (dm_perms.user1_id = $2 AND dm_perms.user2_id = $1)
-        LEFT JOIN sub_ownership o ON o.sub_id = w.user_id
-        WHERE w.user_id = $2
-        GROUP BY w.user_id, u.user_id, dm_perms.user2_id;
-        """
-
-        record = await self.bot.db.fetchrow(query, member.id, target_user.id)
-        if not record:
+        embed = await build_user_browser_embed(self.bot, guild, member.id, target_user)
+        if embed is None:
             return
 
-        # Convert owner IDs into display names.
-        owners_list = record["owners"] or []
-        owner_names = []
-        for owner_id in owners_list:
-            owner_member = guild.get_member(owner_id)
-            if owner_member:
-                owner_names.append(owner_member.display_name)
-            else:
-                owner_names.append(str(owner_id))
-        owners_str = ", ".join(owner_names) if owner_names else "None"
-
-        wallet_balance = record["wallet_balance"] or 0
-        dm_status = record["dm_status"] or "Unknown"
-        has_dm_permission = record["has_dm_permission"] or "No"
-
-        details_value = (
-            f"**Age:** *{record['age_range'] or 'Unknown'}*\n"
-            f"**Gender:** *{record['gender_role'] or 'Unknown'}*\n"
-            f"**Relationship:** *{record['relationship'] or 'Unknown'}*\n"
-            f"**Location:** *{record['location'] or 'Unknown'}*\n"
-            f"**Orientation:** *{record['orientation'] or 'Unknown'}*\n"
-            f"**Here For:** *{record['here_for'] or 'Unknown'}*\n"
-            f"**Kinks:** *{record['kinks'] or 'Unknown'}*\n"
-        )
-
         try:
             dm = await member.create_dm()
         except discord.Forbidden:
             return
 
-        embed = discord.Embed(
-            title=f"User Browser: {target_user.display_name}",
-            color=discord.Color.gold()
-        )
-        embed.add_field(name="Details", value=details_value, inline=False)
-        embed.add_field(name="DMs", value=f"```{dm_status}```", inline=True)
-        embed.add_field(name="DMs with you?", value=f"```{has_dm_permission}```", inline=True)
-        embed.add_field(name="Owner(s)", value=f"```{owners_str}```", inline=False)
-        embed.add_field(name="Wallet Balance", value=f"```${wallet_balance}```", inline=True)
-        embed.set_thumbnail(url=target_user.display_avatar)
-
         # Create a SingleUserOwnershipView with a 10-minute lifetime.
         view = SingleUserOwnershipView(bot=self.bot, target_user=target_user, viewer_user=member, timeout=600)
         dm_msg = await dm.send(embed=embed, view=view)
@@ -366,15 +412,7 @@ class OwnershipCog(commands.Cog):
                 ephemeral=True
             )
 
-        open_dm = await self.bot.db.fetchrow(
-            """
-            SELECT 1 FROM open_dm_perms
-            WHERE (user1_id=$1 AND user2_id=$2) OR (user1_id=$2 AND user2_id=$1)
-              AND active=TRUE;
-            """,
-            owner.id, sub.id
-        )
-        if not open_dm:
+        if not self.bot.dm_permissions.is_open(owner.id, sub.id):
             return await respond.send_message(
                 f"You do not have permission to DM {sub.mention}. Complete the 'Ask to DM' process first.",
                 ephemeral=True
@@ -528,7 +566,7 @@ class OwnershipCog(commands.Cog):
         Displays detailed information about a sub's ownership status.
         """
         await ctx.defer(ephemeral=True)
-        embed = await self.build_sub_info_embed(sub_id)
+        embed = await self.get_sub_info_embed(sub_id)
         await ctx.followup.send(embed=embed, ephemeral=True)
 
     @ownership_group.command(
@@ -777,32 +815,13 @@ class OwnershipCog(commands.Cog):
         """
         Adds or reactivates an open DM permission pair between two users.
         """
-        umin, umax = min(user1_id, user2_id), max(user1_id, user2_id)
-        await self.bot.db.execute(
-            """
-            INSERT INTO open_dm_perms (user1_id, user2_id, opened_at, active, reason)
-            VALUES($1, $2, NOW(), TRUE, $3)
-            ON CONFLICT (user1_id, user2_id)
-            DO UPDATE SET active=TRUE, opened_at=NOW(), reason=$3, closed_at=NULL
-            """,
-            umin, umax, reason
-        )
+        await self.bot.dm_permissions.open_pair(user1_id, user2_id, reason)
 
     async def close_dm_pair(self, user1_id: int, user2_id: int, reason: str):
         """
         Closes an open DM permission pair.
         """
-        umin, umax = min(user1_id, user2_id), max(user1_id, user2_id)
-        await self.bot.db.execute(
-            """
-            UPDATE open_dm_perms
-            SET active=FALSE,
-                closed_at=NOW(),
-                reason=$3
-            WHERE user1_id=$1 AND user2_id=$2 AND active=TRUE
-            """,
-            umin, umax, reason
-        )
+        await self.bot.dm_permissions.close_pair(user1_id, user2_id, reason)
 
     async def toggle_dm_permissions(
         self,
@@ -823,14 +842,7 @@ class OwnershipCog(commands.Cog):
           - message_for_user: a string you can show in an ephemeral response
         """
         # 1) Check if currently open
-        row = await self.bot.db.fetchrow(
-            """
-            SELECT active FROM open_dm_perms
-             WHERE (user1_id=$1 AND user2_id=$2) OR (user1_id=$2 AND user2_id=$1)
-            """,
-            invoker.id, target.id
-        )
-        currently_open = bool(row and row["active"])
+        currently_open = self.bot.dm_permissions.is_open(invoker.id, target.id)
 
         # 2) If currently open, we will close it:
         if currently_open:
@@ -850,8 +862,8 @@ class OwnershipCog(commands.Cog):
         # For simplicity, you can:
         #  - Return right away if handle_dm_request() triggers an approval flow. 
         #  - If the target's DMs are truly open, handle_dm_request() calls add_open_dm_pair() and
-        #    returns an ephemeral "You now have permission..." message. We'll detect that with a
-        #    DB check after handle_dm_request is done.
+        #    returns an ephemeral "You now have permission..." message. We'll detect that by
+        #    re-checking the DM permission index after handle_dm_request is done.
 
         await self.handle_dm_request(
             requestor=invoker,
@@ -859,14 +871,7 @@ class OwnershipCog(commands.Cog):
             interaction=interaction
         )
         # Now re-check if the pair is open after handle_dm_request.
-        row2 = await self.bot.db.fetchrow(
-            """
-            SELECT active FROM open_dm_perms
-             WHERE (user1_id=$1 AND user2_id=$2) OR (user1_id=$2 AND user2_id=$1)
-            """,
-            invoker.id, target.id
-        )
-        new_open = bool(row2 and row2["active"])
+        new_open = self.bot.dm_permissions.is_open(invoker.id, target.id)
         if new_open:
             return (True, True, f"You now have **open** DMs with {target.display_name}.")
         else:
@@ -891,14 +896,24 @@ class OwnershipCog(commands.Cog):
         claim = await self.bot.db.fetchrow("SELECT * FROM claims WHERE id=$1;", claim_id)
         if not claim:
             return
+        await self.send_claim_status(claim, new_status, reason, staff_user)
 
-        sub_id = claim["sub_id"]
-        owner_id = claim["owner_id"]
-        sub_user = self.bot.get_user(sub_id)
-        owner_user = self.bot.get_user(owner_id)
+    async def send_claim_status(
+        self,
+        claim,
+        new_status: str,
+        reason: str = "",
+        staff_user: Optional[discord.Member] = None
+    ):
+        """
+        DMs the sub and the owner of an already-loaded claim record (anything with
+        id, sub_id, owner_id and justification). Both DMs are sent concurrently.
+        """
+        sub_user = self.bot.get_user(claim["sub_id"])
+        owner_user = self.bot.get_user(claim["owner_id"])
 
         embed = discord.Embed(
-            title=f"Ownership Claim #{claim_id} Update",
+            title=f"Ownership Claim #{claim['id']} Update",
             description=f"**Status:** {new_status}",
             color=discord.Color.orange()
         )
@@ -914,19 +929,14 @@ class OwnershipCog(commands.Cog):
                 inline=False
             )
 
-        if sub_user:
+        async def dm(user: discord.User):
             try:
-                dm_ch = await sub_user.create_dm()
+                dm_ch = await user.create_dm()
                 await dm_ch.send(embed=embed)
             except discord.Forbidden:
                 pass
 
-        if owner_user:
-            try:
-                dm_ch = await owner_user.create_dm()
-                await dm_ch.send(embed=embed)
-            except discord.Forbidden:
-                pass
+        await asyncio.gather(*(dm(u) for u in (sub_user, owner_user) if u))
 
     # ------------------------------------------------------------------
     # Finalize Claim / Staff Approval Logic
@@ -934,16 +944,19 @@ class OwnershipCog(commands.Cog):
     async def finalize_claim(self, claim_id: int, forced_by_staff: bool=False):
         """
         Finalizes a claim by updating ownership records and marking the claim as approved.
-        Ensures that the operation is atomic and revalidates that the new owner still has the correct role.
+
+        Everything is applied by a single statement, after all of the sub's claims are locked
+        in id order; if two approvals on the sub race, the second one blocks on that lock, then
+        sees its claim is no longer pending and changes nothing. Parallel claims on the same sub are
+        rejected in the same statement and their owners are notified concurrently afterwards.
         """
         claim = await self.bot.db.fetchrow("SELECT * FROM claims WHERE id=$1;", claim_id)
-        if not claim or claim["status"] in ("approved", "denied", "expired", "auto_rejected"):
+        if not claim or claim["status"] not in ("pending", "countered"):
             return
 
         sub_id = claim["sub_id"]
         new_owner_id = claim["owner_id"]
-        majority_id = claim.get("majority_owner_id")
-        final_pct = claim.get("requested_percentage", 100)
+        final_pct = claim["requested_percentage"] or 100
 
         # Revalidate that the new owner exists in the guild and has the owner role.
         guild = self.bot.get_guild(self.bot.config["guild_id"])
@@ -952,119 +965,61 @@ class OwnershipCog(commands.Cog):
             logger.error(f"Finalization aborted: Owner {new_owner_id} not valid or missing required role.")
             return
 
-        if majority_id and 0 < final_pct < 100:
-            await self.bot.db.execute(
-                """
-                UPDATE sub_ownership
-                SET percentage=percentage-$1
-                WHERE sub_id=$2 AND user_id=$3
-                """,
-                final_pct, sub_id, majority_id
-            )
-            row = await self.bot.db.fetchrow(
-                "SELECT 1 FROM sub_ownership WHERE sub_id=$1 AND user_id=$2;",
-                sub_id, new_owner_id
-            )
-            if row:
-                await self.bot.db.execute(
-                    """
-                    UPDATE sub_ownership
-                    SET percentage=percentage+$1
-                    WHERE sub_id=$2 AND user_id=$3
-                    """,
-                    final_pct, sub_id, new_owner_id
+        # A partial claim moves requested_percentage from the majority owner to the new owner;
+        # anything else makes the new owner the sole 100% owner.
+        async with self.bot.db.pool.acquire() as conn:
+            async with conn.transaction():
+                # Lock every claim on the sub in a fixed order first, so concurrent approvals
+                # on the same sub queue up here instead of deadlocking in the statement below.
+                await conn.execute(
+                    "SELECT id FROM claims WHERE sub_id=$1 ORDER BY id FOR UPDATE;", sub_id
                 )
-            else:
-                await self.bot.db.execute(
-                    """
-                    INSERT INTO sub_ownership(sub_id, user_id, percentage)
-                    VALUES($1,$2,$3)
-                    """,
-                    sub_id, new_owner_id, final_pct
-                )
-        else:
-            await self.bot.db.execute("DELETE FROM sub_ownership WHERE sub_id=$1;", sub_id)
-            await self.bot.db.execute(
-                "INSERT INTO sub_ownership(sub_id,user_id,percentage) VALUES($1,$2,100);",
-                sub_id, new_owner_id
-            )
+                rows = await conn.fetch(FINALIZE_CLAIM_SQL, claim_id)
+        if not rows:
+            # Another approval finalized (or closed) this claim first.
+            logger.info(f"Claim {claim_id} was no longer pending at finalization; skipped.")
+            return
 
-        await self.bot.db.execute(
-            "UPDATE claims SET status='approved' WHERE id=$1;",
-            claim_id
-        )
-        await self.auto_reject_parallel(sub_id, claim_id)
+        self.bot.ownership_graph.replace_sub(sub_id, [r for r in rows if r["kind"] == "owner"])
+        rejected = [r for r in rows if r["kind"] == "rejected"]
 
-        if not claim.get("cooldown_exempt"):
+        if not claim["cooldown_exempt"]:
             await self.apply_success_cooldowns(sub_id, new_owner_id)
 
-        logger.info(f"Claim {claim_id} -> Approved. sub={sub_id}, new_owner={new_owner_id}, share={final_pct}")
-
-        status_reason = "Claim approved (staff & sub)." if forced_by_staff else "Claim fully approved."
-        await self.notify_claim_status(
-            claim_id,
-            new_status="Approved",
-            reason=status_reason
+        logger.info(
+            f"Claim {claim_id} -> Approved. sub={sub_id}, new_owner={new_owner_id}, share={final_pct}, "
+            f"auto_rejected={len(rejected)}"
         )
 
-    async def auto_reject_parallel(self, sub_id: int, accepted_claim_id: int):
-        """
-        Automatically rejects all other pending claims on a sub when one claim is accepted.
-        """
-        rows = await self.bot.db.fetch(
-            """
-            SELECT id FROM claims
-            WHERE sub_id=$1
-              AND id<>$2
-              AND status IN('pending','countered')
-            """,
-            sub_id, accepted_claim_id
+        status_reason = "Claim approved (staff & sub)." if forced_by_staff else "Claim fully approved."
+        results = await asyncio.gather(
+            self.notify_claim_status(claim_id, new_status="Approved", reason=status_reason),
+            *(
+                self.send_claim_status(r, new_status="Auto-Rejected", reason="Another claim was accepted first.")
+                for r in rejected
+            ),
+            return_exceptions=True
         )
-        for r in rows:
-            c2 = r["id"]
-            await self.bot.db.execute(
-                """
-                UPDATE claims
-                SET status='auto_rejected',
-                    rejection_reason='Another claim was accepted first'
-                WHERE id=$1
-                """,
-                c2
-            )
-            await self.notify_claim_status(
-                c2,
-                new_status="Auto-Rejected",
-                reason="Another claim was accepted first."
-            )
+        notified = [claim_id, *(r["id"] for r in rejected)]
+        for notified_id, result in zip(notified, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    f"Failed to send the status notice for claim {notified_id} "
+                    f"(finalized claim {claim_id}): {result!r}"
+                )
 
     async def staff_approve_claim(self, claim_id: int, staff_id: int):
         """
         Records a staff approval for a claim and finalizes it if the conditions are met.
         """
-        row = await self.bot.db.fetchrow(
-            "SELECT 1 FROM claims_staff_approvals WHERE claim_id=$1 AND staff_id=$2;",
-            claim_id, staff_id
+        result = await self.bot.db.record_approval(
+            "claims_staff_approvals", "claims", "claim_id",
+            claim_id, staff_id, threshold=2, returning=("status", "sub_approved")
         )
-        if row:
+        if not result.recorded or result.row["status"] not in ("pending", "countered"):
             return
 
-        await self.bot.db.execute(
-            "INSERT INTO claims_staff_approvals (claim_id, staff_id) VALUES ($1,$2);",
-            claim_id, staff_id
-        )
-        await self.bot.db.execute(
-            "UPDATE claims SET staff_approvals=staff_approvals+1 WHERE id=$1;",
-            claim_id
-        )
-
-        claim = await self.bot.db.fetchrow("SELECT * FROM claims WHERE id=$1;", claim_id)
-        if not claim or claim["status"] not in ("pending", "countered"):
-            return
-
-        staff_count = claim["staff_approvals"]
-        sub_approved = claim["sub_approved"]
-        if staff_count >= 2 and sub_approved:
-            staff_user = self.bot.get_user(staff_id)
+        if result.count >= 2 and result.row["sub_approved"]:
             await self.finalize_claim(claim_id, forced_by_staff=True)
 
     async def staff_deny_claim(self, claim_id: int, staff_id: int):
@@ -1157,102 +1112,90 @@ class OwnershipCog(commands.Cog):
         In case of equal percentages (e.g. 50%/50%), the owner with the earlier acquisition
         (based on the acquired_at timestamp) is chosen.
         """
-        row = await self.bot.db.fetchrow(
-            """
-            SELECT user_id, percentage
-            FROM sub_ownership
-            WHERE sub_id=$1::bigint
-            ORDER BY percentage DESC, acquired_at ASC
-            LIMIT 1
-            """,
-            sub_id
-        )
-        if not row or row["percentage"] < 50:
-            return (None, 0)
-        return (row["user_id"], row["percentage"])
+        return self.bot.ownership_graph.majority_owner(sub_id)
 
     async def check_has_majority_owner(self, user_id: int) -> bool:
         """
         Checks if a sub already has a majority owner (>= 50%).
         """
-        row2 = await self.bot.db.fetchrow(
-            """
-            SELECT 1
-            FROM sub_ownership
-            WHERE sub_id=$1::bigint
-              AND percentage>=50
-            """,
-            user_id
-        )
-        return bool(row2)
+        return self.bot.ownership_graph.has_majority_owner(user_id)
 
     # ------------------------------------------------------------------
     # Cooldown Functions
     # ------------------------------------------------------------------
+    async def load_user_cooldowns(self):
+        """
+        Load every unexpired cooldown into memory. Safe to call more than once;
+        concurrent callers wait for the first load instead of repeating it.
+        """
+        async with self._cooldowns_lock:
+            if self._cooldowns_loaded:
+                return
+            rows = await self.bot.db.fetch(
+                """
+                SELECT user_id, global_cooldown_until
+                FROM user_cooldowns
+                WHERE global_cooldown_until > $1
+                """,
+                datetime.datetime.utcnow()
+            )
+            self.user_cooldowns = {r["user_id"]: r["global_cooldown_until"] for r in rows}
+            self._cooldowns_loaded = True
+            logger.info(f"Loaded {len(self.user_cooldowns)} active ownership cooldowns.")
+
     async def user_on_cooldown(self, user_id: int) -> bool:
         """
         Checks if a user is currently on global cooldown.
         """
-        row = await self.bot.db.fetchrow(
-            """
-            SELECT global_cooldown_until
-            FROM user_cooldowns
-            WHERE user_id=$1
-            """,
-            user_id
-        )
-        if not row or not row["global_cooldown_until"]:
-            return False
-        if row["global_cooldown_until"] <= datetime.datetime.utcnow():
-            return False
-        return True
+        return await self.get_user_cooldown(user_id) is not None
 
     async def get_user_cooldown(self, user_id: int) -> Optional[datetime.datetime]:
         """
-        Retrieves the cooldown expiration for a user.
+        Retrieves the cooldown expiration for a user, or None if they are not on cooldown.
+        Served from memory; expired entries are pruned as they are seen.
         """
-        row = await self.bot.db.fetchrow(
-            """
-            SELECT global_cooldown_until
-            FROM user_cooldowns
-            WHERE user_id=$1
-            """,
-            user_id
-        )
-        if not row:
+        if not self._cooldowns_loaded:
+            await self.load_user_cooldowns()
+        until = self.user_cooldowns.get(user_id)
+        if until is None:
+            return None
+        if until <= datetime.datetime.utcnow():
+            del self.user_cooldowns[user_id]
             return None
-        return row["global_cooldown_until"]
+        return until
 
     async def set_user_cooldown(self, user_id: int, until: datetime.datetime):
         """
         Sets a global cooldown for a user until the specified datetime.
         """
+        await self.set_user_cooldowns([user_id], until)
+
+    async def set_user_cooldowns(self, user_ids, until: datetime.datetime):
+        """
+        Sets the same global cooldown for several users with a single upsert.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return
         await self.bot.db.execute(
             """
             INSERT INTO user_cooldowns(user_id, global_cooldown_until)
-            VALUES($1, $2)
+            SELECT uid, $2 FROM unnest($1::bigint[]) AS uid
             ON CONFLICT(user_id) DO UPDATE
             SET global_cooldown_until=EXCLUDED.global_cooldown_until
             """,
-            user_id, until
+            user_ids, until
         )
+        for uid in user_ids:
+            self.user_cooldowns[uid] = until
 
     async def apply_success_cooldowns(self, sub_id: int, new_owner_id: int):
         """
         Applies a cooldown to the sub, the new owner, and all associated owners after a successful claim.
         """
         until = datetime.datetime.utcnow() + datetime.timedelta(days=self.cooldown_days)
-        await self.set_user_cooldown(sub_id, until)
-        await self.set_user_cooldown(new_owner_id, until)
-        owners = await self.bot.db.fetch(
-            """
-            SELECT user_id FROM sub_ownership
-            WHERE sub_id=$1
-            """,
-            sub_id
-        )
-        for o in owners:
-            await self.set_user_cooldown(o["user_id"], until)
+        owners = self.bot.ownership_graph.owner_ids(sub_id)
+        await self.set_user_cooldowns([sub_id, new_owner_id, *owners], until)
 
     async def apply_rejected_cooldown(self, user_id: int):
         """
@@ -1325,22 +1268,69 @@ class OwnershipCog(commands.Cog):
         embed.set_footer(text="Think carefully before consenting!")
         return embed
 
+    # ------------------------------------------------------------------
+    # Sub info card cache
+    # ------------------------------------------------------------------
+    @property
+    def sub_info_hit_ratio(self) -> float:
+        total = self.sub_info_hits + self.sub_info_misses
+        return self.sub_info_hits / total if total else 0.0
+
+    def invalidate_sub_info(self, sub_id: Optional[int]):
+        """
+        Drop the cached info embed for a sub (or every sub when sub_id is None).
+        Registered as an ownership graph listener.
+        """
+        if sub_id is None:
+            self.sub_info_epoch += 1
+            self.sub_info_cache.clear()
+        else:
+            self.sub_info_generations[sub_id] = self.sub_info_generations.get(sub_id, 0) + 1
+            self.sub_info_cache.pop(sub_id, None)
+
+    def _sub_info_generation(self, sub_id: int) -> tuple:
+        return self.sub_info_epoch, self.sub_info_generations.get(sub_id, 0)
+
+    @commands.Cog.listener()
+    async def on_sub_info_changed(self, sub_id: int):
+        """
+        Dispatched (via `bot.dispatch("sub_info_changed", sub_id)`) by code that changes
+        non-ownership data shown on the info card, such as earnings or the service menu.
+        """
+        self.invalidate_sub_info(sub_id)
+
+    async def get_sub_info_embed(self, sub_id: int) -> discord.Embed:
+        """
+        Return the info embed for a sub, building and caching it on a miss.
+        A copy is returned so callers can't mutate the cached entry. If the sub is
+        invalidated while the card is being built, the (possibly stale) card is
+        returned but not cached.
+        """
+        embed = self.sub_info_cache.get(sub_id)
+        if embed is not None:
+            self.sub_info_hits += 1
+            return embed.copy()
+
+        self.sub_info_misses += 1
+        generation = self._sub_info_generation(sub_id)
+        embed = await self.build_sub_info_embed(sub_id)
+        if self._sub_info_generation(sub_id) == generation:
+            self.sub_info_cache[sub_id] = embed
+        logger.debug(
+            f"Sub info cache miss for {sub_id} "
+            f"(hit ratio {self.sub_info_hit_ratio:.2%}, {len(self.sub_info_cache)} cached)."
+        )
+        return embed.copy()
+
     async def build_sub_info_embed(self, sub_id: int) -> discord.Embed:
         """
         Constructs an embed that displays ownership details and extra info for a sub.
+        Owners come from the ownership graph; use `get_sub_info_embed()` for the cached card.
         """
         embed = discord.Embed(title=f"Sub #{sub_id} Info", color=discord.Color.blue())
-        owners = await self.bot.db.fetch(
-            """
-            SELECT user_id, percentage
-            FROM sub_ownership
-            WHERE sub_id=$1
-            ORDER BY percentage DESC
-            """,
-            sub_id
-        )
+        owners = self.bot.ownership_graph.ranked_owners(sub_id)
         if owners:
-            lines = [f"<@{o['user_id']}> - {o['percentage']}%" for o in owners]
+            lines = [f"<@{owner_id}> - {share.percentage}%" for owner_id, share in owners]
             embed.add_field(name="Owners", value="\n".join(lines), inline=False)
         else:
             embed.add_field(name="Owners", value="None", inline=False)
@@ -1473,15 +1463,7 @@ class OwnershipCog(commands.Cog):
         """
         Checks whether the user has at least the specified percentage of ownership.
         """
-        row = await self.bot.db.fetchrow(
-            """
-            SELECT percentage
-            FROM sub_ownership
-            WHERE sub_id=$1 AND user_id=$2
-            """,
-            sub_id, user_id
-        )
-        return bool(row and row["percentage"] >= shares)
+        return self.bot.ownership_graph.percentage(sub_id, user_id) >= shares
 
     async def transfer_full_ownership(self, sub_id: int, old_owner_id: int, new_owner_id: int, sale_amount: int):
         """
@@ -1489,24 +1471,18 @@ class OwnershipCog(commands.Cog):
         The operation is wrapped in a transaction to ensure atomicity.
         """
         try:
-            async with self.bot.db.transaction():
-                if sale_amount > 0:
-                    buyer_balance = await self.user_balance(new_owner_id)
-                    if buyer_balance < sale_amount:
-                        return (False, "Buyer lacks funds.")
-                    await self.bot.db.execute(
-                        "UPDATE wallets SET balance=balance-$1 WHERE user_id=$2;",
-                        sale_amount, new_owner_id
-                    )
-                    await self.bot.db.execute(
-                        "UPDATE wallets SET balance=balance+$1 WHERE user_id=$2;",
-                        sale_amount, old_owner_id
+            async with self.bot.db.pool.acquire() as conn:
+                async with conn.transaction():
+                    if sale_amount > 0:
+                        if not await self._move_sale_funds(conn, new_owner_id, old_owner_id, sale_amount):
+                            return (False, "Buyer lacks funds.")
+                    await conn.execute("DELETE FROM sub_ownership WHERE sub_id=$1;", sub_id)
+                    await conn.execute(
+                        "INSERT INTO sub_ownership(sub_id, user_id, percentage) VALUES($1,$2,100);",
+                        sub_id, new_owner_id
                     )
-                await self.bot.db.execute("DELETE FROM sub_ownership WHERE sub_id=$1;", sub_id)
-                await self.bot.db.execute(
-                    "INSERT INTO sub_ownership(sub_id, user_id, percentage) VALUES($1,$2,100);",
-                    sub_id, new_owner_id
-                )
+                    ownership_rows = await self.bot.ownership_graph.fetch_sub(conn, sub_id)
+            self.bot.ownership_graph.replace_sub(sub_id, ownership_rows)
             return (True, "Full ownership transfer completed.")
         except Exception as e:
             logger.error(f"transfer_full_ownership DB error: {e}")
@@ -1518,59 +1494,53 @@ class OwnershipCog(commands.Cog):
         The operation is wrapped in a transaction to ensure atomicity.
         """
         try:
-            async with self.bot.db.transaction():
-                if sale_amount > 0:
-                    buyer_balance = await self.user_balance(buyer_id)
-                    if buyer_balance < sale_amount:
-                        return (False, "Buyer lacks funds.")
-                    await self.bot.db.execute(
-                        "UPDATE wallets SET balance=balance-$1 WHERE user_id=$2;",
-                        sale_amount, buyer_id
-                    )
-                    await self.bot.db.execute(
-                        "UPDATE wallets SET balance=balance+$1 WHERE user_id=$2;",
-                        sale_amount, seller_id
-                    )
-                await self.bot.db.execute(
-                    """
-                    UPDATE sub_ownership
-                    SET percentage=percentage-$1
-                    WHERE sub_id=$2
-                      AND user_id=$3
-                    """,
-                    shares, sub_id, seller_id
-                )
-                row = await self.bot.db.fetchrow(
-                    """
-                    SELECT 1 FROM sub_ownership
-                    WHERE sub_id=$1
-                      AND user_id=$2
-                    """,
-                    sub_id, buyer_id
-                )
-                if row:
-                    await self.bot.db.execute(
+            async with self.bot.db.pool.acquire() as conn:
+                async with conn.transaction():
+                    if sale_amount > 0:
+                        if not await self._move_sale_funds(conn, buyer_id, seller_id, sale_amount):
+                            return (False, "Buyer lacks funds.")
+                    await conn.execute(
                         """
                         UPDATE sub_ownership
-                        SET percentage=percentage+$1
+                        SET percentage=percentage-$1
                         WHERE sub_id=$2
                           AND user_id=$3
                         """,
-                        shares, sub_id, buyer_id
+                        shares, sub_id, seller_id
                     )
-                else:
-                    await self.bot.db.execute(
+                    await conn.execute(
                         """
                         INSERT INTO sub_ownership(sub_id,user_id,percentage)
                         VALUES($1,$2,$3)
+                        ON CONFLICT (sub_id, user_id)
+                        DO UPDATE SET percentage=sub_ownership.percentage+EXCLUDED.percentage
                         """,
                         sub_id, buyer_id, shares
                     )
+                    ownership_rows = await self.bot.ownership_graph.fetch_sub(conn, sub_id)
+            self.bot.ownership_graph.replace_sub(sub_id, ownership_rows)
             return (True, "Partial ownership transfer completed.")
         except Exception as e:
             logger.error(f"transfer_partial_ownership DB error: {e}")
             return (False, f"DB error: {e}")
 
+    async def _move_sale_funds(self, conn, buyer_id: int, seller_id: int, amount: int) -> bool:
+        """
+        Moves the sale amount from buyer to seller on the caller's transaction.
+        Returns False (and moves nothing) if the buyer cannot cover it.
+        """
+        result = await conn.execute(
+            "UPDATE wallets SET balance=balance-$1 WHERE user_id=$2 AND balance >= $1;",
+            amount, buyer_id
+        )
+        if "UPDATE 1" not in result:
+            return False
+        await conn.execute(
+            "UPDATE wallets SET balance=balance+$1 WHERE user_id=$2;",
+            amount, seller_id
+        )
+        return True
+
     async def user_balance(self, user_id: int) -> int:
         """
         Retrieves the balance of the user's wallet. If the user does not have a wallet,
@@ -1,12 +1,19 @@
 import discord
+import asyncio
+import datetime
 import json
-from discord.ext import commands
+import time
+from discord.ext import commands, tasks
+from discord import Option
 from discord.commands import SlashCommandGroup
-from typing import TYPE_CHECKING, Optional, List, Dict, Any, Set
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Set, NamedTuple, Iterable, Tuple
 from loguru import logger
 
+from ownership_views import build_user_browser_embed
+
 if TYPE_CHECKING:
     from main import MoguMoguBot
+    from role_index import RoleIndex
 
 ##############################################################################
 # SELECT OPTIONS
@@ -149,6 +156,267 @@ ADVANCED_KINK_VALUES = {
     "extreme/edge play", "guns", "knives", "needles", "forced intox", "fire", "TPE"
 }
 
+PLACEHOLDER_ROLE_PREFIX = "n0t_a_r0le_"  # "None of these" select values; never real roles
+AUDIT_REASON_LIMIT = 512  # Discord's maximum audit log reason length
+PROGRESS_EDIT_INTERVAL = 1.0  # Seconds between progress message edits
+
+# user_roles column -> label used in audit reasons / summaries
+SINGLE_ROLE_COLUMNS = {
+    "gender_role": "gender",
+    "age_range":   "age",
+    "location":    "location",
+    "orientation": "orientation",
+    "dm_status":   "dm_status",
+}
+MULTI_ROLE_COLUMNS = ["here_for", "ping_roles", "kinks"]
+
+# Every role the flow can hand out; reconciliation never touches roles outside this set.
+MANAGED_ROLE_NAMES = frozenset(
+    option.value
+    for options in (
+        GENDER_OPTIONS, AGE_OPTIONS, LOCATION_OPTIONS, ORIENTATION_OPTIONS, HERE_FOR_OPTIONS,
+        DM_STATUS_OPTIONS, PING_ROLES_OPTIONS, KINKS_BONDAGE, KINKS_BODY_PHYSICAL, KINKS_PSYCH,
+        KINKS_EDGE_EXTREME,
+    )
+    for option in options
+    if not option.value.startswith(PLACEHOLDER_ROLE_PREFIX)
+)
+
+# Columns `/roles find` can filter on besides the array columns (all btree-indexed)
+ROLE_SCALAR_FILTERS = ("location", "age_range", "dm_status")
+FIND_PAGE_SIZE = 10
+
+# Demographics counters (role_stat_counts); every member counts in the '*' segment
+# and in the segment named after their location.
+STATS_ALL_SEGMENT = "*"
+STATS_TOP_VALUES = 15  # Values shown per field in /roles stats
+
+_STAT_VALUE_SELECTS = " UNION ALL ".join(
+    [f"SELECT user_id, location, '{c}' AS field, {c} AS value FROM user_roles" for c in SINGLE_ROLE_COLUMNS]
+    + [f"SELECT user_id, location, '{c}', unnest({c}) FROM user_roles" for c in MULTI_ROLE_COLUMNS]
+)
+RECOUNT_ROLE_STATS_SQL = f"""
+INSERT INTO role_stat_counts (segment, field, value, members)
+SELECT s.segment, d.field, d.value, COUNT(*)
+FROM (
+    SELECT DISTINCT user_id, location, field, value
+    FROM ({_STAT_VALUE_SELECTS}) v
+    WHERE value IS NOT NULL AND value <> '' AND value NOT LIKE '{PLACEHOLDER_ROLE_PREFIX}%'
+) d
+CROSS JOIN LATERAL (VALUES ('{STATS_ALL_SEGMENT}'), (d.location)) AS s(segment)
+WHERE s.segment IS NOT NULL AND s.segment <> ''
+GROUP BY s.segment, d.field, d.value;
+"""
+
+APPLY_ROLE_STAT_DELTA_SQL = """
+INSERT INTO role_stat_counts (segment, field, value, members)
+SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::int[])
+ON CONFLICT (segment, field, value)
+DO UPDATE SET members = role_stat_counts.members + EXCLUDED.members;
+"""
+
+RECONCILE_STATE_KEY = "role_reconcile"  # server_config key holding the resumable job cursor
+RECONCILE_EDIT_DELAY = 1.0  # Seconds between member edits during reconciliation
+RECONCILE_CHECKPOINT_EVERY = 25  # Save the cursor after this many applied members
+RECONCILE_PROGRESS_INTERVAL = 5.0  # Seconds between progress message edits
+RECONCILE_TIME = datetime.time(hour=4, tzinfo=datetime.timezone.utc)  # Daily full run (quiet hours)
+
+##############################################################################
+# ROLE DIFF ENGINE
+##############################################################################
+
+class RoleDiffResult(NamedTuple):
+    """Outcome of `apply_role_diff()`; lists hold role names."""
+    added: List[str]
+    removed: List[str]
+    skipped: List[str]
+    calls: int
+
+
+async def apply_role_diff(
+    member: discord.Member,
+    remove_names: Iterable[str],
+    add_names: Iterable[str],
+    role_index: "RoleIndex",
+    reason_prefix: str = "Role selection",
+    on_progress=None
+) -> RoleDiffResult:
+    """
+    Apply a role diff with as few API calls as possible.
+    Role names are resolved through the bot's `RoleIndex`.
+
+    The member's final role set is computed locally and sent with a single
+    `member.edit(roles=...)`. Changes are only split into several edits when the
+    audit log reason listing them would exceed Discord's 512-character limit.
+
+    Placeholder values are ignored. Names that don't exist, can't be assigned by
+    the bot, or are already in the requested state are reported as skipped.
+    `on_progress(done, total)` is awaited after each edit.
+    """
+    current = {role.id: role for role in member.roles if not role.is_default()}
+    skipped: List[str] = []
+    changes = []  # (sign, role)
+
+    for sign, names in (("-", remove_names), ("+", add_names)):
+        for name in names:
+            if name.startswith(PLACEHOLDER_ROLE_PREFIX):
+                continue
+            role = role_index.get(member.guild, name)
+            if (role is None or not role.is_assignable()
+                    or (sign == "-") != (role.id in current)):
+                skipped.append(name)
+                continue
+            changes.append((sign, role))
+
+    # Group changes so each edit's audit log reason fits the limit.
+    chunks: List[list] = []
+    reason = ""
+    for sign, role in changes:
+        token = f"{sign}{role.name}"
+        if chunks and len(reason) + len(token) + 2 <= AUDIT_REASON_LIMIT:
+            chunks[-1].append((sign, role))
+            reason += f", {token}"
+        else:
+            chunks.append([(sign, role)])
+            reason = f"{reason_prefix}: {token}"
+
+    added: List[str] = []
+    removed: List[str] = []
+    calls = 0
+    for i, chunk in enumerate(chunks, start=1):
+        target = dict(current)
+        for sign, role in chunk:
+            if sign == "-":
+                target.pop(role.id, None)
+            else:
+                target[role.id] = role
+        chunk_reason = f"{reason_prefix}: " + ", ".join(f"{sign}{role.name}" for sign, role in chunk)
+        try:
+            await member.edit(roles=list(target.values()), reason=chunk_reason[:AUDIT_REASON_LIMIT])
+            calls += 1
+            current = target
+            for sign, role in chunk:
+                (removed if sign == "-" else added).append(role.name)
+        except discord.HTTPException as e:
+            logger.warning(f"Failed to apply role changes for {member.id}: {e}")
+            skipped.extend(role.name for _, role in chunk)
+        if on_progress:
+            await on_progress(i, len(chunks))
+
+    return RoleDiffResult(added, removed, skipped, calls)
+
+
+def desired_role_names(row: Dict[str, Any]) -> Set[str]:
+    """Role names a `user_roles` row says the member should hold."""
+    names = {row.get(column) for column in SINGLE_ROLE_COLUMNS}
+    for column in MULTI_ROLE_COLUMNS:
+        names.update(row.get(column) or [])
+    return {name for name in names if name and name in MANAGED_ROLE_NAMES}
+
+
+def role_stat_keys(row: Optional[Dict[str, Any]]) -> Set[Tuple[str, str, str]]:
+    """(segment, field, value) counters a `user_roles` row contributes to."""
+    if not row:
+        return set()
+    values = [(column, row.get(column)) for column in SINGLE_ROLE_COLUMNS]
+    for column in MULTI_ROLE_COLUMNS:
+        values.extend((column, value) for value in (row.get(column) or []))
+    segments = [STATS_ALL_SEGMENT] + ([row["location"]] if row.get("location") else [])
+    return {
+        (segment, field, value)
+        for segment in segments
+        for field, value in values
+        if value and not value.startswith(PLACEHOLDER_ROLE_PREFIX)
+    }
+
+
+async def apply_role_stat_delta(conn, old_row, new_row) -> None:
+    """
+    Move the demographics counters from `old_row` to `new_row` in one statement.
+    Call inside the transaction that writes `user_roles`.
+    """
+    old_keys, new_keys = role_stat_keys(old_row), role_stat_keys(new_row)
+    delta = [(key, -1) for key in old_keys - new_keys] + [(key, 1) for key in new_keys - old_keys]
+    if not delta:
+        return
+    await conn.execute(
+        APPLY_ROLE_STAT_DELTA_SQL,
+        [key[0] for key, _ in delta],
+        [key[1] for key, _ in delta],
+        [key[2] for key, _ in delta],
+        [change for _, change in delta],
+    )
+
+
+def build_role_find_query(
+    arrays: Dict[str, List[str]],
+    scalars: Dict[str, str],
+    match_all: bool,
+    after_user_id: int,
+    limit: int
+) -> Tuple[str, list]:
+    """
+    Build the keyset-paginated `user_roles` search used by `/roles find`.
+
+    Array filters use `@>` (has all) or `&&` (has any) so they hit the GIN indexes;
+    scalar filters are equality checks on btree-indexed columns. Column names only
+    ever come from MULTI_ROLE_COLUMNS / ROLE_SCALAR_FILTERS; values are bind params.
+    """
+    args: List[Any] = [after_user_id]
+    clauses = ["user_id > $1"]
+    op = "@>" if match_all else "&&"
+    for column in MULTI_ROLE_COLUMNS:
+        values = arrays.get(column)
+        if values:
+            args.append(list(values))
+            clauses.append(f"{column} {op} ${len(args)}::text[]")
+    for column in ROLE_SCALAR_FILTERS:
+        value = scalars.get(column)
+        if value:
+            args.append(value)
+            clauses.append(f"{column} = ${len(args)}")
+    args.append(limit)
+    sql = (
+        f"SELECT user_id FROM user_roles WHERE {' AND '.join(clauses)} "
+        f"ORDER BY user_id LIMIT ${len(args)};"
+    )
+    return sql, args
+
+
+def parse_role_values(raw: Optional[str], options: Iterable[discord.SelectOption]) -> Tuple[List[str], List[str]]:
+    """
+    Split a comma-separated option list and match it (case-insensitively) against
+    the select options' values. Returns (matched values, unknown entries).
+    """
+    if not raw:
+        return [], []
+    by_lower = {o.value.lower(): o.value for o in options if not o.value.startswith(PLACEHOLDER_ROLE_PREFIX)}
+    by_lower.update({o.label.lower(): o.value for o in options if not o.value.startswith(PLACEHOLDER_ROLE_PREFIX)})
+    matched, unknown = [], []
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        value = by_lower.get(part.lower())
+        if value is None:
+            unknown.append(part)
+        elif value not in matched:
+            matched.append(value)
+    return matched, unknown
+
+
+class ReconcileReport(NamedTuple):
+    """Outcome of `MultiUserRoleSelectCog.reconcile_roles()`."""
+    scanned: int
+    drifted: int
+    members_updated: int
+    roles_added: int
+    roles_removed: int
+    roles_skipped: int
+    resumed_after: int
+    dry_run: bool
+
+
 ##############################################################################
 # COG
 ##############################################################################
@@ -164,26 +432,38 @@ class MultiUserRoleSelectCog(commands.Cog):
         self.bot = bot
         self.role_setup_view = RoleSetupView(bot)
         self._reattached = False
+        self._reconcile_lock = asyncio.Lock()
+        self.role_reconcile_loop.start()
+
+    def cog_unload(self):
+        self.role_reconcile_loop.cancel()
 
     @commands.Cog.listener()
     async def on_ready(self):
         """
-        Optionally reattach to the existing "Role Setup" message if we have IDs in config.json.
+        Reattach to the existing "Role Setup" message via the panel registry
+        (falling back to the legacy IDs in config.json the first time).
         """
         if self._reattached:
             return
         self._reattached = True
 
-        try:
-            with open("config.json", "r", encoding="utf-8") as f:
-                config_data = json.load(f)
-        except FileNotFoundError:
-            logger.info("No config.json found; skipping reattachment.")
-            return
+        # Seed the demographics counters the first time (e.g. right after the table was added)
+        needs_seed = await self.bot.db.fetchval(
+            "SELECT NOT EXISTS (SELECT 1 FROM role_stat_counts) AND EXISTS (SELECT 1 FROM user_roles);"
+        )
+        if needs_seed:
+            await self.recount_role_stats()
 
-        msg_id = config_data.get("role_select_message_id")
-        channel_id = config_data.get("role_select_channel_id")
-        if not (msg_id and channel_id):
+        # Finish a reconciliation that a restart interrupted; full runs wait for RECONCILE_TIME.
+        asyncio.create_task(self.resume_interrupted_reconcile())
+
+        handle = self.bot.panels.get("role_select")
+        if handle:
+            channel_id = handle.channel_id
+        else:
+            channel_id = self.bot.config.get("role_select_channel_id")
+        if not channel_id:
             return
 
         channel = self.bot.get_channel(channel_id)
@@ -192,20 +472,329 @@ class MultiUserRoleSelectCog(commands.Cog):
             return
 
         try:
-            msg = await channel.fetch_message(msg_id)
-            await msg.edit(view=self.role_setup_view)
-            self.bot.add_view(self.role_setup_view)
-            logger.debug(f"Reattached to existing role setup message {msg_id}.")
-        except discord.NotFound:
-            logger.warning(f"Message {msg_id} not found.")
+            msg = await self.publish_role_setup(channel)
+            logger.debug(f"Reattached to existing role setup message {msg.id}.")
         except discord.Forbidden:
             logger.warning(f"No access to channel {channel_id}.")
         except Exception as e:
             logger.exception(f"Error reattaching: {e}")
 
+    def build_role_setup_embed(self) -> discord.Embed:
+        return discord.Embed(
+            title="Choose your Roles!",
+            description=(
+                "Click **Choose Roles** to open an **ephemeral** menu where you can choose "
+                "or edit your role selection!\n"
+            ),
+            color=discord.Color.blurple()
+        )
+
+    async def publish_role_setup(self, channel: discord.TextChannel, force_new: bool = False) -> discord.PartialMessage:
+        """Post or refresh the "Role Setup" message; unchanged content costs no API call."""
+        self.bot.add_view(self.role_setup_view)
+        return await self.bot.panels.publish(
+            "role_select",
+            channel,
+            embed=self.build_role_setup_embed(),
+            view=self.role_setup_view,
+            legacy=(self.bot.config.get("role_select_channel_id"), self.bot.config.get("role_select_message_id")),
+            force_new=force_new
+        )
+
+    # ─────────────────────────────────────────────────────────────────
+    # ROLE RECONCILIATION (user_roles -> Discord)
+    # ─────────────────────────────────────────────────────────────────
+    async def load_reconcile_state(self) -> Optional[Dict[str, Any]]:
+        raw = await self.bot.db.fetchval(
+            "SELECT value::text FROM server_config WHERE key=$1;", RECONCILE_STATE_KEY
+        )
+        return json.loads(raw) if raw else None
+
+    async def save_reconcile_state(self, state: Dict[str, Any]):
+        await self.bot.db.execute(
+            "INSERT INTO server_config (key, value) VALUES ($1, $2::jsonb) "
+            "ON CONFLICT (key) DO UPDATE SET value=EXCLUDED.value;",
+            RECONCILE_STATE_KEY, json.dumps(state)
+        )
+
+    def compute_role_drift(self, guild: discord.Guild, rows) -> List[tuple]:
+        """
+        Compare `user_roles` rows with the cached members' managed roles.
+        Returns (member, names_to_remove, names_to_add) for every member that drifted;
+        members not in the guild (or not cached) are ignored.
+        """
+        drift = []
+        for row in rows:
+            member = guild.get_member(row["user_id"])
+            if member is None:
+                continue
+            desired = desired_role_names(row)
+            held = {role.name for role in member.roles if role.name in MANAGED_ROLE_NAMES}
+            to_remove = sorted(held - desired)
+            to_add = sorted(desired - held)
+            if to_remove or to_add:
+                drift.append((member, to_remove, to_add))
+        return drift
+
+    async def reconcile_roles(
+        self,
+        guild: discord.Guild,
+        dry_run: bool = False,
+        restart: bool = False,
+        on_progress=None
+    ) -> ReconcileReport:
+        """
+        Bring every member's flow-managed roles in line with `user_roles`.
+
+        All rows are loaded in one query (ordered by user_id) and diffed in memory against
+        the member cache. Drifted members get one `apply_role_diff()` call each, paced by
+        RECONCILE_EDIT_DELAY on top of the library's own 429 handling. The last processed
+        user_id is checkpointed in `server_config`, so an interrupted run picks up where it
+        stopped unless `restart` is set. Dry runs only report the drift. Members whose roles
+        staff cleared (`roles_cleared_at`) are skipped until they go through the role flow again.
+        """
+        async with self._reconcile_lock:
+            state = None if restart else await self.load_reconcile_state()
+            if not state or state.get("finished") or dry_run:
+                state = {"after_user_id": 0, "finished": False}
+            resumed_after = state["after_user_id"]
+            if not dry_run:
+                # Mark the run as started so a restart before the first checkpoint resumes it.
+                await self.save_reconcile_state(state)
+
+            columns = ", ".join(["user_id", *SINGLE_ROLE_COLUMNS, *MULTI_ROLE_COLUMNS])
+            rows = await self.bot.db.fetch(
+                f"SELECT {columns} FROM user_roles "
+                f"WHERE user_id > $1 AND roles_cleared_at IS NULL ORDER BY user_id;",
+                resumed_after
+            )
+            drift = self.compute_role_drift(guild, rows)
+            logger.info(
+                f"Role reconciliation: {len(rows)} rows after {resumed_after}, "
+                f"{len(drift)} drifted members (dry_run={dry_run})."
+            )
+            if dry_run:
+                return ReconcileReport(
+                    len(rows), len(drift), 0,
+                    sum(len(add) for _, _, add in drift),
+                    sum(len(rm) for _, rm, _ in drift),
+                    0, resumed_after, True
+                )
+
+            updated = added = removed = skipped = 0
+            for done, (member, to_remove, to_add) in enumerate(drift, start=1):
+                result = await apply_role_diff(
+                    member, to_remove, to_add, self.bot.role_index, reason_prefix="Role reconciliation"
+                )
+                updated += 1 if result.calls else 0
+                added += len(result.added)
+                removed += len(result.removed)
+                skipped += len(result.skipped)
+                state["after_user_id"] = member.id
+                if done % RECONCILE_CHECKPOINT_EVERY == 0:
+                    await self.save_reconcile_state(state)
+                if on_progress:
+                    await on_progress(done, len(drift))
+                if result.calls:
+                    await asyncio.sleep(RECONCILE_EDIT_DELAY)
+
+            state["finished"] = True
+            await self.save_reconcile_state(state)
+            logger.info(
+                f"Role reconciliation finished: {updated} members updated, "
+                f"+{added} -{removed} roles, {skipped} skipped."
+            )
+            return ReconcileReport(len(rows), len(drift), updated, added, removed, skipped, resumed_after, False)
+
+    async def resume_interrupted_reconcile(self):
+        """Continue a live reconciliation whose saved cursor isn't marked finished."""
+        state = await self.load_reconcile_state()
+        if not state or state.get("finished"):
+            return
+        guild = self.bot.get_guild(self.bot.config.get("guild_id"))
+        if guild is None or self._reconcile_lock.locked():
+            return
+        logger.info(f"Resuming interrupted role reconciliation after user {state.get('after_user_id', 0)}.")
+        try:
+            await self.reconcile_roles(guild)
+        except Exception as e:
+            logger.exception(f"Resumed role reconciliation failed: {e}")
+
+    @tasks.loop(time=RECONCILE_TIME)
+    async def role_reconcile_loop(self):
+        """Daily reconciliation at RECONCILE_TIME, so restarts and deploys don't trigger a full run."""
+        guild = self.bot.get_guild(self.bot.config.get("guild_id"))
+        if guild is None:
+            return
+        if self._reconcile_lock.locked():
+            logger.info("Role reconciliation already running; skipping scheduled run.")
+            return
+        try:
+            await self.reconcile_roles(guild)
+        except Exception as e:
+            logger.exception(f"Scheduled role reconciliation failed: {e}")
+
+    @role_reconcile_loop.before_loop
+    async def before_role_reconcile_loop(self):
+        await self.bot.wait_until_ready()
+
     # Slash Command Group
     roles = SlashCommandGroup("roles", "Manage role preferences")
 
+    @roles.command(name="reconcile", description="Sync everyone's selected roles from the database to Discord.")
+    @commands.has_any_role("Boss", "Underboss", "Consigliere")
+    async def reconcile_command(
+        self,
+        ctx: discord.ApplicationContext,
+        dry_run: Option(bool, "Only report the drift; change nothing", default=True),
+        restart: Option(bool, "Ignore an interrupted run and start from the beginning", default=False)
+    ):
+        await ctx.defer(ephemeral=True)
+        if self._reconcile_lock.locked():
+            return await ctx.followup.send("A role reconciliation is already running.", ephemeral=True)
+
+        progress_msg = await ctx.followup.send("Reconciling roles…", ephemeral=True)
+        last_edit = 0.0
+
+        async def report_progress(done: int, total: int):
+            nonlocal last_edit
+            now = time.monotonic()
+            if done < total and now - last_edit < RECONCILE_PROGRESS_INTERVAL:
+                return
+            last_edit = now
+            await progress_msg.edit(content=f"Reconciling roles… {done}/{total} members")
+
+        report = await self.reconcile_roles(ctx.guild, dry_run=dry_run, restart=restart, on_progress=report_progress)
+        lines = [
+            f"**Role reconciliation{' (dry run)' if report.dry_run else ''}**",
+            f"Rows scanned: {report.scanned}" + (f" (resumed after user {report.resumed_after})" if report.resumed_after else ""),
+            f"Members out of sync: {report.drifted}",
+        ]
+        if report.dry_run:
+            lines.append(f"Would add {report.roles_added} and remove {report.roles_removed} roles.")
+        else:
+            lines.append(
+                f"Updated {report.members_updated} members: +{report.roles_added} / -{report.roles_removed} roles"
+                f", {report.roles_skipped} skipped."
+            )
+        await progress_msg.edit(content="\n".join(lines))
+
+    async def find_members(
+        self,
+        guild: discord.Guild,
+        arrays: Dict[str, List[str]],
+        scalars: Dict[str, str],
+        match_all: bool = True,
+        after_user_id: int = 0,
+        limit: int = FIND_PAGE_SIZE
+    ) -> Tuple[List[discord.Member], Optional[int]]:
+        """
+        Discovery API: one page of guild members whose `user_roles` match the filters.
+        Returns (members, next_cursor); next_cursor is None on the last page. Rows for
+        users who left the guild are skipped, so a page may hold fewer than `limit`.
+        """
+        sql, args = build_role_find_query(arrays, scalars, match_all, after_user_id, limit)
+        rows = await self.bot.db.fetch(sql, *args)
+        members = [m for m in (guild.get_member(r["user_id"]) for r in rows) if m is not None]
+        next_cursor = rows[-1]["user_id"] if len(rows) == limit else None
+        return members, next_cursor
+
+    @roles.command(name="find", description="Find members by their selected roles.")
+    async def find_command(
+        self,
+        ctx: discord.ApplicationContext,
+        here_for: Option(str, "Comma-separated, e.g. Friendship, Online Play", required=False),
+        ping_roles: Option(str, "Comma-separated, e.g. Events, VC", required=False),
+        kinks: Option(str, "Comma-separated kinks", required=False),
+        match: Option(str, "Require all listed values or any of them", choices=["all", "any"], default="all"),
+        location: Option(str, "Location", choices=[o.value for o in LOCATION_OPTIONS], required=False),
+        age_range: Option(str, "Age range", choices=[o.value for o in AGE_OPTIONS], required=False),
+        dm_status: Option(str, "DM status", choices=[o.value for o in DM_STATUS_OPTIONS], required=False)
+    ):
+        await ctx.defer(ephemeral=True)
+        role_index = self.bot.role_index
+        # Same gate as the ownership browser: verified users with accepted rules only.
+        if role_index.has_role(ctx.author, "Unverified") or not role_index.has_role(ctx.author, "Rules Accepted"):
+            return await ctx.followup.send("You need to be verified and accept the rules first.", ephemeral=True)
+
+        arrays: Dict[str, List[str]] = {}
+        unknown: List[str] = []
+        for column, raw, options in (
+            ("here_for", here_for, HERE_FOR_OPTIONS),
+            ("ping_roles", ping_roles, PING_ROLES_OPTIONS),
+            ("kinks", kinks, KINKS_BONDAGE + KINKS_BODY_PHYSICAL + KINKS_PSYCH + KINKS_EDGE_EXTREME),
+        ):
+            matched, missing = parse_role_values(raw, options)
+            if matched:
+                arrays[column] = matched
+            unknown.extend(missing)
+        if unknown:
+            return await ctx.followup.send(f"Unknown option(s): {', '.join(unknown)}", ephemeral=True)
+
+        scalars = {"location": location, "age_range": age_range, "dm_status": dm_status}
+        if not arrays and not any(scalars.values()):
+            return await ctx.followup.send("Give at least one filter.", ephemeral=True)
+
+        view = RoleFindView(self, ctx.author, arrays, scalars, match == "all")
+        await view.load_page(0)
+        await ctx.followup.send(embed=view.build_results_embed(), view=view, ephemeral=True)
+
+    async def recount_role_stats(self) -> int:
+        """Rebuild role_stat_counts from user_roles (repair job). Returns the counter row count."""
+        async with self.bot.db.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("LOCK TABLE role_stat_counts IN EXCLUSIVE MODE;")
+                await conn.execute("DELETE FROM role_stat_counts;")
+                await conn.execute(RECOUNT_ROLE_STATS_SQL)
+                count = await conn.fetchval("SELECT COUNT(*) FROM role_stat_counts;")
+        logger.info(f"Role stats recounted: {count} counters.")
+        return count
+
+    @roles.command(name="stats", description="Community breakdown of selected roles.")
+    @commands.has_any_role("Boss", "Underboss", "Consigliere")
+    async def stats_command(
+        self,
+        ctx: discord.ApplicationContext,
+        location: Option(str, "Only members in this location", choices=[o.value for o in LOCATION_OPTIONS], required=False),
+        field: Option(str, "Only this field", choices=[*SINGLE_ROLE_COLUMNS, *MULTI_ROLE_COLUMNS], required=False)
+    ):
+        await ctx.defer(ephemeral=True)
+        rows = await self.bot.db.fetch(
+            """
+            SELECT field, value, members
+            FROM role_stat_counts
+            WHERE segment=$1 AND members > 0 AND ($2::text IS NULL OR field=$2)
+            ORDER BY field, members DESC, value;
+            """,
+            location or STATS_ALL_SEGMENT, field
+        )
+
+        embed = discord.Embed(
+            title=f"Role Stats{f' — {location}' if location else ''}",
+            color=discord.Color.blurple()
+        )
+        by_field: Dict[str, List[str]] = {}
+        for r in rows:
+            by_field.setdefault(r["field"], []).append(f"{r['value']}: **{r['members']}**")
+        for column in [*SINGLE_ROLE_COLUMNS, *MULTI_ROLE_COLUMNS]:
+            lines = by_field.get(column)
+            if not lines:
+                continue
+            shown = lines[:STATS_TOP_VALUES]
+            if len(lines) > len(shown):
+                shown.append(f"…and {len(lines) - len(shown)} more")
+            embed.add_field(name=column, value="\n".join(shown), inline=True)
+        if not by_field:
+            embed.description = "No data."
+        await ctx.followup.send(embed=embed, ephemeral=True)
+
+    @roles.command(name="recount_stats", description="Rebuild the role stats counters from scratch.")
+    @commands.has_any_role("Boss", "Underboss", "Consigliere")
+    async def recount_stats_command(self, ctx: discord.ApplicationContext):
+        await ctx.defer(ephemeral=True)
+        count = await self.recount_role_stats()
+        await ctx.followup.send(f"Role stats rebuilt ({count} counters).", ephemeral=True)
+
     @roles.command(name="setup")
     @commands.has_permissions(administrator=True)
     async def setup_role_message(self, ctx: discord.ApplicationContext):
@@ -214,32 +803,93 @@ class MultiUserRoleSelectCog(commands.Cog):
         """
         await ctx.defer(ephemeral=True)
 
+        # Always post a fresh message here; the registry remembers it for re-attachment on restart
+        await self.publish_role_setup(ctx.channel, force_new=True)
+        await ctx.respond("Role setup message created!", ephemeral=True, delete_after=30.0)
+
+
+##############################################################################
+# /roles find RESULTS
+##############################################################################
+
+class RoleFindView(discord.ui.View):
+    """
+    Paged `/roles find` results. Pick a member to see their User Browser card;
+    Next fetches the following keyset page.
+    """
+
+    def __init__(self, cog: MultiUserRoleSelectCog, viewer: discord.Member,
+                 arrays: Dict[str, List[str]], scalars: Dict[str, str], match_all: bool):
+        super().__init__(timeout=300)
+        self.cog = cog
+        self.viewer = viewer
+        self.arrays = arrays
+        self.scalars = scalars
+        self.match_all = match_all
+        self.page = 0
+        self.members: List[discord.Member] = []
+        self.next_cursor: Optional[int] = None
+
+    async def load_page(self, after_user_id: int):
+        self.members, self.next_cursor = await self.cog.find_members(
+            self.viewer.guild, self.arrays, self.scalars, self.match_all, after_user_id
+        )
+        self.clear_items()
+        if self.members:
+            self.add_item(RoleFindSelect(self))
+        if self.next_cursor is not None:
+            self.add_item(RoleFindNextButton(self))
+
+    def build_results_embed(self) -> discord.Embed:
+        filters = [f"**{col}** {'has all of' if self.match_all else 'has any of'} {', '.join(vals)}"
+                   for col, vals in self.arrays.items()]
+        filters += [f"**{col}** = {val}" for col, val in self.scalars.items() if val]
         embed = discord.Embed(
-            title="Choose your Roles!",
-            description=(
-                "Click **Choose Roles** to open an **ephemeral** menu where you can choose "
-                "or edit your role selection!\n"
-            ),
-            color=discord.Color.blurple()
+            title="Role Search",
+            description="\n".join(filters),
+            color=discord.Color.gold()
         )
+        lines = [f"• {m.mention} ({m.display_name})" for m in self.members]
+        embed.add_field(
+            name=f"Page {self.page + 1}",
+            value="\n".join(lines) if lines else "No matches.",
+            inline=False
+        )
+        embed.set_footer(text="Pick someone below to open their User Browser card.")
+        return embed
 
-        sent_msg = await ctx.channel.send(embed=embed, view=self.role_setup_view)
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.viewer.id
 
-        # Save the message/channel IDs for re-attachment on restart
-        try:
-            with open("config.json", "r", encoding="utf-8") as f:
-                config_data = json.load(f)
-        except FileNotFoundError:
-            config_data = {}
 
-        config_data["role_select_message_id"] = sent_msg.id
-        config_data["role_select_channel_id"] = ctx.channel.id
+class RoleFindSelect(discord.ui.Select):
+    def __init__(self, parent_view: RoleFindView):
+        self.parent_view = parent_view
+        super().__init__(
+            placeholder="Open a member's card…",
+            options=[discord.SelectOption(label=m.display_name[:100], value=str(m.id)) for m in parent_view.members]
+        )
 
-        with open("config.json", "w", encoding="utf-8") as f:
-            json.dump(config_data, f, indent=4)
+    async def callback(self, interaction: discord.Interaction):
+        member = interaction.guild.get_member(int(self.values[0]))
+        if member is None:
+            return await interaction.response.send_message("That member has left.", ephemeral=True, delete_after=30.0)
+        embed = await build_user_browser_embed(self.parent_view.cog.bot, interaction.guild, interaction.user.id, member)
+        if embed is None:
+            embed = self.parent_view.build_results_embed()
+        await interaction.response.edit_message(embed=embed, view=self.parent_view)
 
-        self.bot.add_view(self.role_setup_view)
-        await ctx.respond("Role setup message created!", ephemeral=True, delete_after=30.0)
+
+class RoleFindNextButton(discord.ui.Button):
+    def __init__(self, parent_view: RoleFindView):
+        self.parent_view = parent_view
+        super().__init__(label="Next", style=discord.ButtonStyle.secondary)
+
+    async def callback(self, interaction: discord.Interaction):
+        view = self.parent_view
+        view.page += 1
+        await view.load_page(view.next_cursor)
+        await interaction.response.edit_message(embed=view.build_results_embed(), view=view)
 
 
 ##############################################################################
@@ -458,23 +1108,34 @@ class RolesFlowView(discord.ui.View):
                   here_for    = EXCLUDED.here_for,
                   ping_roles  = EXCLUDED.ping_roles,
                   kinks       = EXCLUDED.kinks,
-                  updated_at  = NOW();
+                  updated_at  = NOW(),
+                  roles_cleared_at = NULL
+            RETURNING *;
         """
-        await self.bot.db.execute(
-            upsert_query,
-            self.user.id,
-            new["gender_role"],
-            new["age"],
-            new["location"],
-            new["orientation"],
-            new["dm_status"],
-            new["here_for"],
-            new["ping_roles"],
-            new["kinks"],
-        )
-
-        # Get the fresh record from DB
-        fresh = await self.bot.db.fetchrow("SELECT * FROM user_roles WHERE user_id=$1", self.user.id)
+        # Lock the current row so the demographics delta is computed against what we replace,
+        # and move the counters in the same transaction as the upsert.
+        async with self.bot.db.pool.acquire() as conn:
+            async with conn.transaction():
+                previous = await conn.fetchrow(
+                    "SELECT * FROM user_roles WHERE user_id=$1 FOR UPDATE;", self.user.id
+                )
+                fresh = await conn.fetchrow(
+                    upsert_query,
+                    self.user.id,
+                    new["gender_role"],
+                    new["age"],
+                    new["location"],
+                    new["orientation"],
+                    new["dm_status"],
+                    new["here_for"],
+                    new["ping_roles"],
+                    new["kinks"],
+                )
+                await apply_role_stat_delta(
+                    conn, dict(previous) if previous else None, dict(fresh) if fresh else None
+                )
+
+        # `fresh` is the row as stored (RETURNING *)
         if not fresh:
             logger.warning("[finish_flow] No record found after upsert.")
             fresh = {
@@ -499,15 +1160,7 @@ class RolesFlowView(discord.ui.View):
         add_actions = []
 
         # Single-value fields
-        single_map = {
-            "gender_role": "gender",
-            "age_range":   "age",
-            "location":    "location",
-            "orientation": "orientation",
-            "dm_status":   "dm_status",
-        }
-
-        for db_column, field_label in single_map.items():
+        for db_column, field_label in SINGLE_ROLE_COLUMNS.items():
             old_val = old.get(db_column)
             new_val = fresh.get(db_column)
 
@@ -519,8 +1172,7 @@ class RolesFlowView(discord.ui.View):
                 add_actions.append((new_val, f"Adding new {field_label}"))
 
         # Multi-value fields
-        multi_fields = ["here_for", "ping_roles", "kinks"]
-        for field in multi_fields:
+        for field in MULTI_ROLE_COLUMNS:
             old_vals = set(old.get(field, []))
             new_vals = set(fresh.get(field, []))
             to_remove = old_vals - new_vals
@@ -531,58 +1183,43 @@ class RolesFlowView(discord.ui.View):
             for val in to_add:
                 add_actions.append((val, f"Add {field}"))
 
-        # Total chunk count for progress, e.g. each role remove/add is 1 chunk
-        total_actions = len(remove_actions) + len(add_actions)
-        if total_actions == 0:
+        if not remove_actions and not add_actions:
             # Nothing to change at the role level; just confirm
             return await self._finish_and_summarize(
                 interaction, progress_msg, disclaimers, fresh
             )
 
         # ──────────────────────────────────────────────────────────────────
-        #   4) Perform each remove/add action in a loop, updating progress
+        #   4) Apply the whole diff (normally a single member.edit call)
         # ──────────────────────────────────────────────────────────────────
-        completed = 0
-
-        # 4a) Remove roles first
-        for role_name, reason in remove_actions:
-            # Attempt to remove from Discord
-            role = discord.utils.get(member.guild.roles, name=role_name)
-            if role and role in member.roles:
-                try:
-                    await member.remove_roles(role, reason=reason)
-                except Exception as e:
-                    logger.warning(f"Failed to remove role {role_name}: {e}")
-            completed += 1
-            # Update ephemeral progress after each chunk
-            await self._update_progress(progress_msg, completed, total_actions)
-
-        # 4b) Add roles
-        for role_name, reason in add_actions:
-            # Skip placeholders
-            if role_name.startswith("n0t_a_r0le_"):
-                completed += 1
-                await self._update_progress(progress_msg, completed, total_actions)
-                continue
-
-            # Attempt to add the role
-            role = discord.utils.get(member.guild.roles, name=role_name)
-            if role:
-                try:
-                    await member.add_roles(role, reason=reason)
-                except Exception as e:
-                    logger.warning(f"Failed to add role {role_name}: {e}")
-            completed += 1
-            await self._update_progress(progress_msg, completed, total_actions)
+        self._last_progress_edit = 0.0
+        result = await apply_role_diff(
+            member,
+            [name for name, _ in remove_actions],
+            [name for name, _ in add_actions],
+            self.bot.role_index,
+            on_progress=lambda done, total: self._update_progress(progress_msg, done, total)
+        )
+        logger.debug(
+            f"[finish_flow_with_progress] {member.id}: +{len(result.added)} -{len(result.removed)} "
+            f"skipped={len(result.skipped)} in {result.calls} call(s)"
+        )
 
         # ──────────────────────────────────────────────────────────────────
         #   5) Finished applying roles; show final summary & disclaimers
         # ──────────────────────────────────────────────────────────────────
-        await self._finish_and_summarize(interaction, progress_msg, disclaimers, fresh)
+        await self._finish_and_summarize(interaction, progress_msg, disclaimers, fresh, result)
 
 
     async def _update_progress(self, msg: discord.WebhookMessage, done: int, total: int):
-        """Update ephemeral progress message with a simple text-based progress bar."""
+        """
+        Update ephemeral progress message with a simple text-based progress bar.
+        Edits are throttled to one per PROGRESS_EDIT_INTERVAL; the final summary replaces it anyway.
+        """
+        now = time.monotonic()
+        if done >= total or now - getattr(self, "_last_progress_edit", 0.0) < PROGRESS_EDIT_INTERVAL:
+            return
+        self._last_progress_edit = now
         pct = int((done / total) * 100)
         # For example, we can do a 20-char bar
         bar_length = 20
@@ -595,7 +1232,8 @@ class RolesFlowView(discord.ui.View):
     async def _finish_and_summarize(self, interaction: discord.Interaction,
                                     progress_msg: discord.WebhookMessage,
                                     disclaimers: str,
-                                    fresh_data: Dict[str, Any]):
+                                    fresh_data: Dict[str, Any],
+                                    result: Optional[RoleDiffResult] = None):
         """
         Once everything is applied, show the final summary.
         """
@@ -621,7 +1259,14 @@ class RolesFlowView(discord.ui.View):
         ]
         summary_str = "\n".join(summary_list)
 
-        final_msg = f"{disclaimers}**Your final selections**:\n{summary_str}\n\nPreferences saved!"
+        applied_str = ""
+        if result is not None:
+            applied_str = f"\nRoles updated: {len(result.added)} added, {len(result.removed)} removed"
+            if result.skipped:
+                applied_str += f", {len(result.skipped)} skipped"
+            applied_str += "."
+
+        final_msg = f"{disclaimers}**Your final selections**:\n{summary_str}\n\nPreferences saved!{applied_str}"
         await progress_msg.edit(content=final_msg)
 
         # Clear out the items on the View so everything is effectively done
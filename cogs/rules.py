@@ -1,8 +1,60 @@
 import discord
-import json
-from discord.ext import commands
+import datetime
+import time
+from discord.ext import commands, tasks
+from discord.commands import SlashCommandGroup, Option
 from loguru import logger
-from typing import Optional, List
+from typing import Optional, List, NamedTuple, Dict, Any
+
+from funnel import FUNNEL_STAGES
+
+RULES_PANEL_CONTENT = "Please read these rules. Then you may begin acceptance or unaccept below."
+DIGEST_INTERVAL = 5  # Seconds between staff digest edits
+DIGEST_MAX_LINES = 20  # Start a new digest message after this many entries
+DIGEST_MAX_AGE = 600  # ...or once the current digest message is this old (seconds)
+
+ACCEPT_RULES_SQL = """
+WITH accepted AS (
+    INSERT INTO rules_acceptance (user_id, accepted_at)
+    VALUES ($1, NOW())
+    ON CONFLICT (user_id) DO UPDATE
+        SET accepted_at = EXCLUDED.accepted_at
+    RETURNING user_id
+)
+INSERT INTO rules_acceptance_log (user_id, event)
+SELECT user_id, 'accepted' FROM accepted;
+"""
+
+UNACCEPT_RULES_SQL = """
+WITH removed AS (
+    DELETE FROM rules_acceptance WHERE user_id=$1
+    RETURNING user_id, accepted_at
+), logged AS (
+    INSERT INTO rules_acceptance_log (user_id, event)
+    SELECT user_id, 'unaccepted' FROM removed
+    RETURNING id
+)
+SELECT logged.id AS log_id, removed.accepted_at FROM logged, removed;
+"""
+
+# Undo UNACCEPT_RULES_SQL when the role could not be removed ($1 user, $2 accepted_at, $3 log id).
+RESTORE_ACCEPTANCE_SQL = """
+WITH unlogged AS (
+    DELETE FROM rules_acceptance_log WHERE id=$3
+)
+INSERT INTO rules_acceptance (user_id, accepted_at)
+VALUES ($1, $2)
+ON CONFLICT (user_id) DO NOTHING;
+"""
+
+DEFAULT_RULES_TEXT = ("Default SSC text", "Default RACK text", "Default PRICK text", "Final disclaimers here.")
+
+
+class RulesSnapshot(NamedTuple):
+    """The current rules_text row and the embeds built from it (shared, never mutated)."""
+    row: Dict[str, Any]
+    pinned_embed: discord.Embed
+    pages: List[discord.Embed]
 
 
 class RulesCog(commands.Cog):
@@ -14,6 +66,8 @@ class RulesCog(commands.Cog):
     - Admin commands: /rules send, /rules edit
     """
 
+    rules_group = SlashCommandGroup("rules", "Rules flow tools.")
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.rules_channel_id = bot.config.get(
@@ -23,6 +77,18 @@ class RulesCog(commands.Cog):
         self.staff_channel_log_id = bot.config.get(
             "staff_channel_rules_log_id")  # Staff logs channel
         self.setup_done = False
+        # Built once from rules_text and rebuilt only when RulesEditModal saves
+        self.snapshot: Optional[RulesSnapshot] = None
+
+        # Staff-channel acceptance notices, folded into a rolling digest message
+        self.pending_notices: List[str] = []
+        self.digest_message: Optional[discord.Message] = None
+        self.digest_lines: List[str] = []
+        self.digest_started = 0.0
+        self.rules_digest_loop.start()
+
+    def cog_unload(self):
+        self.rules_digest_loop.cancel()
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -31,45 +97,132 @@ class RulesCog(commands.Cog):
             return
         self.setup_done = True
 
-        if not self.rules_channel_id or not self.rules_message_id:
+        # Only re-attach a rules message that was already posted (via the panel registry
+        # or the legacy rules_message_id); /rules_send is what creates one.
+        if not self.rules_channel_id or not (self.bot.panels.get("rules") or self.rules_message_id):
             return
 
         channel = self.bot.get_channel(self.rules_channel_id)
         if not channel:
             return
 
+        # Load rules from DB (once; later reads use the snapshot)
+        if await self.get_rules_snapshot(create=False) is None:
+            # No rules => skip
+            return
+
+        msg = await self.publish_rules_panel(channel)
+        logger.debug(f"Reattached to existing rules modal message {msg.id}")
+
+    # ─────────────────────────────────────────────────────────────────
+    # STAFF DIGEST
+    # ─────────────────────────────────────────────────────────────────
+    def queue_staff_notice(self, user: discord.abc.User, accepted: bool):
+        """Queue an accept/unaccept line for the next digest edit."""
+        if not self.staff_channel_log_id:
+            return
+        icon, verb = ("✅", "accepted") if accepted else ("❌", "unaccepted")
+        self.pending_notices.append(
+            f"{icon} {user.mention} (ID: {user.id}) {verb} the rules <t:{int(time.time())}:T>"
+        )
+
+    @tasks.loop(seconds=DIGEST_INTERVAL)
+    async def rules_digest_loop(self):
+        """Fold queued notices into the current digest message (one edit or send per tick)."""
+        if not self.pending_notices:
+            return
+        staff_ch = self.bot.get_channel(self.staff_channel_log_id)
+        if not staff_ch:
+            self.pending_notices.clear()
+            return
+
+        notices, self.pending_notices = self.pending_notices, []
+        now = time.monotonic()
+        rollover = (
+            self.digest_message is None
+            or len(self.digest_lines) + len(notices) > DIGEST_MAX_LINES
+            or now - self.digest_started > DIGEST_MAX_AGE
+        )
+        # A fresh digest takes at most DIGEST_MAX_LINES; the rest waits for the next tick.
+        # State is only updated once Discord accepted the message, so a failed send or
+        # edit never drops notices or overwrites an older digest with partial content.
+        written = notices[:DIGEST_MAX_LINES] if rollover else notices
+        lines = list(written) if rollover else self.digest_lines + written
+
+        embed = discord.Embed(
+            title="Rules Activity",
+            description="\n".join(lines),
+            color=discord.Color.blurple()
+        )
         try:
-            msg = await channel.fetch_message(self.rules_message_id)
+            if rollover:
+                self.digest_message = await staff_ch.send(embed=embed)
+                self.digest_started = now
+            else:
+                await self.digest_message.edit(embed=embed)
         except discord.NotFound:
+            # Digest message was deleted; start over on the next tick.
+            self.digest_message = None
+            self.pending_notices = notices + self.pending_notices
+            return
+        except discord.HTTPException as e:
+            logger.warning(f"Failed to update rules digest: {e}")
+            self.pending_notices = notices + self.pending_notices
             return
+        self.digest_lines = lines
+        self.pending_notices = notices[len(written):] + self.pending_notices
 
-        # Fetch rules from DB
-        row = await self.bot.db.fetchrow("SELECT * FROM rules_text LIMIT 1;")
+    @rules_digest_loop.before_loop
+    async def before_rules_digest_loop(self):
+        await self.bot.wait_until_ready()
+
+    # ─────────────────────────────────────────────────────────────────
+    # RULES SNAPSHOT
+    # ─────────────────────────────────────────────────────────────────
+    async def get_rules_snapshot(self, create: bool = True) -> Optional[RulesSnapshot]:
+        """
+        Return the cached rules snapshot, loading it on first use.
+        With `create`, a default rules_text row is inserted if the table is empty.
+        """
+        if self.snapshot is not None:
+            return self.snapshot
+        row = await self.bot.db.fetchrow("SELECT * FROM rules_text ORDER BY id LIMIT 1;")
+        if not row and create:
+            row = await self.bot.db.fetchrow("""
+                INSERT INTO rules_text (ssc, rack, prick, final_notes)
+                VALUES ($1, $2, $3, $4)
+                RETURNING *;
+            """, *DEFAULT_RULES_TEXT)
         if not row:
-            # No rules => skip
-            return
+            return None
+        return self.set_rules_snapshot(row)
 
+    def set_rules_snapshot(self, row) -> RulesSnapshot:
+        """Rebuild the embeds from `row` and make them the shared snapshot."""
         pinned_embed, ephemeral_pages = self.build_rules_embeds(row)
-        # Re-attach pinned message with the two-button view
+        self.snapshot = RulesSnapshot(dict(row), pinned_embed, ephemeral_pages)
+        return self.snapshot
+
+    async def publish_rules_panel(self, channel: discord.TextChannel) -> discord.PartialMessage:
+        """
+        Publish the pinned rules message through the panel registry: no API call if it is
+        unchanged, one edit if the rules changed, or a new message if it is missing.
+        """
+        snapshot = await self.get_rules_snapshot()
         view = RulesEntryPointView(
             bot=self.bot,
-            ephemeral_pages=ephemeral_pages,  # only the 3 pages for the ephemeral flow
             staff_channel_id=self.staff_channel_log_id
         )
-        # We just re-attach; no need to .edit() since the message embed probably matches DB already
-        self.bot.add_view(view, message_id=msg.id)
-        logger.debug(f"Reattached to existing rules modal message {msg.id}")
-
-    @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        guild = member.guild
-        logger.debug(f"[DEBUG] Member Joined: {member.display_name}")
-        if guild:
-            rules_role = discord.utils.get(guild.roles, name="Unverified")
-            if rules_role:
-                await member.add_roles(rules_role)
-                logger.debug(
-                    f"[DEBUG] Member Joined: Added {rules_role.name} to {member.display_name}")
+        msg = await self.bot.panels.publish(
+            "rules",
+            channel,
+            content=RULES_PANEL_CONTENT,
+            embed=snapshot.pinned_embed,
+            view=view,
+            legacy=(self.rules_channel_id, self.rules_message_id)
+        )
+        self.rules_message_id = msg.id
+        return msg
 
     # ─────────────────────────────────────────────────────────────────
     # HELPER: Build pinned embed + ephemeral pages
@@ -120,67 +273,17 @@ class RulesCog(commands.Cog):
         """
         await ctx.defer(ephemeral=True)
 
-        # 1) Ensure we have a row in rules_text
-        row = await self.bot.db.fetchrow("SELECT * FROM rules_text LIMIT 1;")
-        if not row:
-            # Insert defaults if missing
-            await self.bot.db.execute("""
-                INSERT INTO rules_text (ssc, rack, prick, final_notes)
-                VALUES ($1, $2, $3, $4)
-            """,
-                                      "Default SSC text",
-                                      "Default RACK text",
-                                      "Default PRICK text",
-                                      "Final disclaimers here."
-                                      )
-            row = await self.bot.db.fetchrow("SELECT * FROM rules_text LIMIT 1;")
-
-        if not row:
+        # 1) Ensure we have rules text (inserts defaults if missing)
+        if await self.get_rules_snapshot() is None:
             return await ctx.followup.send("No rules text found or created in DB.", ephemeral=True, delete_after=30.0)
 
-        # 2) Build the pinned embed + ephemeral pages
-        pinned_embed, ephemeral_pages = self.build_rules_embeds(row)
-
         channel = self.bot.get_channel(self.rules_channel_id)
         if not channel:
             return await ctx.followup.send("Invalid rules_channel_id in config.", ephemeral=True, delete_after=30.0)
 
-        # 3) If we already have a pinned message, try editing
-        if self.rules_message_id:
-            try:
-                msg = await channel.fetch_message(self.rules_message_id)
-                view = RulesEntryPointView(
-                    bot=self.bot,
-                    ephemeral_pages=ephemeral_pages,
-                    staff_channel_id=self.staff_channel_log_id
-                )
-                await msg.edit(
-                    content="Please read these rules. Then you may begin acceptance or unaccept below.",
-                    embed=pinned_embed,
-                    view=view
-                )
-                return await ctx.followup.send(f"Rules message updated: {msg.jump_url}", ephemeral=True, delete_after=30.0)
-            except discord.NotFound:
-                pass
-
-        # 4) Otherwise, create a new pinned message
-        view = RulesEntryPointView(
-            bot=self.bot,
-            ephemeral_pages=ephemeral_pages,
-            staff_channel_id=self.staff_channel_log_id
-        )
-        sent = await channel.send(
-            content="Please read these rules. Then you may begin acceptance or unaccept below.",
-            embed=pinned_embed,
-            view=view
-        )
-
-        self.rules_message_id = sent.id
-        self.bot.config["rules_message_id"] = self.rules_message_id
-        with open("config.json", "w", encoding="utf-8") as f:
-            json.dump(self.bot.config, f, indent=4)
-
-        await ctx.followup.send(f"New rules message pinned at {sent.jump_url}", ephemeral=True, delete_after=30.0)
+        # 2) Edit the existing pinned message if the rules changed, or post a new one
+        msg = await self.publish_rules_panel(channel)
+        await ctx.followup.send(f"Rules message is up to date: {msg.jump_url}", ephemeral=True, delete_after=30.0)
 
     # ─────────────────────────────────────────────────────────────────
     # ADMIN COMMAND: /rules edit
@@ -190,19 +293,8 @@ class RulesCog(commands.Cog):
     async def rules_edit(self, ctx: discord.ApplicationContext):
         """Opens a Modal with four text fields for editing the DB-stored rules text."""
         # IMPORTANT: Do NOT defer if you plan to send a modal right away.
-        row = await self.bot.db.fetchrow("SELECT * FROM rules_text LIMIT 1;")
-        if not row:
-            # Insert defaults if none exist
-            await self.bot.db.execute("""
-                INSERT INTO rules_text (ssc, rack, prick, final_notes)
-                VALUES ($1, $2, $3, $4)
-            """,
-                                      "Default SSC text",
-                                      "Default RACK text",
-                                      "Default PRICK text",
-                                      "Final disclaimers."
-                                      )
-            row = await self.bot.db.fetchrow("SELECT * FROM rules_text LIMIT 1;")
+        # The snapshot is normally warm, so this costs no DB round trip before the modal.
+        row = (await self.get_rules_snapshot()).row
 
         ssc_def = row["ssc"]
         rack_def = row["rack"]
@@ -216,6 +308,55 @@ class RulesCog(commands.Cog):
         # For older PyCord, you can do a second .followup, but typically we skip it.
 
 
+    # ─────────────────────────────────────────────────────────────────
+    # STAFF COMMAND: /rules funnel
+    # ─────────────────────────────────────────────────────────────────
+    @rules_group.command(name="funnel", description="Join → rules → verification funnel over a date range.")
+    @commands.has_any_role("Boss", "Underboss", "Consigliere")
+    async def rules_funnel(
+        self,
+        ctx: discord.ApplicationContext,
+        days: Option(int, "Last N days (ignored if start is given)", default=30, min_value=1),
+        start: Option(str, "Start date, YYYY-MM-DD", required=False),
+        end: Option(str, "End date, YYYY-MM-DD (default today)", required=False)
+    ):
+        """Reads only the funnel_daily rollups, so any range answers in one small query."""
+        await ctx.defer(ephemeral=True)
+        try:
+            end_day = datetime.date.fromisoformat(end) if end else datetime.datetime.utcnow().date()
+            start_day = datetime.date.fromisoformat(start) if start else end_day - datetime.timedelta(days=days - 1)
+        except ValueError:
+            return await ctx.followup.send("Dates must look like 2025-01-31.", ephemeral=True)
+
+        rows = await self.bot.db.fetch(
+            """
+            SELECT event, SUM(events)::bigint AS events, SUM(new_users)::bigint AS new_users
+              FROM funnel_daily
+             WHERE day BETWEEN $1 AND $2
+             GROUP BY event;
+            """,
+            start_day, end_day
+        )
+        by_event = {r["event"]: r for r in rows}
+        joined = by_event["join"]["new_users"] if "join" in by_event else 0
+
+        lines = []
+        for stage in FUNNEL_STAGES:
+            r = by_event.get(stage)
+            users = r["new_users"] if r else 0
+            events = r["events"] if r else 0
+            pct = f" ({users / joined:.0%} of joins)" if joined and stage != "join" else ""
+            lines.append(f"**{stage}**: {users} users, {events} events{pct}")
+
+        embed = discord.Embed(
+            title="Rules Funnel",
+            description="\n".join(lines),
+            color=discord.Color.blurple()
+        )
+        embed.set_footer(text=f"{start_day} → {end_day} (UTC, first occurrence per user; rollups refresh every 15 min)")
+        await ctx.followup.send(embed=embed, ephemeral=True)
+
+
 def setup(bot: commands.Bot):
     bot.add_cog(RulesCog(bot))
 
@@ -230,34 +371,41 @@ class RulesEntryPointView(discord.ui.View):
       - Unaccept → if user is accepted, remove acceptance
     """
 
-    def __init__(self, bot: commands.Bot, ephemeral_pages: List[discord.Embed], staff_channel_id: Optional[int]):
+    def __init__(self, bot: commands.Bot, staff_channel_id: Optional[int]):
         super().__init__(timeout=None)
         self.bot = bot
-        self.ephemeral_pages = ephemeral_pages
         self.staff_channel_id = staff_channel_id
 
     @discord.ui.button(label="Begin", style=discord.ButtonStyle.primary, custom_id="rules_begin")
     async def begin_button(self, button: discord.ui.Button, interaction: discord.Interaction):
-        row = await self.bot.db.fetchrow(
-            "SELECT accepted_at FROM rules_acceptance WHERE user_id=$1",
-            interaction.user.id
-        )
-        if row:
+        # The "Rules Accepted" role mirrors rules_acceptance, so no DB query is needed here.
+        if self.bot.role_index.has_role(interaction.user, "Rules Accepted"):
             return await interaction.response.send_message(
                 "You have already accepted the rules!",
                 ephemeral=True,
                 delete_after=30.0
             )
 
+        cog = self.bot.get_cog("RulesCog")
+        snapshot = cog.snapshot if cog else None
+        if snapshot is None:
+            return await interaction.response.send_message(
+                "The rules are not available right now. Please try again shortly.",
+                ephemeral=True,
+                delete_after=30.0
+            )
+
+        self.bot.funnel.record(interaction.user.id, "rules_begin")
+
         # Not accepted -> ephemeral multi-page (only the 3 pages)
         view = MultiPageRulesView(
             bot=self.bot,
             user=interaction.user,
-            pages=self.ephemeral_pages,
+            pages=snapshot.pages,
             staff_channel_id=self.staff_channel_id
         )
         await interaction.response.send_message(
-            embed=self.ephemeral_pages[0],  # start on SSC
+            embed=snapshot.pages[0],  # start on SSC
             view=view,
             ephemeral=True,
             delete_after=30.0
@@ -265,45 +413,20 @@ class RulesEntryPointView(discord.ui.View):
 
     @discord.ui.button(label="Unaccept", style=discord.ButtonStyle.danger, custom_id="rules_unaccept")
     async def unaccept_button(self, button: discord.ui.Button, interaction: discord.Interaction):
-        row = await self.bot.db.fetchrow(
-            "SELECT accepted_at FROM rules_acceptance WHERE user_id=$1",
-            interaction.user.id
-        )
-        if not row:
+        # Remove from rules_acceptance and log 'unaccepted' in one statement
+        removed = await self.bot.db.fetchrow(UNACCEPT_RULES_SQL, interaction.user.id)
+        guild = interaction.guild
+        rules_role = self.bot.role_index.get(guild, "Rules Accepted") if guild else None
+        holds_role = rules_role is not None and interaction.user.get_role(rules_role.id) is not None
+        if not removed and not holds_role:
             return await interaction.response.send_message(
                 "You haven’t accepted the rules yet!",
                 ephemeral=True,
                 delete_after=30.0
             )
-
-        # Remove from rules_acceptance
-        await self.bot.db.execute("DELETE FROM rules_acceptance WHERE user_id=$1", interaction.user.id)
-        # Insert a row in rules_acceptance_log with event='unaccepted'
-        await self.bot.db.execute(
-            "INSERT INTO rules_acceptance_log (user_id, event) VALUES ($1, 'unaccepted')",
-            interaction.user.id
-        )
-
-        # Roles: remove Verified, add Unverified
-        guild = interaction.guild
-        if guild:
-            rules_role = discord.utils.get(guild.roles, name="Rules Accepted")
-            if rules_role and rules_role in interaction.user.roles:
-                await interaction.user.remove_roles(rules_role)
-
-        # Staff log
-        if self.staff_channel_id:
-            staff_ch = self.bot.get_channel(self.staff_channel_id)
-            if staff_ch:
-                embed = discord.Embed(
-                    title="User Unaccepted Rules",
-                    description=(
-                        f"**User:** {interaction.user.mention} (ID: {interaction.user.id})\n"
-                        f"**Timestamp:** <t:{int(discord.utils.utcnow().timestamp())}>"
-                    ),
-                    color=discord.Color.red()
-                )
-                await staff_ch.send(embed=embed)
+        if not removed:
+            # Begin trusts the role, so a role without a row must still be removable here.
+            logger.warning(f"User {interaction.user.id} had Rules Accepted without a rules_acceptance row.")
 
         await interaction.response.send_message(
             "You have **unaccepted** the rules. Your community access is revoked.",
@@ -311,6 +434,32 @@ class RulesEntryPointView(discord.ui.View):
             delete_after=30.0
         )
 
+        # Roles: remove Rules Accepted
+        if holds_role:
+            try:
+                await interaction.user.remove_roles(rules_role, reason="Rules unaccepted")
+            except discord.HTTPException as e:
+                logger.error(f"Failed to remove Rules Accepted from {interaction.user.id}: {e}")
+                if removed:
+                    # Keep the row in step with the role the user still holds.
+                    await self.bot.db.execute(
+                        RESTORE_ACCEPTANCE_SQL, interaction.user.id, removed["accepted_at"], removed["log_id"]
+                    )
+                return await interaction.followup.send(
+                    "Your **Rules Accepted** role could not be removed, so nothing was changed. "
+                    "Please try again or contact staff.",
+                    ephemeral=True
+                )
+        if not removed:
+            return
+
+        self.bot.funnel.record(interaction.user.id, "rules_unaccept")
+
+        # Staff log (batched into the digest)
+        cog = self.bot.get_cog("RulesCog")
+        if cog:
+            cog.queue_staff_notice(interaction.user, accepted=False)
+
 
 # ─────────────────────────────────────────────────────────────────
 # VIEW: Ephemeral multi-page acceptance (3 pages)
@@ -350,6 +499,7 @@ class MultiPageRulesView(discord.ui.View):
         self.accept_button.disabled = (
             self.current_page != len(self.pages) - 1)
 
+        self.bot.funnel.record(interaction.user.id, "rules_page", f"page_{self.current_page + 1}")
         await interaction.response.edit_message(
             embed=self.pages[self.current_page],
             view=self
@@ -369,6 +519,7 @@ class MultiPageRulesView(discord.ui.View):
             self.accept_button.disabled = True
 
         self.prev_button.disabled = False
+        self.bot.funnel.record(interaction.user.id, "rules_page", f"page_{self.current_page + 1}")
         await interaction.response.edit_message(
             embed=self.pages[self.current_page],
             view=self
@@ -376,42 +527,11 @@ class MultiPageRulesView(discord.ui.View):
 
     @discord.ui.button(label="I Accept", style=discord.ButtonStyle.success)
     async def accept_button(self, button: discord.ui.Button, interaction: discord.Interaction):
-        # 1) Upsert acceptance
-        await self.bot.db.execute("""
-            INSERT INTO rules_acceptance (user_id, accepted_at)
-            VALUES ($1, NOW())
-            ON CONFLICT (user_id) DO UPDATE
-                SET accepted_at = EXCLUDED.accepted_at
-        """, interaction.user.id)
-
-        # 2) Log acceptance
-        await self.bot.db.execute("""
-            INSERT INTO rules_acceptance_log (user_id, event)
-            VALUES ($1, 'accepted')
-        """, interaction.user.id)
-
-        # 3) Roles
-        guild = interaction.guild
-        if guild:
-            rules_role = discord.utils.get(guild.roles, name="Rules Accepted")
-            if rules_role:
-                await interaction.user.add_roles(rules_role)
+        # 1) Upsert acceptance + log it (one statement)
+        await self.bot.db.execute(ACCEPT_RULES_SQL, interaction.user.id)
+        self.bot.funnel.record(interaction.user.id, "rules_accept")
 
-        # 4) Staff log
-        if self.staff_channel_id:
-            staff_ch = self.bot.get_channel(self.staff_channel_id)
-            if staff_ch:
-                embed = discord.Embed(
-                    title="User Accepted Rules",
-                    description=(
-                        f"**User:** {interaction.user.mention} (ID: {interaction.user.id})\n"
-                        f"**Time:** <t:{int(discord.utils.utcnow().timestamp())}>"
-                    ),
-                    color=discord.Color.green()
-                )
-                await staff_ch.send(embed=embed)
-
-        # 5) Disable buttons
+        # 2) Disable buttons and acknowledge right away
         for c in self.children:
             c.disabled = True
 
@@ -423,6 +543,18 @@ class MultiPageRulesView(discord.ui.View):
             view=self
         )
 
+        # 3) Roles
+        guild = interaction.guild
+        if guild:
+            rules_role = self.bot.role_index.get(guild, "Rules Accepted")
+            if rules_role:
+                await interaction.user.add_roles(rules_role)
+
+        # 4) Staff log (batched into the digest)
+        cog = self.bot.get_cog("RulesCog")
+        if cog:
+            cog.queue_staff_notice(interaction.user, accepted=True)
+
 
 # ─────────────────────────────────────────────────────────────────
 # MODAL: Admin editing of the 4 rules fields
@@ -482,7 +614,7 @@ class RulesEditModal(discord.ui.Modal):
         final_val = self.final_input.value.strip()
 
         # Update DB
-        await interaction.client.db.execute("""
+        row = await interaction.client.db.fetchrow("""
             INSERT INTO rules_text (id, ssc, rack, prick, final_notes)
             VALUES (1, $1, $2, $3, $4)
             ON CONFLICT (id) DO UPDATE
@@ -490,6 +622,7 @@ class RulesEditModal(discord.ui.Modal):
                    rack=EXCLUDED.rack,
                    prick=EXCLUDED.prick,
                    final_notes=EXCLUDED.final_notes
+            RETURNING *
         """, ssc_val, rack_val, prick_val, final_val)
 
         # Confirm ephemeral
@@ -499,36 +632,13 @@ class RulesEditModal(discord.ui.Modal):
             delete_after=30.0
         )
 
-        # Attempt pinned message refresh
+        # Rebuild the shared snapshot once from the committed row, then refresh the pinned message
         cog = interaction.client.get_cog("RulesCog")
         if not cog:
             return
+        cog.set_rules_snapshot(row)
 
-        row = await interaction.client.db.fetchrow("SELECT * FROM rules_text WHERE id=1;")
-        if not row:
-            return
-
-        pinned_embed, ephemeral_pages = cog.build_rules_embeds(row)
-
-        if not (cog.rules_channel_id and cog.rules_message_id):
-            return
-
-        channel = interaction.client.get_channel(cog.rules_channel_id)
+        channel = interaction.client.get_channel(cog.rules_channel_id) if cog.rules_channel_id else None
         if not channel:
             return
-
-        try:
-            msg = await channel.fetch_message(cog.rules_message_id)
-        except discord.NotFound:
-            return
-
-        view = RulesEntryPointView(
-            bot=interaction.client,
-            ephemeral_pages=ephemeral_pages,
-            staff_channel_id=cog.staff_channel_log_id
-        )
-        await msg.edit(
-            content="Please read these rules. Then you may begin acceptance or unaccept below.",
-            embed=pinned_embed,
-            view=view
-        )
+        await cog.publish_rules_panel(channel)
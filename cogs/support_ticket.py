@@ -1,20 +1,249 @@
 import discord
 from discord.ext import commands, tasks
+from discord.commands import SlashCommandGroup
+from discord import Option
 from loguru import logger
 import datetime
-from typing import Optional, List
+import gzip
+import html
+import json
+import asyncio
+import tempfile
+import time
+from typing import Dict, Optional, List, Sequence, Set, Tuple
 
 # --------------------------------------
 # Constants & Helpers
 # --------------------------------------
 
 VERIFICATION_LOG_CHANNEL_ID = 1331573988584853524  # The channel for verification logs
-STAFF_ROLE_NAMES = ["Owner", "Underboss", "The Company", "Consigliere"] 
 
 YELLOW = 0xFFFF00
 GREEN = 0x00FF00
 RED = 0xFF0000
 
+VERIFICATION_APPROVALS_REQUIRED = 2  # Distinct staff approvals needed to verify a user
+REHYDRATE_CONCURRENCY = 5  # Parallel API calls while rehydrating verification views
+ARCHIVE_BATCH_SIZE = 500  # Flush the ticket message archive early once this many rows are buffered
+ARCHIVE_COLUMNS = [
+    "message_id", "thread_id", "author_id", "author_name", "content",
+    "attachment_urls", "created_at", "edited_at", "deleted",
+]
+ARCHIVE_CUTOVER_KEY = "ticket_archive_cutover"  # server_config key: threads created earlier predate the archive
+ARCHIVE_MAX_RETRIES = 5  # Consecutive failed flushes before a buffered batch is dropped
+ARCHIVE_INSERT_SQL = f"""
+    INSERT INTO ticket_messages ({", ".join(ARCHIVE_COLUMNS)})
+    SELECT {", ".join(ARCHIVE_COLUMNS)} FROM ticket_messages_stage
+    ON CONFLICT (message_id) DO NOTHING
+"""
+
+TRANSCRIPT_FORMATS = ("txt", "gz", "html")
+TRANSCRIPT_SPOOL_BYTES = 1024 * 1024  # Parts larger than this spill from memory to disk
+GZIP_SPLIT_MARGIN = 256 * 1024  # Headroom for compressed data still buffered inside zlib
+
+
+class TranscriptWriter:
+    """
+    Writes a transcript incrementally into spooled temp files, starting a new part
+    whenever the next line would push the current one past `part_limit` bytes.
+
+    Supported formats: plain text ("txt"), gzip-compressed text ("gz") and
+    HTML with attachment links ("html").
+    """
+
+    def __init__(self, name: str, fmt: str, part_limit: int):
+        self.name = name
+        self.fmt = fmt if fmt in TRANSCRIPT_FORMATS else "txt"
+        self.part_limit = part_limit
+        self.parts: List[tempfile.SpooledTemporaryFile] = []
+        self.line_count = 0
+        self.total_bytes = 0
+        self._spool = None
+        self._stream = None
+        self._part_bytes = 0
+
+    @property
+    def _header(self) -> bytes:
+        if self.fmt != "html":
+            return b""
+        title = html.escape(f"{self.name} (part {len(self.parts) + 1})")
+        return (
+            f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{title}</title></head>"
+            f"<body><h1>{title}</h1><ul>\n"
+        ).encode("utf-8")
+
+    @property
+    def _footer(self) -> bytes:
+        return b"</ul></body></html>\n" if self.fmt == "html" else b""
+
+    def _format(self, created_at: datetime.datetime, author: str, content: str,
+                attachment_urls: Sequence[str]) -> bytes:
+        stamp = f"{created_at:%Y-%m-%d %H:%M:%S}"
+        if self.fmt == "html":
+            links = "".join(
+                f' <a href="{html.escape(url)}">{html.escape(url.rsplit("/", 1)[-1].split("?")[0])}</a>'
+                for url in attachment_urls
+            )
+            line = (
+                f"<li><time>{stamp}</time> <b>{html.escape(author)}</b>: "
+                f"{html.escape(content)}{links}</li>\n"
+            )
+        else:
+            text = content or "[Attachment]"
+            if attachment_urls and content:
+                text += " [Attachment]"
+            line = f"[{stamp}] {author}: {text}\n"
+        return line.encode("utf-8")
+
+    def _used(self) -> int:
+        if self.fmt == "gz":
+            return self._spool.tell() + GZIP_SPLIT_MARGIN
+        return self._part_bytes
+
+    def _open_part(self):
+        self._spool = tempfile.SpooledTemporaryFile(max_size=TRANSCRIPT_SPOOL_BYTES)
+        self._stream = gzip.GzipFile(fileobj=self._spool, mode="wb") if self.fmt == "gz" else self._spool
+        self._part_bytes = 0
+        self._raw_write(self._header)
+
+    def _close_part(self):
+        self._raw_write(self._footer)
+        if self._stream is not self._spool:
+            self._stream.close()  # Flushes the gzip trailer; leaves the spool open
+        self.total_bytes += self._spool.tell()
+        self._spool.seek(0)
+        self.parts.append(self._spool)
+        self._spool = self._stream = None
+
+    def _raw_write(self, data: bytes):
+        if data:
+            self._stream.write(data)
+            self._part_bytes += len(data)
+
+    def write_message(self, msg: discord.Message):
+        self.write(msg.created_at, str(msg.author), msg.clean_content, [a.url for a in msg.attachments])
+
+    def write(self, created_at: datetime.datetime, author: str, content: str,
+              attachment_urls: Sequence[str] = ()):
+        data = self._format(created_at, author, content or "", attachment_urls or ())
+        if self._spool is None:
+            self._open_part()
+        elif self._part_bytes > len(self._header) and \
+                self._used() + len(data) + len(self._footer) > self.part_limit:
+            self._close_part()
+            self._open_part()
+        self._raw_write(data)
+        self.line_count += 1
+
+    def finish(self) -> List[discord.File]:
+        """Close the current part and return one `discord.File` per part."""
+        if self._spool is None:
+            self._open_part()
+        self._close_part()
+        ext = {"txt": "txt", "gz": "txt.gz", "html": "html"}[self.fmt]
+        if len(self.parts) == 1:
+            names = [f"{self.name}_transcript.{ext}"]
+        else:
+            names = [f"{self.name}_transcript_part{i}.{ext}" for i in range(1, len(self.parts) + 1)]
+        return [discord.File(fp, filename=name) for fp, name in zip(self.parts, names)]
+
+
+def current_log_embed(interaction: discord.Interaction) -> Optional[discord.Embed]:
+    """The embed currently shown on the interaction's message, if any (no API call)."""
+    if interaction.message and interaction.message.embeds:
+        return interaction.message.embeds[0]
+    return None
+
+
+# Closes an open ticket by thread and folds its resolution time into the hourly SLA rollup.
+CLOSE_TICKET_SQL = """
+    WITH closed AS (
+        UPDATE tickets
+           SET status = 'closed', closed_at = NOW()
+         WHERE thread_id = $1 AND status = 'open'
+        RETURNING id, user_id, kind, created_at, closed_at, first_responder_id
+    ), rollup AS (
+        INSERT INTO ticket_sla_hourly (hour, staff_id, category, resolutions, resolution_secs)
+        SELECT date_trunc('hour', closed_at), COALESCE(first_responder_id, 0), COALESCE(kind, 'support'),
+               1, GREATEST(0, EXTRACT(EPOCH FROM closed_at - created_at))::bigint
+          FROM closed
+        ON CONFLICT (hour, staff_id, category) DO UPDATE
+           SET resolutions = ticket_sla_hourly.resolutions + 1,
+               resolution_secs = ticket_sla_hourly.resolution_secs + EXCLUDED.resolution_secs
+    )
+    SELECT id, user_id, kind FROM closed
+"""
+
+# Records the first staff reply on a ticket and folds the wait into the hourly SLA rollup.
+FIRST_RESPONSE_SQL = """
+    WITH responded AS (
+        UPDATE tickets
+           SET first_staff_response_at = NOW(), first_responder_id = $2
+         WHERE thread_id = $1 AND status = 'open'
+           AND first_staff_response_at IS NULL
+           AND user_id IS DISTINCT FROM $2
+        RETURNING kind, created_at, first_staff_response_at
+    )
+    INSERT INTO ticket_sla_hourly (hour, staff_id, category, first_responses, first_response_secs)
+    SELECT date_trunc('hour', first_staff_response_at), $2, COALESCE(kind, 'support'),
+           1, GREATEST(0, EXTRACT(EPOCH FROM first_staff_response_at - created_at))::bigint
+      FROM responded
+    ON CONFLICT (hour, staff_id, category) DO UPDATE
+       SET first_responses = ticket_sla_hourly.first_responses + 1,
+           first_response_secs = ticket_sla_hourly.first_response_secs + EXCLUDED.first_response_secs
+"""
+
+
+# Stores a closed ticket's archived messages as one searchable transcript row.
+STORE_TRANSCRIPT_SQL = """
+    INSERT INTO ticket_transcripts (ticket_id, thread_id, opener_id, kind, body)
+    SELECT t.id, t.thread_id, t.user_id, t.kind,
+           string_agg(
+               to_char(m.created_at, 'YYYY-MM-DD HH24:MI:SS') || ' ' || m.author_name || ': ' || COALESCE(m.content, ''),
+               E'\\n' ORDER BY m.message_id
+           )
+      FROM tickets t
+      JOIN ticket_messages m ON m.thread_id = t.thread_id AND NOT m.deleted
+     WHERE t.id = $1 AND COALESCE(t.kind, 'support') = 'support'
+     GROUP BY t.id
+    ON CONFLICT (ticket_id) DO UPDATE
+       SET body = EXCLUDED.body, closed_at = NOW()
+"""
+
+# Ranked transcript search with keyset pagination on (rank, ticket_id).
+# Snippets are only computed for the rows on the requested page.
+SEARCH_TRANSCRIPTS_SQL = """
+    SELECT p.ticket_id, p.thread_id, p.opener_id, p.kind, p.closed_at, p.rank,
+           ts_headline('english', tt.body, p.q,
+                       'MaxFragments=2, MaxWords=18, MinWords=6, StartSel=**, StopSel=**') AS snippet
+      FROM (
+            SELECT tt.ticket_id, tt.thread_id, tt.opener_id, tt.kind, tt.closed_at,
+                   ts_rank(tt.search, q) AS rank, q
+              FROM ticket_transcripts tt, websearch_to_tsquery('english', $1) q
+             WHERE tt.search @@ q
+               AND ($2::real IS NULL OR (ts_rank(tt.search, q), tt.ticket_id) < ($2::real, $3::int))
+             ORDER BY rank DESC, tt.ticket_id DESC
+             LIMIT $4
+           ) p
+      JOIN ticket_transcripts tt ON tt.ticket_id = p.ticket_id
+     ORDER BY p.rank DESC, p.ticket_id DESC
+"""
+SEARCH_PAGE_SIZE = 5
+
+
+def format_duration(seconds: float) -> str:
+    """Short human-readable duration, e.g. '2h 05m' or '45s'."""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, _ = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m"
+    days, hours = divmod(hours, 24)
+    return f"{days}d {hours:02d}h"
+
+
 # In-memory store for active verification approvals:
 # Maps verification_request_id -> set of staff_user_ids that have clicked Approve
 verification_approvals = {}
@@ -24,91 +253,572 @@ verification_approvals = {}
 # --------------------------------------
 
 class SupportTicketCog(commands.Cog):
+    support_group = SlashCommandGroup("support", "Support ticket tools.")
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.support_channel_id = bot.config.get("support_channel_id")  # 'contact-the-boss' channel
         self.staff_verification_channel_id = bot.config.get("staff_verification_channel_id", VERIFICATION_LOG_CHANNEL_ID)
-        self.staff_roles = bot.config.get("staff_roles", STAFF_ROLE_NAMES)
         self.transcripts_enabled = bot.config.get("support_ticket_transcripts_enabled", True)
+        self.transcript_format = bot.config.get("support_ticket_transcript_format", "txt")  # txt, gz or html
         self.inactivity_limit = bot.config.get("suport_ticklet_inactivity_limit", 48)
         self.kick_on_rejection = bot.config.get("verification_kick_on_rejection", False)  # from config.json
+
+        # Latest message time per ticket thread, flushed to tickets.last_activity_at once a minute
+        # so busy threads cost at most one write per minute.
+        self.pending_activity: Dict[int, datetime.datetime] = {}
+
+        # Ticket thread messages waiting to be COPY'd into ticket_messages, keyed by message_id
+        # so edits and deletes that arrive before the flush are applied in place.
+        self.archive_buffer: Dict[int, list] = {}
+        self.archive_lock = asyncio.Lock()
+        self.archive_failures = 0
+        self.archive_cutover: Optional[int] = None
+
+        # Threads whose first staff response is already recorded (skips the DB on later replies)
+        self.responded_threads: Set[int] = set()
+
+        # Open tickets from before thread_id was stored are linked once by the cleanup loop
+        self.thread_ids_backfilled = False
+
+        # verification_id -> partial handle on its log message, so decisions edit it directly
+        self.verification_log_messages: Dict[int, discord.PartialMessage] = {}
+
+        self.activity_flush_loop.start()
+        self.archive_flush_loop.start()
         self.ticket_cleanup_loop.start()
 
-    @tasks.loop(hours=1)
-    async def ticket_cleanup_loop(self):
-        """Automatically closes inactive tickets in the support channel (if used for standard tickets)."""
-        if not self.support_channel_id:
+    def cog_unload(self):
+        self.activity_flush_loop.cancel()
+        self.archive_flush_loop.cancel()
+        self.ticket_cleanup_loop.cancel()
+
+    @commands.Cog.listener()
+    async def on_config_changed(self, keys):
+        """Pick up hot-reloaded settings that are read on every ticket."""
+        config = self.bot.config
+        self.transcripts_enabled = config.get("support_ticket_transcripts_enabled", True)
+        self.transcript_format = config.get("support_ticket_transcript_format", "txt")
+        self.inactivity_limit = config.get("suport_ticklet_inactivity_limit", 48)
+        self.kick_on_rejection = config.get("verification_kick_on_rejection", False)
+
+    def is_staff(self, member: discord.Member) -> bool:
+        """Check if the member has any of the configured staff roles (by name or ID)."""
+        return self.bot.role_index.is_staff(member)
+
+    def is_ticket_thread(self, channel) -> bool:
+        return isinstance(channel, discord.Thread) and channel.parent_id == self.support_channel_id
+
+    @staticmethod
+    def is_verification_thread(channel) -> bool:
+        # Verification threads hold ID images and answers; they are never archived.
+        return channel.name.startswith("verification-")
+
+    @staticmethod
+    def _utc_naive(dt: datetime.datetime) -> datetime.datetime:
+        return dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        """Record activity and archive messages in ticket and verification threads."""
+        channel = message.channel
+        if not self.is_ticket_thread(channel):
+            return
+        created_at = self._utc_naive(message.created_at)
+        self.pending_activity[channel.id] = created_at
+        if (not message.author.bot and channel.id not in self.responded_threads
+                and isinstance(message.author, discord.Member) and self.is_staff(message.author)):
+            self.responded_threads.add(channel.id)
+            try:
+                await self.bot.db.execute(FIRST_RESPONSE_SQL, channel.id, message.author.id)
+            except Exception as e:
+                self.responded_threads.discard(channel.id)
+                logger.exception(f"Failed to record first staff response in thread {channel.id}: {e}")
+        if self.is_verification_thread(channel):
             return
+        self.buffer_archived_message(message)
+        if len(self.archive_buffer) >= ARCHIVE_BATCH_SIZE:
+            await self.flush_archive()
+
+    def buffer_archived_message(self, message: discord.Message):
+        """Queue a ticket thread message for the next archive flush (no-op if already queued)."""
+        self.archive_buffer.setdefault(message.id, [
+            message.id,
+            message.channel.id,
+            message.author.id,
+            str(message.author),
+            message.clean_content,
+            [a.url for a in message.attachments],
+            self._utc_naive(message.created_at),
+            self._utc_naive(message.edited_at) if message.edited_at else None,
+            False,  # deleted
+        ])
 
-        support_channel = self.bot.get_channel(self.support_channel_id)
-        if not support_channel:
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        """Apply edits to archived ticket messages. Edits store the raw (unresolved) content."""
+        if "content" not in payload.data or not self.is_ticket_thread(self.bot.get_channel(payload.channel_id)):
             return
+        content = payload.data["content"]
+        edited_at = datetime.datetime.utcnow()
+        async with self.archive_lock:
+            buffered = self.archive_buffer.get(payload.message_id)
+            if buffered is not None:
+                buffered[4] = content
+                buffered[7] = edited_at
+                return
+            await self.bot.db.execute(
+                "UPDATE ticket_messages SET content = $1, edited_at = $2 WHERE message_id = $3",
+                content, edited_at, payload.message_id
+            )
 
-        now = datetime.datetime.now(datetime.timezone.utc)
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        await self.mark_archived_deleted(payload.channel_id, [payload.message_id])
 
-        # Use a normal `for` instead of `async for` since threads is just a list
-        for thread in support_channel.threads:
-            if thread.archived:
-                continue
-            
-            # Guard: If there's no last_message_id, skip it
-            if not thread.last_message_id:
-                continue
-            
-            # Fetch the last message in the thread
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        await self.mark_archived_deleted(payload.channel_id, list(payload.message_ids))
+
+    async def mark_archived_deleted(self, channel_id: int, message_ids: List[int]):
+        """Flag archived ticket messages as deleted; they stay in the archive for transcripts."""
+        if not self.is_ticket_thread(self.bot.get_channel(channel_id)):
+            return
+        async with self.archive_lock:
+            remaining = []
+            for message_id in message_ids:
+                buffered = self.archive_buffer.get(message_id)
+                if buffered is not None:
+                    buffered[8] = True
+                else:
+                    remaining.append(message_id)
+            if remaining:
+                await self.bot.db.execute(
+                    "UPDATE ticket_messages SET deleted = TRUE WHERE message_id = ANY($1::bigint[])",
+                    remaining
+                )
+
+    @tasks.loop(seconds=5)
+    async def archive_flush_loop(self):
+        await self.flush_archive()
+
+    @archive_flush_loop.after_loop
+    async def after_archive_flush_loop(self):
+        # Runs when the loop is cancelled on unload, so buffered messages aren't lost.
+        await self.flush_archive()
+
+    async def flush_archive(self):
+        """
+        COPY buffered ticket messages into a staging table, then insert them into
+        ticket_messages in one statement. Rows already archived (e.g. a message seen
+        twice) are skipped instead of failing the whole batch.
+
+        A batch that keeps failing is re-queued at most ARCHIVE_MAX_RETRIES times and then
+        dropped with an error.
+        """
+        async with self.archive_lock:
+            if not self.archive_buffer:
+                return
+            batch, self.archive_buffer = self.archive_buffer, {}
             try:
-                last_message = await thread.fetch_message(thread.last_message_id)
-            except discord.NotFound:
-                # The message may have been deleted or couldn't be fetched
-                continue
-            
-            if not last_message:
-                continue
-            
-            # Calculate inactivity
-            last_activity = last_message.created_at
-            inactivity_duration = (now - last_activity).total_seconds() / 3600
-            if inactivity_duration >= self.inactivity_limit:
-                await self.close_ticket(thread, "closed due to inactivity")
+                async with self.bot.db.pool.acquire() as conn:
+                    async with conn.transaction():
+                        await conn.execute(
+                            "CREATE TEMP TABLE ticket_messages_stage "
+                            "(LIKE ticket_messages INCLUDING DEFAULTS) ON COMMIT DROP"
+                        )
+                        await conn.copy_records_to_table(
+                            "ticket_messages_stage",
+                            records=[tuple(r) for r in batch.values()],
+                            columns=ARCHIVE_COLUMNS
+                        )
+                        await conn.execute(ARCHIVE_INSERT_SQL)
+                self.archive_failures = 0
+            except asyncio.CancelledError:
+                self.requeue_archive(batch)
+                raise
+            except Exception as e:
+                self.archive_failures += 1
+                if self.archive_failures <= ARCHIVE_MAX_RETRIES:
+                    logger.exception(f"Failed to archive {len(batch)} ticket messages: {e}")
+                    self.requeue_archive(batch)
+                else:
+                    logger.error(
+                        f"Dropping {len(batch)} ticket messages after {self.archive_failures} failed "
+                        f"archive attempts: {e} (message IDs {min(batch)}..{max(batch)})"
+                    )
+                    self.archive_failures = 0
+
+    def requeue_archive(self, batch: Dict[int, list]):
+        # Anything buffered again while the write was in flight is newer; keep it.
+        for message_id, record in batch.items():
+            self.archive_buffer.setdefault(message_id, record)
+
+    @tasks.loop(minutes=1)
+    async def activity_flush_loop(self):
+        """Write buffered thread activity to the tickets table in a single statement."""
+        await self.flush_activity()
+
+    async def flush_activity(self):
+        if not self.pending_activity:
+            return
+        pending, self.pending_activity = self.pending_activity, {}
+        try:
+            await self.bot.db.execute(
+                """
+                UPDATE tickets t
+                   SET last_activity_at = GREATEST(t.last_activity_at, a.at)
+                  FROM unnest($1::bigint[], $2::timestamp[]) AS a(thread_id, at)
+                 WHERE t.thread_id = a.thread_id
+                   AND t.status = 'open'
+                """,
+                list(pending.keys()),
+                list(pending.values())
+            )
+        except Exception as e:
+            logger.exception(f"Failed to flush ticket activity: {e}")
+            # Re-queue, keeping anything newer that arrived while the write was in flight.
+            for thread_id, at in pending.items():
+                self.pending_activity.setdefault(thread_id, at)
+
+    async def backfill_ticket_threads(self) -> bool:
+        """
+        Link open support tickets created before `tickets.thread_id` existed to their
+        threads, so the inactivity sweep covers them. Threads are matched by the
+        `ticket-<name>-#<id>` naming scheme among the support channel's active and
+        archived private threads, and `last_activity_at` is set from the thread's last
+        message. Once the thread list was read completely, legacy tickets whose thread
+        no longer exists are closed, as the sweep does for deleted threads.
+
+        Returns True when nothing is left to backfill.
+        """
+        legacy = await self.bot.db.fetch(
+            "SELECT id FROM tickets WHERE status = 'open' AND thread_id IS NULL AND kind = 'support'"
+        )
+        if not legacy:
+            return True
+        channel = self.bot.get_channel(self.support_channel_id) if self.support_channel_id else None
+        if channel is None:
+            return False
+
+        wanted = {row["id"] for row in legacy}
+        found: Dict[int, discord.Thread] = {}
+
+        def match(thread: discord.Thread):
+            if not thread.name.startswith("ticket-"):
+                return
+            try:
+                ticket_id = int(thread.name.rsplit("#", 1)[-1])
+            except ValueError:
+                return
+            if ticket_id in wanted:
+                found.setdefault(ticket_id, thread)
+
+        for thread in channel.threads:
+            match(thread)
+        complete = True
+        if len(found) < len(wanted):
+            try:
+                async for thread in channel.archived_threads(private=True, limit=None):
+                    match(thread)
+                    if len(found) == len(wanted):
+                        break
+            except discord.HTTPException as e:
+                complete = False
+                logger.warning(f"Could not list archived ticket threads for the thread_id backfill: {e}")
+
+        if found:
+            ids = list(found)
+            await self.bot.db.execute(
+                """
+                UPDATE tickets t
+                   SET thread_id = b.thread_id,
+                       last_activity_at = COALESCE(b.at, t.last_activity_at)
+                  FROM unnest($1::int[], $2::bigint[], $3::timestamp[]) AS b(id, thread_id, at)
+                 WHERE t.id = b.id AND t.thread_id IS NULL
+                """,
+                ids,
+                [found[i].id for i in ids],
+                [
+                    self._utc_naive(discord.utils.snowflake_time(found[i].last_message_id))
+                    if found[i].last_message_id else None
+                    for i in ids
+                ]
+            )
+        missing = wanted - set(found)
+        if missing and complete:
+            await self.bot.db.execute(
+                "UPDATE tickets SET status = 'closed', closed_at = NOW() WHERE id = ANY($1::int[]) AND status = 'open'",
+                list(missing)
+            )
+        logger.info(
+            f"Ticket thread backfill: linked {len(found)} legacy ticket(s)"
+            + (f", closed {len(missing)} whose thread is gone" if missing and complete else "")
+            + "."
+        )
+        return complete or not missing
+
+    @tasks.loop(hours=1)
+    async def ticket_cleanup_loop(self):
+        """Automatically closes tickets whose last recorded activity is older than the inactivity limit."""
+        if not self.thread_ids_backfilled:
+            try:
+                self.thread_ids_backfilled = await self.backfill_ticket_threads()
+            except Exception as e:
+                logger.exception(f"Ticket thread backfill failed: {e}")
+        await self.flush_activity()
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(hours=self.inactivity_limit)
+        rows = await self.bot.db.fetch(
+            """
+            SELECT id, thread_id, kind
+              FROM tickets
+             WHERE status = 'open'
+               AND thread_id IS NOT NULL
+               AND last_activity_at < $1
+            """,
+            cutoff
+        )
+        for row in rows:
+            thread = self.bot.get_channel(row["thread_id"])
+            if thread is None:
+                try:
+                    thread = await self.bot.fetch_channel(row["thread_id"])
+                except (discord.NotFound, discord.Forbidden):
+                    # The thread is gone; close it and keep whatever was archived (support tickets only).
+                    await self.bot.db.execute(CLOSE_TICKET_SQL, row["thread_id"])
+                    if row["kind"] == "verification":
+                        await self.purge_archived_thread(row["thread_id"])
+                    else:
+                        await self.store_transcript(row["id"])
+                    continue
+            await self.close_ticket(thread, "closed due to inactivity")
+
+    @activity_flush_loop.before_loop
+    @archive_flush_loop.before_loop
+    @ticket_cleanup_loop.before_loop
+    async def before_ticket_loops(self):
+        await self.bot.wait_until_ready()
 
     async def close_ticket(self, thread: discord.Thread, reason: str):
         """Closes a ticket thread and optionally sends a transcript (for support tickets)."""
-        await thread.edit(archived=True, locked=True)
-        if self.transcripts_enabled:
-            transcript = await self.generate_transcript(thread)
-            # If it's a normal "ticket-" thread, fetch from tickets table
-            if thread.name.startswith("ticket-"):
-                ticket_id = int(thread.name.split("-")[-1])
-                opener = await self.bot.db.fetchval(
-                    "SELECT user_id FROM tickets WHERE id = $1", ticket_id
-                )
-                if opener:
-                    opener_user = self.bot.get_user(opener) or await self.bot.fetch_user(opener)
-                    if opener_user:
-                        try:
-                            await opener_user.send(
-                                f"Your ticket '{thread.name}' was {reason}. Here is the transcript:",
-                                file=discord.File(transcript, filename=f"{thread.name}_transcript.txt")
-                            )
-                        except discord.Forbidden:
-                            pass
+        self.pending_activity.pop(thread.id, None)
+        self.responded_threads.discard(thread.id)
+        thread = await thread.edit(archived=True, locked=True)
+        ticket = await self.bot.db.fetchrow(CLOSE_TICKET_SQL, thread.id)
+        if ticket and ticket["kind"] == "verification":
+            # Verification conversations are never stored or made searchable.
+            await self.purge_archived_thread(thread.id)
+        elif ticket:
+            await self.ensure_archive_complete(thread)
+            await self.store_transcript(ticket["id"])
+        # Only normal support tickets get a transcript sent to the opener.
+        if self.transcripts_enabled and ticket and ticket["kind"] == "support" and ticket["user_id"]:
+            files = await self.generate_transcript(thread)
+            opener = ticket["user_id"]
+            opener_user = self.bot.get_user(opener) or await self.bot.fetch_user(opener)
+            if opener_user:
+                try:
+                    # Discord allows at most 10 attachments per message.
+                    for i in range(0, len(files), 10):
+                        await opener_user.send(
+                            f"Your ticket '{thread.name}' was {reason}. Here is the transcript:" if i == 0 else None,
+                            files=files[i:i + 10]
+                        )
+                except discord.Forbidden:
+                    pass
+                finally:
+                    for f in files:
+                        f.close()
 
-                await self.bot.db.execute(
-                    "UPDATE tickets SET status = $1, closed_at = NOW() WHERE id = $2",
-                    "closed",
-                    ticket_id
-                )
+    async def store_transcript(self, ticket_id: int):
+        """Index a closed support ticket's archived messages for /support search (verification tickets are skipped)."""
+        await self.flush_archive()
+        try:
+            await self.bot.db.execute(STORE_TRANSCRIPT_SQL, ticket_id)
+        except Exception as e:
+            logger.exception(f"Failed to store transcript for ticket {ticket_id}: {e}")
+
+    async def search_transcripts(self, query: str, after: Optional[tuple] = None):
+        """One page of ranked search results; `after` is the (rank, ticket_id) of the last row seen."""
+        rank, ticket_id = after if after else (None, None)
+        return await self.bot.db.fetch(SEARCH_TRANSCRIPTS_SQL, query, rank, ticket_id, SEARCH_PAGE_SIZE + 1)
+
+    def build_search_embed(self, query: str, rows, page: int) -> discord.Embed:
+        embed = discord.Embed(title=f"Ticket search: {query}", color=discord.Color.blurple())
+        if not rows:
+            embed.description = "No matching tickets." if page == 1 else "No more results."
+            return embed
+        guild_id = self.bot.config.get("guild_id")
+        for r in rows:
+            link = f"https://discord.com/channels/{guild_id}/{r['thread_id']}" if r["thread_id"] else "n/a"
+            closed = r["closed_at"].strftime("%Y-%m-%d") if r["closed_at"] else "?"
+            embed.add_field(
+                name=f"#{r['ticket_id']} · {r['kind'] or 'support'} · closed {closed}",
+                value=f"<@{r['opener_id']}> – [thread]({link})\n{(r['snippet'] or '')[:900]}",
+                inline=False
+            )
+        embed.set_footer(text=f"Page {page}")
+        return embed
 
-    async def generate_transcript(self, thread: discord.Thread) -> str:
-        """Generates a transcript for a thread."""
-        messages = []
+    @support_group.command(name="search", description="Search closed ticket transcripts (staff only).")
+    @commands.has_any_role("Boss", "Underboss", "Consigliere")
+    async def support_search(
+        self,
+        ctx: discord.ApplicationContext,
+        query: Option(str, "Words or phrases to find (supports \"quotes\", OR, -exclude)")
+    ):
+        """Ranked full-text search over archived transcripts, paged with a Next button."""
+        await ctx.defer(ephemeral=True)
+        rows = await self.search_transcripts(query)
+        view = TicketSearchView(self, query, rows)
+        await ctx.followup.send(embed=view.current_embed(), view=view if view.has_more else None, ephemeral=True)
+
+    @support_group.command(name="stats", description="Ticket response and resolution times (staff only).")
+    @commands.has_any_role("Boss", "Underboss", "Consigliere")
+    async def support_stats(
+        self,
+        ctx: discord.ApplicationContext,
+        days: Option(int, "How many days to include", default=7, min_value=1, max_value=365)
+    ):
+        """
+        Summarizes SLA numbers from the hourly rollups only, so it stays fast
+        regardless of how many tickets exist.
+        """
+        await ctx.defer(ephemeral=True)
+        by_category = await self.bot.db.fetch(
+            """
+            SELECT category,
+                   SUM(first_responses) AS responses, SUM(first_response_secs) AS response_secs,
+                   SUM(resolutions) AS resolutions, SUM(resolution_secs) AS resolution_secs
+              FROM ticket_sla_hourly
+             WHERE hour >= date_trunc('hour', NOW()::timestamp - make_interval(days => $1))
+             GROUP BY category
+             ORDER BY category
+            """,
+            days
+        )
+        by_staff = await self.bot.db.fetch(
+            """
+            SELECT staff_id,
+                   SUM(first_responses) AS responses, SUM(first_response_secs) AS response_secs,
+                   SUM(resolutions) AS resolutions
+              FROM ticket_sla_hourly
+             WHERE hour >= date_trunc('hour', NOW()::timestamp - make_interval(days => $1))
+               AND staff_id <> 0
+             GROUP BY staff_id
+             ORDER BY responses DESC
+             LIMIT 10
+            """,
+            days
+        )
+        if not by_category:
+            return await ctx.followup.send(f"No ticket activity recorded in the last {days} days.", ephemeral=True)
+
+        embed = discord.Embed(title=f"Support Stats – last {days} days", color=discord.Color.blurple())
+        for r in by_category:
+            avg_response = format_duration(r["response_secs"] / r["responses"]) if r["responses"] else "n/a"
+            avg_resolution = format_duration(r["resolution_secs"] / r["resolutions"]) if r["resolutions"] else "n/a"
+            embed.add_field(
+                name=r["category"].title(),
+                value=(
+                    f"**First responses:** {r['responses']} (avg {avg_response})\n"
+                    f"**Resolved:** {r['resolutions']} (avg {avg_resolution})"
+                ),
+                inline=False
+            )
+        if by_staff:
+            lines = [
+                f"<@{r['staff_id']}> – {r['responses']} first responses "
+                f"(avg {format_duration(r['response_secs'] / r['responses']) if r['responses'] else 'n/a'}), "
+                f"{r['resolutions']} resolved"
+                for r in by_staff
+            ]
+            embed.add_field(name="By Staff", value="\n".join(lines), inline=False)
+        await ctx.followup.send(embed=embed, ephemeral=True)
+
+    async def load_archive_cutover(self) -> int:
+        """
+        Snowflake of the moment the archive started covering new threads, stored once in
+        server_config. Threads created earlier may be missing messages from the archive.
+        """
+        if self.archive_cutover is None:
+            raw = await self.bot.db.fetchval(
+                """
+                INSERT INTO server_config (key, value) VALUES ($1, $2::jsonb)
+                ON CONFLICT (key) DO UPDATE SET value = server_config.value
+                RETURNING value::text
+                """,
+                ARCHIVE_CUTOVER_KEY,
+                json.dumps(discord.utils.time_snowflake(discord.utils.utcnow()))
+            )
+            self.archive_cutover = int(json.loads(raw))
+        return self.archive_cutover
+
+    async def archive_is_complete(self, thread: discord.Thread) -> bool:
+        """
+        Whether ticket_messages can be trusted to hold the whole thread: true for every
+        thread created after the archive cutover. No Discord API call is made.
+        """
+        return thread.id >= await self.load_archive_cutover()
+
+    async def backfill_archive(self, thread: discord.Thread) -> int:
+        """Copy the thread's Discord history into ticket_messages; archived rows are kept as they are."""
+        count = 0
         async for msg in thread.history(limit=None, oldest_first=True):
-            messages.append(msg)
-        transcript = "\n".join(
-            f"[{msg.created_at:%Y-%m-%d %H:%M:%S}] {msg.author}: {msg.clean_content or '[Attachment]'}"
-            for msg in messages
+            self.buffer_archived_message(msg)
+            count += 1
+            if len(self.archive_buffer) >= ARCHIVE_BATCH_SIZE:
+                await self.flush_archive()
+        await self.flush_archive()
+        return count
+
+    async def ensure_archive_complete(self, thread: discord.Thread):
+        """Copy a pre-archive thread's Discord history into the archive before it is indexed or transcribed."""
+        try:
+            if await self.archive_is_complete(thread):
+                return
+            started = time.perf_counter()
+            count = await self.backfill_archive(thread)
+            logger.info(
+                f"Backfilled the archive for {thread.name} from {count} history messages "
+                f"in {time.perf_counter() - started:.2f}s."
+            )
+        except discord.HTTPException as e:
+            logger.warning(f"Could not read history to complete the archive for {thread.name}: {e}")
+
+    async def generate_transcript(self, thread: discord.Thread) -> List[discord.File]:
+        """
+        Builds one or more transcript files for a thread, split so each part fits under the
+        guild's upload limit.
+
+        Rows come from the local ticket_messages archive through a server-side cursor, so
+        only one page is held in memory. For threads created before the archive existed,
+        `close_ticket()` first copies the Discord history into the archive.
+        """
+        started = time.perf_counter()
+        writer = TranscriptWriter(thread.name, self.transcript_format, thread.guild.filesize_limit)
+        await self.flush_archive()
+        async with self.bot.db.pool.acquire() as conn:
+            async with conn.transaction():
+                cursor = conn.cursor(
+                    """
+                    SELECT created_at, author_name, content, attachment_urls
+                      FROM ticket_messages
+                     WHERE thread_id = $1 AND NOT deleted
+                     ORDER BY message_id
+                    """,
+                    thread.id,
+                    prefetch=100
+                )
+                async for row in cursor:
+                    writer.write(row["created_at"], row["author_name"], row["content"], row["attachment_urls"])
+
+        files = writer.finish()
+        logger.info(
+            f"Transcript for {thread.name}: {writer.line_count} messages, {len(files)} part(s), "
+            f"{writer.total_bytes} bytes ({writer.fmt}) in {time.perf_counter() - started:.2f}s."
         )
-        return transcript
+        return files
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -116,6 +826,9 @@ class SupportTicketCog(commands.Cog):
         if not self.support_channel_id:
             return
 
+        # Record when the archive started covering new threads (first start only).
+        await self.load_archive_cutover()
+
         support_channel = self.bot.get_channel(self.support_channel_id)
         if not support_channel:
             return
@@ -123,50 +836,67 @@ class SupportTicketCog(commands.Cog):
         view = SplashContactView(bot=self.bot)
         self.bot.add_view(view)  # Make the view persistent across restarts
 
-
-        embed = self.build_support_embed()
-        async for msg in support_channel.history(limit=50):
-            if (msg.author == self.bot.user) and ("Support Instructions" in msg.content or "Support System" in msg.content):
-                await msg.edit(
-                    content="Support Instructions",
-                    embed=embed,
-                    view=view
-                )
-                logger.debug(f"Reattached to existing support modal message: {msg.id}")
-                break
-        else:
-            await support_channel.send(
-                content="Support Instructions",
-                embed=embed,
-                view=view
-            )
-            logger.debug(f"No support ticket view - creating a new one.")
-
+        # Edits (or re-sends) the splash only if its content changed since the last run.
+        await self.bot.panels.publish(
+            "support_splash",
+            support_channel,
+            content="Support Instructions",
+            embed=self.build_support_embed(),
+            view=view,
+            legacy=await self.find_legacy_splash(support_channel)
+        )
 
         # Attempt to reattach views for any pending verification requests
         await self.reattach_pending_verification_views()
 
+    async def find_legacy_splash(self, channel: discord.TextChannel) -> Optional[Tuple[int, int]]:
+        """
+        (channel_id, message_id) of a splash posted before the panel registry existed, so it
+        is adopted instead of duplicated. Only scans history while the registry has no handle.
+        """
+        if self.bot.panels.get("support_splash") is not None:
+            return None
+        async for msg in channel.history(limit=50):
+            if msg.author == self.bot.user and ("Support Instructions" in msg.content or "Support System" in msg.content):
+                logger.debug(f"Adopting existing support splash message {msg.id}.")
+                return channel.id, msg.id
+        return None
+
     async def reattach_pending_verification_views(self):
         """
         Called in on_ready to reattach the view for all pending verification logs.
         Also rehydrate partial approvals so the Approve button says (1/2) if needed.
+
+        Pending requests and their approval counts come from one query, users are resolved
+        in bulk, and only messages whose buttons differ from the freshly posted state
+        (0/2) are re-edited, a few at a time.
         """
         records = await self.bot.db.fetch(
             """
-            SELECT id, user_id, log_message_id
-              FROM verification_requests
-             WHERE status = 'pending'
-               AND log_message_id IS NOT NULL
+            SELECT r.id, r.user_id, r.log_message_id, COUNT(a.staff_id) AS approved_count
+              FROM verification_requests r
+              LEFT JOIN verification_approvals a ON a.verification_id = r.id
+             WHERE r.status = 'pending'
+               AND r.log_message_id IS NOT NULL
+               AND r.log_message_id <> 0
+             GROUP BY r.id
             """
         )
+        if not records:
+            return
+
+        started = time.perf_counter()
+        users = await self.resolve_users({row["user_id"] for row in records})
 
+        to_edit = []
         for row in records:
             verification_id = row["id"]
-            user_id = row["user_id"]
             message_id = row["log_message_id"]
-
-            # Fetch the user object
-            user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+            approved_count = row["approved_count"]
+            user = users.get(row["user_id"])
+            if user is None:
+                logger.warning(f"Could not resolve user {row['user_id']} for verification {verification_id}.")
+                continue
 
             # Create the view
             view = VerificationLogView(
@@ -175,52 +905,194 @@ class SupportTicketCog(commands.Cog):
                 user=user
             )
 
-            # Here we re-check how many staff have already approved
-            approved_count = await self.bot.db.fetchval(
-                """
-                SELECT COUNT(*) FROM verification_approvals
-                 WHERE verification_id = $1
-                """,
-                verification_id
-            )
-
-            # Adjust the Approve button label & emoji based on that count
-            # The Approve button is the second item in the view's children by default, but
-            # search by type or custom_id to be sure:
-            approve_button = None
-            for child in view.children:
-                if isinstance(child, discord.ui.Button) and "Approve" in child.label:
-                    approve_button = child
-                    break
-
-            if approve_button:
-                if approved_count == 1:
-                    approve_button.label = "Approve (1/2)"
-                    approve_button.emoji = "1️⃣"
-                elif approved_count >= 2:
-                    # It's already fully approved, or beyond
-                    # Typically we wouldn't even attach a live view if it's done,
-                    # but if you'd like to display it, you can disable the buttons:
-                    approve_button.label = "Approve (2/2)"
-                    approve_button.emoji = "2️⃣"
-                    for child in view.children:
-                        child.disabled = True
-
-            # Finally, attach the view to the original message
+            # Adjust the Approve button label & emoji based on the approval count
+            approve_button = view.approve_button
+            if approved_count == 1:
+                approve_button.label = "Approve (1/2)"
+                approve_button.emoji = "1️⃣"
+            elif approved_count >= 2:
+                # It's already fully approved, or beyond; show it but disable the buttons.
+                approve_button.label = "Approve (2/2)"
+                approve_button.emoji = "2️⃣"
+                for child in view.children:
+                    child.disabled = True
+
+            # Attach the view to the original message
             self.bot.add_view(view, message_id=message_id)
-
             logger.debug(f"Reattached to existing verification view: {message_id}.")
 
-            # Optional: fetch the message and forcibly re-edit it with the updated label
-            # so the new label is visible. Some older clients need a forced re-edit:
-            verif_log_channel = self.bot.get_channel(self.staff_verification_channel_id)
-            if verif_log_channel:
+            # A message with no approvals still shows the buttons it was posted with.
+            if approved_count:
+                to_edit.append((verification_id, message_id, view))
+
+        # Force a re-edit where the label changed so older clients show it.
+        semaphore = asyncio.Semaphore(REHYDRATE_CONCURRENCY)
+
+        async def refresh(verification_id: int, message_id: int, view: discord.ui.View):
+            msg = self.get_verification_log_message(verification_id, message_id)
+            if not msg:
+                return
+            async with semaphore:
                 try:
-                    msg = await verif_log_channel.fetch_message(message_id)
                     await msg.edit(view=view)
-                except:
-                    pass
+                except discord.HTTPException as e:
+                    logger.debug(f"Could not refresh verification view {message_id}: {e}")
+
+        await asyncio.gather(*(refresh(*item) for item in to_edit))
+        logger.info(
+            f"Rehydrated {len(records)} verification views ({len(to_edit)} re-edited) "
+            f"in {time.perf_counter() - started:.2f}s."
+        )
+
+    async def resolve_users(self, user_ids) -> Dict[int, discord.abc.User]:
+        """
+        Resolve many user IDs at once: guild member cache first, then one gateway member
+        query per 100 missing IDs, then concurrent REST lookups for users no longer in the guild.
+        """
+        resolved: Dict[int, discord.abc.User] = {}
+        guild = self.bot.get_guild(self.bot.config.get("guild_id"))
+        missing = []
+        for user_id in user_ids:
+            member = guild.get_member(user_id) if guild else None
+            if member:
+                resolved[user_id] = member
+            else:
+                missing.append(user_id)
+
+        if guild and missing:
+            for i in range(0, len(missing), 100):
+                try:
+                    members = await guild.query_members(user_ids=missing[i:i + 100], cache=True)
+                except (asyncio.TimeoutError, discord.ClientException) as e:
+                    logger.debug(f"Member query failed during user resolution: {e}")
+                    continue
+                for member in members:
+                    resolved[member.id] = member
+            missing = [user_id for user_id in missing if user_id not in resolved]
+
+        semaphore = asyncio.Semaphore(REHYDRATE_CONCURRENCY)
+
+        async def fetch(user_id: int):
+            user = self.bot.get_user(user_id)
+            if user is None:
+                async with semaphore:
+                    try:
+                        user = await self.bot.fetch_user(user_id)
+                    except discord.HTTPException:
+                        return
+            resolved[user_id] = user
+
+        await asyncio.gather(*(fetch(user_id) for user_id in missing))
+        return resolved
+
+    def get_verification_log_message(self, verification_id: int,
+                                     log_message_id: Optional[int] = None) -> Optional[discord.PartialMessage]:
+        """
+        Return a cached partial handle on a verification's log message, creating it from
+        `log_message_id` if needed. No API call is made; edits go straight to the message.
+        """
+        msg = self.verification_log_messages.get(verification_id)
+        if msg is None and log_message_id:
+            verif_log_channel = self.bot.get_channel(self.staff_verification_channel_id)
+            if verif_log_channel:
+                msg = verif_log_channel.get_partial_message(log_message_id)
+                self.verification_log_messages[verification_id] = msg
+        return msg
+
+    def staff_role_mentions(self, guild: discord.Guild) -> str:
+        """Mention string for every configured staff role present in the guild."""
+        return self.bot.role_index.staff_mentions(guild)
 
+    def build_verification_log_embed(
+        self,
+        verification_id: int,
+        user: discord.abc.User,
+        thread_url: str,
+        staff_mention_str: str,
+        timestamp: Optional[datetime.datetime] = None
+    ) -> discord.Embed:
+        """Builds the pending verification embed posted in the verification logs channel."""
+        embed = discord.Embed(
+            title=f"New Verification #{verification_id} - {user}",
+            description=(
+                f"{staff_mention_str}\n\n"
+                f"**User:** {user.mention}\n"
+                f"**Thread:** [Jump to Thread]({thread_url})\n"
+                f"**Status:** Pending"
+            ),
+            color=YELLOW,
+            timestamp=timestamp or datetime.datetime.utcnow()
+        )
+        embed.set_footer(text=f"User ID: {user.id} | Verification ID: {verification_id}")
+        return embed
+
+    async def finish_verification_log(
+        self,
+        verification_id: int,
+        request,
+        user: discord.abc.User,
+        status: str,
+        color: int,
+        reason: Optional[str] = None,
+        base_embed: Optional[discord.Embed] = None
+    ):
+        """
+        Marks the verification's log embed with its final status and removes the buttons,
+        in a single edit on the cached message handle.
+
+        `base_embed` is the embed as currently shown (e.g. from the interaction's message);
+        without it the embed is rebuilt from the stored request.
+        """
+        msg = self.get_verification_log_message(verification_id, request["log_message_id"])
+        self.verification_log_messages.pop(verification_id, None)
+        if msg is None:
+            logger.warning(f"No log message recorded for verification {verification_id}.")
+            return
+
+        if base_embed is not None:
+            embed = base_embed.copy()
+        else:
+            guild = msg.guild or self.bot.get_guild(self.bot.config["guild_id"])
+            thread_url = f"https://discord.com/channels/{guild.id}/{request['thread_id']}" if guild else ""
+            embed = self.build_verification_log_embed(
+                verification_id, user, thread_url,
+                self.staff_role_mentions(guild) if guild else "",
+                timestamp=request["created_at"]
+            )
+        embed.color = color
+        embed.description = embed.description.replace("**Status:** Pending", f"**Status:** {status}")
+        if reason:
+            embed.description += f"\n**Rejection Reason:** {reason}"
+        try:
+            await msg.edit(embed=embed, view=None)
+        except discord.NotFound:
+            logger.warning(f"Log message for verification {verification_id} no longer exists.")
+
+    async def delete_verification_thread(self, verification_id: int, request, user: discord.abc.User):
+        """Deletes the private verification thread so the user's image link is scrubbed."""
+        thread = self.bot.get_channel(request["thread_id"]) if request["thread_id"] else None
+        if thread is None:
+            # Requests created before thread_id was stored: fall back to the thread name.
+            private_thread_name = f"verification-{user.display_name}-#{verification_id}"
+            contact_channel = self.bot.get_channel(self.support_channel_id)
+            if contact_channel and isinstance(contact_channel, discord.TextChannel):
+                thread = discord.utils.get(contact_channel.threads, name=private_thread_name)
+        if thread:
+            await thread.delete()
+        thread_id = thread.id if thread else request["thread_id"]
+        if thread_id:
+            # Close the verification ticket now rather than leaving it to the inactivity sweep.
+            self.pending_activity.pop(thread_id, None)
+            self.responded_threads.discard(thread_id)
+            await self.bot.db.execute(CLOSE_TICKET_SQL, thread_id)
+            await self.purge_archived_thread(thread_id)
+
+    async def purge_archived_thread(self, thread_id: int):
+        """Drop a thread's buffered and archived messages (e.g. verification rows archived by older versions)."""
+        async with self.archive_lock:
+            for message_id in [m for m, r in self.archive_buffer.items() if r[1] == thread_id]:
+                del self.archive_buffer[message_id]
+            await self.bot.db.execute("DELETE FROM ticket_messages WHERE thread_id = $1", thread_id)
 
     def build_support_embed(self) -> discord.Embed:
         """Builds the support splash embed."""
@@ -256,6 +1128,7 @@ class SupportTicketCog(commands.Cog):
             """,
             user.id, q1, q2, q3
         )
+        self.bot.funnel.record(user.id, "verification_request")
 
         # 2) Create a private thread in #contact-the-boss channel
         channel = self.bot.get_channel(self.support_channel_id)
@@ -270,6 +1143,15 @@ class SupportTicketCog(commands.Cog):
         )
         await thread.add_user(user)
 
+        # Track the thread in the tickets table so the inactivity sweep covers it.
+        await self.bot.db.execute(
+            """
+            INSERT INTO tickets (user_id, channel_id, thread_id, kind)
+            VALUES ($1, $2, $3, 'verification')
+            """,
+            user.id, channel.id, thread.id
+        )
+
         # 3) Post the user’s answers in the private thread
         #    (including the image link so staff can see it, but we do NOT store it in DB).
         await thread.send(
@@ -288,33 +1170,9 @@ class SupportTicketCog(commands.Cog):
             logger.warning("Cannot find the verification logs channel.")
             return thread
 
-        # Mention all staff roles. This can be done by constructing a string of pings.
-        # If your staff roles are IDs, you'll do f"<@&{role_id}>" for each.
-        role_mentions = []
-        guild = user.guild
-        for role_name_or_id in self.staff_roles:
-            role = None
-            if isinstance(role_name_or_id, int):
-                role = guild.get_role(role_name_or_id)
-            else:
-                role = discord.utils.get(guild.roles, name=role_name_or_id)
-            if role:
-                role_mentions.append(role.mention)
-
-        staff_mention_str = " ".join(role_mentions) if role_mentions else ""        
-
-        embed = discord.Embed(
-            title=f"New Verification #{verification_id} - {user}",
-            description=(
-                f"{staff_mention_str}\n\n"
-                f"**User:** {user.mention}\n"
-                f"**Thread:** [Jump to Thread]({thread.jump_url})\n"
-                f"**Status:** Pending"
-            ),
-            color=YELLOW,
-            timestamp=datetime.datetime.utcnow()
-        )
-        embed.set_footer(text=f"User ID: {user.id} | Verification ID: {verification_id}")
+        # Mention all staff roles.
+        staff_mention_str = self.staff_role_mentions(user.guild)
+        embed = self.build_verification_log_embed(verification_id, user, thread.jump_url, staff_mention_str)
 
         view = VerificationLogView(
             cog=self,
@@ -327,35 +1185,44 @@ class SupportTicketCog(commands.Cog):
             view=view
         )
 
-        # Store this message ID in the database so we can reattach after a restart
+        self.verification_log_messages[verification_id] = verif_log_channel.get_partial_message(msg.id)
+
+        # Store the message and thread IDs so we can reattach and edit directly after a restart
         await self.bot.db.execute(
             """
             UPDATE verification_requests
-               SET log_message_id = $1
-             WHERE id = $2
+               SET log_message_id = $1,
+                   thread_id = $2
+             WHERE id = $3
             """,
             msg.id,
+            thread.id,
             verification_id
         )
 
         return thread
 
     # Called when both staff approvals are reached:
-    async def handle_verification_approved(self, verification_id: int, user: discord.Member):
+    async def handle_verification_approved(self, verification_id: int, user: discord.Member,
+                                           log_embed: Optional[discord.Embed] = None):
         """
         Mark verification as approved in DB, add 'Verified' role, delete the private thread, 
         and update the embed color to GREEN in verification logs.
         """
         # 1) Update DB
-        await self.bot.db.execute(
+        request = await self.bot.db.fetchrow(
             """
             UPDATE verification_requests
                SET status = 'approved',
                    updated_at = NOW()
              WHERE id = $1
+            RETURNING log_message_id, thread_id, created_at
             """,
             verification_id
         )
+        if not request:
+            return
+        self.bot.funnel.record(user.id, "verification_approve")
 
         # 2) Add "Verified" role
         # Convert User -> Member
@@ -375,59 +1242,40 @@ class SupportTicketCog(commands.Cog):
 
         logger.debug(f"[DEBUG] {member.display_name} has been veriried - attempting to get verification role and add it to the user.")
         # Now add the role
-        verified_role = discord.utils.get(guild.roles, name="Verified")
-        unverified_role = discord.utils.get(guild.roles, name="Unverified")
+        verified_role = self.bot.role_index.get(guild, "Verified")
+        unverified_role = self.bot.role_index.get(guild, "Unverified")
         if verified_role:
             await member.add_roles(verified_role, reason="User verified")
             await member.remove_roles(unverified_role, reason="User verified")
             logger.debug(f"[DEBUG] Added {verified_role.name} to {member.display_name}, removed {unverified_role}")
 
-        # 3) Attempt to find the private thread (by name) and delete it
-        #    so the user’s image link is scrubbed.
-        private_thread_name = f"verification-{user.display_name}-#{verification_id}"
-        contact_channel = self.bot.get_channel(self.support_channel_id)
-        if contact_channel and isinstance(contact_channel, discord.TextChannel):
-            thread_to_delete = discord.utils.get(contact_channel.threads, name=private_thread_name)
-            if thread_to_delete:
-                await thread_to_delete.delete()
-
-        # 4) Update the embed color in the verification logs to green
-        #    This requires that we kept track of the original message ID, or we search for it.
-        verif_log_channel = self.bot.get_channel(self.staff_verification_channel_id)
-        if not verif_log_channel:
-            return
+        # 3) Delete the private thread so the user’s image link is scrubbed.
+        await self.delete_verification_thread(verification_id, request, user)
+
+        # 4) Update the embed color in the verification logs to green and remove the buttons
+        await self.finish_verification_log(
+            verification_id, request, user, "Approved", GREEN, base_embed=log_embed
+        )
 
-        # If you kept the last log message ID in the DB or a dictionary,
-        # you can fetch and edit it directly. For example:
-        #   msg = await verif_log_channel.fetch_message(log_message_id)
-        #   ...
-        # For brevity, let's do a simple search for demonstration:
-        async for message in verif_log_channel.history(limit=200):
-            if message.author == self.bot.user and message.embeds:
-                emb = message.embeds[0]
-                if emb.footer and f"Verification ID: {verification_id}" in str(emb.footer.text):
-                    # Found the correct embed
-                    embed = emb
-                    embed.color = GREEN
-                    embed.description = embed.description.replace("**Status:** Pending", "**Status:** Approved")
-                    await message.edit(embed=embed, view=None)  # Remove buttons or set view=None
-                    break
-
-    async def handle_verification_rejected(self, verification_id: int, user: discord.Member, reason: str):
+    async def handle_verification_rejected(self, verification_id: int, user: discord.Member, reason: str,
+                                           log_embed: Optional[discord.Embed] = None):
         """
         Mark verification as rejected in DB, DM the user, optionally kick them, 
         and update the embed color to RED in verification logs.
         """
         # 1) Update DB
-        await self.bot.db.execute(
+        request = await self.bot.db.fetchrow(
             """
             UPDATE verification_requests
                SET status = 'rejected',
                    updated_at = NOW()
              WHERE id = $1
+            RETURNING log_message_id, thread_id, created_at
             """,
             verification_id
         )
+        if not request:
+            return
 
         # 2) DM the user with the reason
         try:
@@ -453,34 +1301,45 @@ class SupportTicketCog(commands.Cog):
             )
 
         # 4) Delete the private verification thread
-        private_thread_name = f"verification-{user.display_name}-#{verification_id}"
-        contact_channel = self.bot.get_channel(self.support_channel_id)
-        if contact_channel and isinstance(contact_channel, discord.TextChannel):
-            thread_to_delete = discord.utils.get(contact_channel.threads, name=private_thread_name)
-            if thread_to_delete:
-                await thread_to_delete.delete()
-        # 5) Update the embed color in the verification logs to red & show justification
-        verif_log_channel = self.bot.get_channel(self.staff_verification_channel_id)
-        if not verif_log_channel:
-            return
+        await self.delete_verification_thread(verification_id, request, user)
 
-        async for message in verif_log_channel.history(limit=200):
-            if message.author == self.bot.user and message.embeds:
-                emb = message.embeds[0]
-                if emb.footer and f"Verification ID: {verification_id}" in str(emb.footer.text):
-                    embed = emb
-                    embed.color = RED
-                    embed.description = embed.description.replace("**Status:** Pending", "**Status:** Rejected")
-                    # Append the reason
-                    embed.description += f"\n**Rejection Reason:** {reason}"
-                    await message.edit(embed=embed, view=None)
-                    break
+        # 5) Update the embed color in the verification logs to red & show justification
+        await self.finish_verification_log(
+            verification_id, request, user, "Rejected", RED, reason=reason, base_embed=log_embed
+        )
 
 
 # --------------------------------------
 # Views & Modals
 # --------------------------------------
 
+class TicketSearchView(discord.ui.View):
+    """Pages through /support search results using the last row as a keyset cursor."""
+
+    def __init__(self, cog: SupportTicketCog, query: str, rows):
+        super().__init__(timeout=300)
+        self.cog = cog
+        self.query = query
+        self.page = 1
+        self._set_rows(rows)
+
+    def _set_rows(self, rows):
+        self.has_more = len(rows) > SEARCH_PAGE_SIZE
+        self.rows = rows[:SEARCH_PAGE_SIZE]
+        self.next_button.disabled = not self.has_more
+
+    def current_embed(self) -> discord.Embed:
+        return self.cog.build_search_embed(self.query, self.rows, self.page)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary, emoji="➡️")
+    async def next_button(self, button: discord.ui.Button, interaction: discord.Interaction):
+        last = self.rows[-1]
+        rows = await self.cog.search_transcripts(self.query, after=(last["rank"], last["ticket_id"]))
+        self.page += 1
+        self._set_rows(rows)
+        await interaction.response.edit_message(embed=self.current_embed(), view=self)
+
+
 class SplashContactView(discord.ui.View):
     """Splash view with a single 'Contact Staff' button."""
 
@@ -491,7 +1350,7 @@ class SplashContactView(discord.ui.View):
     @discord.ui.button(label="Contact Staff", style=discord.ButtonStyle.primary, custom_id="contact_staff")
     async def contact_staff(self, button: discord.ui.Button, interaction: discord.Interaction):
         """Shows an ephemeral view with support and verification options."""
-        is_verified = discord.utils.get(interaction.user.roles, name="Verified")
+        is_verified = self.bot.role_index.has_role(interaction.user, "Verified")
         view = EphemeralSupportView(bot=self.bot, show_verification=not is_verified)
         await interaction.response.send_message("Select an option below:", view=view, ephemeral=True, delete_after=300.0)
 
@@ -572,23 +1431,38 @@ class SupportTicketModal(discord.ui.Modal):
         self.add_item(self.attachments)
 
     async def callback(self, interaction: discord.Interaction):
-        """Creates a support thread, saves to DB, and alerts staff."""
+        """
+        Creates a support thread, saves to DB, and alerts staff.
+
+        The interaction is acknowledged first; the ticket and participant rows are
+        written in one statement, and the independent Discord calls run concurrently.
+        """
+        started = time.perf_counter()
+        await interaction.response.defer(ephemeral=True)
+        logger.debug(f"Support ticket modal acknowledged in {(time.perf_counter() - started) * 1000:.0f} ms.")
+
         # 1) Get the support channel
         support_channel_id = self.bot.config["support_channel_id"]
         support_channel = self.bot.get_channel(support_channel_id)
         if not support_channel:
-            return await interaction.response.send_message(
+            return await interaction.followup.send(
                 "Support channel is not configured. Please contact an admin.",
                 ephemeral=True,
                 delete_after=30.0
             )
 
-        # 2) Create the DB record for the ticket
+        # 2) Create the DB records for the ticket and its opener in one statement
         ticket_id = await self.bot.db.fetchval(
             """
-            INSERT INTO tickets (user_id, channel_id)
-            VALUES ($1, $2)
-            RETURNING id
+            WITH t AS (
+                INSERT INTO tickets (user_id, channel_id)
+                VALUES ($1, $2)
+                RETURNING id
+            ), p AS (
+                INSERT INTO ticket_participants (ticket_id, user_id)
+                SELECT id, $1 FROM t
+            )
+            SELECT id FROM t
             """,
             interaction.user.id,
             support_channel.id
@@ -601,68 +1475,55 @@ class SupportTicketModal(discord.ui.Modal):
             type=discord.ChannelType.private_thread
         )
 
-        # 4) Add the user to the thread
-        await thread.add_user(interaction.user)
-
-        # 5) Insert the opener as participant in DB
-        await self.bot.db.execute(
-            """
-            INSERT INTO ticket_participants (ticket_id, user_id)
-            VALUES ($1, $2)
-            """,
-            ticket_id,
-            interaction.user.id
-        )
-
-        # 6) Send initial message in the thread summarizing the ticket
-        await thread.send(
-            content=(
-                f"**Ticket #{ticket_id} opened by {interaction.user.mention}**\n\n"
-                f"**Issue Description:** {self.issue_description.value}\n"
-                f"**Attachments:** {self.attachments.value if self.attachments.value else 'None'}"
-            )
-        )
-
-        # 7) Acknowledge the user
-        await interaction.response.send_message(
-            f"Your ticket has been created: {thread.mention}. Staff will assist you soon.",
-            ephemeral=True,
-            delete_after=30.0
-        )
-
-        # 8) Now alert staff in a designated staff channel
-        staff_channel_id = self.bot.config.get("support_channel_id")
-        staff_channel = self.bot.get_channel(staff_channel_id)
-        if not staff_channel:
-            # If no staff channel is configured/found, just log or skip
-            return
-
-        staff_role_names = self.bot.config.get("staff_roles", [])
-        staff_mentions = []
-
-        for role_name in staff_role_names:
-            role = discord.utils.get(interaction.guild.roles, name=role_name)
-            if role:
-                staff_mentions.append(role.mention)
+        # 4) Everything below only needs the thread, so run it concurrently:
+        #    add the user, link the thread in the DB, post the opening message,
+        #    acknowledge the user and alert staff.
+        cog = self.bot.get_cog("SupportTicketCog")
+        mention_str = cog.staff_role_mentions(interaction.guild) if cog else ""
+        attachments = self.attachments.value if self.attachments.value else "None"
 
-        mention_str = " ".join(staff_mentions) if staff_mentions else ""
-
-        # Create an embed with ticket details
         embed = discord.Embed(
             title=f"New Support Ticket #{ticket_id}",
             description=(
                 f"**User:** {interaction.user.mention}\n"
                 f"**Thread:** [Jump to Thread]({thread.jump_url})\n\n"
                 f"**Issue Description:**\n{self.issue_description.value}\n\n"
-                f"**Attachments:** {self.attachments.value if self.attachments.value else 'None'}"
+                f"**Attachments:** {attachments}"
             ),
             color=discord.Color.blurple(),
             timestamp=datetime.datetime.utcnow()
         )
         embed.set_footer(text=f"User ID: {interaction.user.id} • Ticket ID: {ticket_id}")
 
-        # Finally, send in staff channel, optionally mentioning roles
-        await staff_channel.send(content=mention_str, embed=embed)
+        tasks_ = [
+            thread.add_user(interaction.user),
+            self.bot.db.execute("UPDATE tickets SET thread_id = $1 WHERE id = $2", thread.id, ticket_id),
+            thread.send(
+                content=(
+                    f"**Ticket #{ticket_id} opened by {interaction.user.mention}**\n\n"
+                    f"**Issue Description:** {self.issue_description.value}\n"
+                    f"**Attachments:** {attachments}"
+                )
+            ),
+            interaction.followup.send(
+                f"Your ticket has been created: {thread.mention}. Staff will assist you soon.",
+                ephemeral=True,
+                delete_after=30.0
+            ),
+        ]
+        # Alert staff in the designated staff channel, optionally mentioning roles
+        staff_channel = self.bot.get_channel(self.bot.config.get("support_channel_id"))
+        if staff_channel:
+            tasks_.append(staff_channel.send(content=mention_str, embed=embed))
+
+        results = await asyncio.gather(*tasks_, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Ticket #{ticket_id} setup step failed: {result!r}")
+        logger.info(
+            f"Support ticket #{ticket_id} created for {interaction.user.id} "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms."
+        )
 
 
 
@@ -797,40 +1658,16 @@ class VerificationLogView(discord.ui.View):
                 "You do not have permission to approve this verification.", ephemeral=True, delete_after=30.0
             )
 
-        # Check if they have already approved in the DB
-        row = await self.bot.db.fetchrow(
-            """
-            SELECT 1 FROM verification_approvals
-             WHERE verification_id = $1
-               AND staff_id = $2
-            """,
-            self.verification_id,
-            interaction.user.id
+        # Record the approval and bump the counter in one statement (duplicate clicks are no-ops)
+        result = await self.bot.db.record_approval(
+            "verification_approvals", "verification_requests", "verification_id",
+            self.verification_id, interaction.user.id, threshold=VERIFICATION_APPROVALS_REQUIRED
         )
-        if row:
+        if not result.recorded:
             return await interaction.response.send_message(
                 "You have already approved this request.", ephemeral=True, delete_after=30.0
             )
-
-        # Insert the new approval
-        await self.bot.db.execute(
-            """
-            INSERT INTO verification_approvals (verification_id, staff_id)
-            VALUES ($1, $2)
-            ON CONFLICT DO NOTHING
-            """,
-            self.verification_id,
-            interaction.user.id
-        )
-
-        # Count how many distinct staff members have approved so far
-        count = await self.bot.db.fetchval(
-            """
-            SELECT COUNT(*) FROM verification_approvals
-             WHERE verification_id = $1
-            """,
-            self.verification_id
-        )
+        count = result.count
 
         if count == 1:
             self.approve_button.label = "Approve (1/2)"
@@ -842,23 +1679,17 @@ class VerificationLogView(discord.ui.View):
                 delete_after=30.0
             )
 
-        elif count == 2:
-            # Final approval
-            self.approve_button.label = "Approve (2/2)"
-            self.approve_button.emoji = "2️⃣"
-            await self.update_log_embed(interaction=interaction, show_status=False)
-
-            # Call handle_verification_approved to finalize
+        elif result.crossed:
+            # Final approval. handle_verification_approved edits the log message once,
+            # marking it approved and removing the buttons.
+            for child in self.children:
+                child.disabled = True
             await self.cog.handle_verification_approved(
                 verification_id=self.verification_id,
-                user=self.user
+                user=self.user,
+                log_embed=current_log_embed(interaction)
             )
 
-            # Remove or disable all buttons
-            for child in self.children:
-                child.disabled = True
-            await interaction.message.edit(view=self)
-
             await interaction.response.send_message(
                 "Verification approved! The user has been verified and the thread is deleted.",
                 ephemeral=True,
@@ -889,16 +1720,7 @@ class VerificationLogView(discord.ui.View):
 
     async def user_is_staff(self, member: discord.Member) -> bool:
         """Check if the user has any of the staff roles from the cog config."""
-        for role_name_or_id in self.cog.staff_roles:
-            role = None
-            if isinstance(role_name_or_id, int):
-                role = member.guild.get_role(role_name_or_id)
-            else:
-                role = discord.utils.get(member.roles, name=role_name_or_id)
-
-            if role in member.roles:
-                return True
-        return False
+        return self.cog.is_staff(member)
 
     async def update_log_embed(self, interaction: discord.Interaction, show_status: bool = True):
         """
@@ -954,17 +1776,16 @@ class VerificationRejectionModal(discord.ui.Modal):
     async def callback(self, interaction: discord.Interaction):
         # final rejection
         reason = self.reason_input.value.strip()
+        # Disable the parent view buttons; the log message itself is edited once by the cog.
+        for child in self.parent_view.children:
+            child.disabled = True
         await self.parent_view.cog.handle_verification_rejected(
             verification_id=self.parent_view.verification_id,
             user=self.parent_view.user,
-            reason=reason
+            reason=reason,
+            log_embed=current_log_embed(interaction)
         )
 
-        # Disable the parent view buttons
-        for child in self.parent_view.children:
-            child.disabled = True
-        await interaction.message.edit(view=self.parent_view)
-
         await interaction.response.send_message(
             "Verification rejected and the user has been notified.",
             ephemeral=True,
@@ -0,0 +1,173 @@
+# ./config_store.py
+import asyncio
+import json
+import os
+from loguru import logger
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from utils import load_json_config, write_json_config
+
+CONFIG_WATCH_INTERVAL = 5.0  # Seconds between config file mtime checks
+
+
+class ConfigStore:
+    """
+    In-memory snapshot of `config.json` with atomic writes and hot reload.
+
+    `data` is the dict the rest of the bot uses as `bot.config`, so reads stay plain
+    dict lookups. It is updated in place (never replaced), which keeps references
+    held by cogs valid across reloads.
+
+    Writes go through `update()` / `remove()`: the snapshot changes immediately and the
+    whole snapshot is written off the event loop to a temp file that is renamed over
+    `config.json`. Writes are serialized, so concurrent writers never clobber each other.
+
+    `watch()` polls the file's mtime and reloads it when it was edited by hand.
+    Listeners registered with `add_listener()` are called with the set of top-level
+    keys that changed, after writes and reloads alike.
+
+    Attributes:
+        path (str): The config file.
+        data (dict): The live configuration.
+    """
+
+    def __init__(self, path: str = "config.json"):
+        self.path = path
+        self.data: Dict[str, Any] = {}
+        self._mtime: Optional[float] = None
+        self._write_lock = asyncio.Lock()
+        self._watch_task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[Set[str]], None]] = []
+
+    async def load(self) -> Set[str]:
+        """(Re)load the file into the snapshot and return the keys that changed."""
+        new_data = await load_json_config(self.path)
+        self._mtime = await self._stat_mtime()
+        if not new_data and self.data:
+            # Missing or half-written file; keep the last good snapshot.
+            logger.warning(f"{self.path} could not be read; keeping the current config.")
+            return set()
+        return self._replace(new_data)
+
+    # ------------------------------------------------------------------
+    # Listeners
+    # ------------------------------------------------------------------
+    def add_listener(self, callback: Callable[[Set[str]], None]) -> None:
+        """Register a synchronous callback invoked with the set of changed keys."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Set[str]], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, keys: Set[str]) -> None:
+        if not keys:
+            return
+        for callback in list(self._listeners):
+            try:
+                callback(keys)
+            except Exception as e:
+                logger.exception(f"Config listener failed for keys {sorted(keys)}: {e}")
+
+    def _replace(self, new_data: Dict[str, Any]) -> Set[str]:
+        changed = {
+            key for key in set(self.data) | set(new_data)
+            if self.data.get(key) != new_data.get(key)
+        }
+        self.data.clear()
+        self.data.update(new_data)
+        self._notify(changed)
+        return changed
+
+    # ------------------------------------------------------------------
+    # Typed reads
+    # ------------------------------------------------------------------
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def get_int(self, key: str, default: Optional[int] = None) -> Optional[int]:
+        value = self.data.get(key)
+        try:
+            return int(value) if value is not None else default
+        except (TypeError, ValueError):
+            logger.warning(f"Config key '{key}' is not an int: {value!r}")
+            return default
+
+    def get_bool(self, key: str, default: bool = False) -> bool:
+        value = self.data.get(key)
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(value) if value is not None else default
+
+    def get_str(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        value = self.data.get(key)
+        return str(value) if value is not None else default
+
+    def get_list(self, key: str, default: Optional[list] = None) -> list:
+        value = self.data.get(key)
+        return list(value) if isinstance(value, list) else list(default or [])
+
+    def get_section(self, key: str) -> Dict[str, Any]:
+        value = self.data.get(key)
+        return value if isinstance(value, dict) else {}
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    async def update(self, changes: Dict[str, Any]) -> None:
+        """Set top-level keys and persist the snapshot atomically."""
+        async with self._write_lock:
+            changed = {k for k, v in changes.items() if self.data.get(k) != v or k not in self.data}
+            if not changed:
+                return
+            self.data.update(changes)
+            await self._persist()
+        self._notify(changed)
+
+    async def remove(self, *keys: str) -> None:
+        """Delete top-level keys and persist the snapshot atomically."""
+        async with self._write_lock:
+            changed = {k for k in keys if k in self.data}
+            if not changed:
+                return
+            for k in changed:
+                del self.data[k]
+            await self._persist()
+        self._notify(changed)
+
+    async def _persist(self) -> None:
+        # Serialize on the loop so the written snapshot can't change mid-dump.
+        await write_json_config(self.path, json.loads(json.dumps(self.data)))
+        self._mtime = await self._stat_mtime()
+
+    # ------------------------------------------------------------------
+    # Hot reload
+    # ------------------------------------------------------------------
+    async def _stat_mtime(self) -> Optional[float]:
+        try:
+            return (await asyncio.to_thread(os.stat, self.path)).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def watch(self, interval: float = CONFIG_WATCH_INTERVAL) -> None:
+        """Start polling the file for external edits (no-op if already watching)."""
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch_loop(interval))
+
+    def stop(self) -> None:
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+    async def _watch_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                mtime = await self._stat_mtime()
+                if mtime is None or mtime == self._mtime or self._write_lock.locked():
+                    continue
+                changed = await self.load()
+                logger.info(f"{self.path} reloaded; changed keys: {sorted(changed) or 'none'}")
+            except Exception as e:
+                logger.exception(f"Config reload failed: {e}")
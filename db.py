@@ -4,7 +4,24 @@ import json
 from loguru import logger
 import asyncio
 import subprocess
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, NamedTuple, Optional, List, Sequence
+
+
+class ApprovalResult(NamedTuple):
+    """
+    Outcome of `Database.record_approval()`.
+
+    Attributes:
+        recorded (bool): False if this approver had already approved (duplicate click).
+        count (int): The approval count after this call.
+        crossed (bool): True only for the single call that brought the count to the threshold.
+        row (asyncpg.Record): The result row, including any `returning` columns
+            (None if the target does not exist).
+    """
+    recorded: bool
+    count: int
+    crossed: bool
+    row: Optional[asyncpg.Record]
 
 
 class Database:
@@ -117,6 +134,69 @@ class Database:
         async with self.pool.acquire() as conn:
             return await conn.execute(query, *args)
 
+    async def record_approval(
+        self,
+        approvals_table: str,
+        target_table: str,
+        target_column: str,
+        target_id: int,
+        approver_id: int,
+        threshold: int,
+        counter_column: str = "staff_approvals",
+        approver_column: str = "staff_id",
+        returning: Sequence[str] = ()
+    ) -> ApprovalResult:
+        """
+        Record one party's approval and bump the target's counter in a single statement.
+
+        The approval row is inserted with ON CONFLICT DO NOTHING, and the counter on
+        `target_table` is only incremented when that insert happened, so duplicate clicks
+        are idempotent. The UPDATE takes the target row lock, so concurrent approvals
+        serialize and exactly one caller sees `crossed=True`.
+
+        Table and column names are interpolated and must be trusted constants.
+
+        Parameters:
+            approvals_table (str): Table of (target_column, approver_column) rows.
+            target_table (str): Table holding the counter, keyed by `id`.
+            target_column (str): Column in `approvals_table` referencing the target.
+            target_id (int): ID of the target row.
+            approver_id (int): ID of the approving user.
+            threshold (int): Count at which the approval is complete.
+            counter_column (str): Counter column on `target_table`.
+            approver_column (str): Approver column in `approvals_table`.
+            returning (Sequence[str]): Extra `target_table` columns to return with the count.
+
+        Returns:
+            ApprovalResult: See the class docstring.
+        """
+        upd_extra = "".join(f", t.{col}" for col in returning)
+        sel_extra = "".join(f", COALESCE(u.{col}, t.{col}) AS {col}" for col in returning)
+        query = f"""
+            WITH ins AS (
+                INSERT INTO {approvals_table} ({target_column}, {approver_column})
+                VALUES ($1, $2)
+                ON CONFLICT DO NOTHING
+                RETURNING 1
+            ), upd AS (
+                UPDATE {target_table} t
+                   SET {counter_column} = COALESCE(t.{counter_column}, 0) + 1
+                 WHERE t.id = $1 AND EXISTS (SELECT 1 FROM ins)
+                RETURNING t.id, t.{counter_column} AS approval_count{upd_extra}
+            )
+            SELECT u.id IS NOT NULL AS recorded,
+                   COALESCE(u.approval_count, t.{counter_column}, 0) AS approval_count{sel_extra}
+              FROM {target_table} t
+              LEFT JOIN upd u ON u.id = t.id
+             WHERE t.id = $1
+        """
+        row = await self.fetchrow(query, target_id, approver_id)
+        if row is None:
+            return ApprovalResult(False, 0, False, None)
+        count = row["approval_count"]
+        recorded = row["recorded"]
+        return ApprovalResult(recorded, count, recorded and count == threshold, row)
+
     async def ensure_tables(self) -> None:
         """
         Create all required tables if they do not exist. This function ensures the database schema
@@ -177,6 +257,62 @@ class Database:
             );
             """,
             """
+            CREATE INDEX IF NOT EXISTS idx_user_roles_here_for ON user_roles USING GIN (here_for);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_user_roles_ping_roles ON user_roles USING GIN (ping_roles);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_user_roles_kinks ON user_roles USING GIN (kinks);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_user_roles_location ON user_roles (location, user_id);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_user_roles_age_range ON user_roles (age_range, user_id);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_user_roles_dm_status ON user_roles (dm_status, user_id);
+            """,
+            """
+            ALTER TABLE user_roles
+                ADD COLUMN IF NOT EXISTS roles_cleared_at TIMESTAMP;  -- set by /moderation clear_all_roles
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS funnel_events (
+                id BIGSERIAL PRIMARY KEY,
+                user_id BIGINT NOT NULL,
+                event TEXT NOT NULL,
+                detail TEXT,
+                occurred_at TIMESTAMP NOT NULL DEFAULT NOW()
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_funnel_events_occurred ON funnel_events (occurred_at);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_funnel_events_user ON funnel_events (user_id, event, occurred_at);
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS funnel_daily (
+                day DATE NOT NULL,
+                event TEXT NOT NULL,
+                events INT NOT NULL DEFAULT 0,
+                users INT NOT NULL DEFAULT 0,       -- distinct users that day
+                new_users INT NOT NULL DEFAULT 0,   -- users whose first event of this kind was that day
+                PRIMARY KEY (day, event)
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS role_stat_counts (
+                segment TEXT NOT NULL,      -- location, or '*' for all members
+                field TEXT NOT NULL,        -- user_roles column
+                value TEXT NOT NULL,
+                members INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (segment, field, value)
+            );
+            """,
+            """
             CREATE TABLE IF NOT EXISTS rules_acceptance (
                 user_id BIGINT PRIMARY KEY,
                 accepted_at TIMESTAMP NOT NULL
@@ -206,6 +342,13 @@ class Database:
             );
             """,
             """
+            ALTER TABLE open_dm_perms
+                ADD COLUMN IF NOT EXISTS active BOOLEAN DEFAULT TRUE,
+                ADD COLUMN IF NOT EXISTS opened_at TIMESTAMP DEFAULT NOW(),
+                ADD COLUMN IF NOT EXISTS closed_at TIMESTAMP,
+                ADD COLUMN IF NOT EXISTS reason TEXT;
+            """,
+            """
             CREATE TABLE IF NOT EXISTS sub_ownership (
                 sub_id BIGINT NOT NULL,
                 user_id BIGINT,
@@ -375,6 +518,10 @@ class Database:
             );
             """,
             """
+            ALTER TABLE verification_requests
+                ADD COLUMN IF NOT EXISTS thread_id BIGINT;  -- the private verification thread
+            """,
+            """
             CREATE TABLE IF NOT EXISTS verification_approvals (
                 verification_id INT NOT NULL REFERENCES verification_requests(id) ON DELETE CASCADE,
                 staff_id BIGINT NOT NULL,
@@ -382,6 +529,16 @@ class Database:
             );
             """,
             """
+            -- staff_approvals is maintained by record_approval(); sync rows written before that.
+            UPDATE verification_requests r
+               SET staff_approvals = a.n
+              FROM (SELECT verification_id, COUNT(*) AS n
+                      FROM verification_approvals
+                     GROUP BY verification_id) a
+             WHERE a.verification_id = r.id
+               AND r.staff_approvals IS DISTINCT FROM a.n;
+            """,
+            """
             CREATE TABLE IF NOT EXISTS tickets (
                 id SERIAL PRIMARY KEY,
                 user_id BIGINT,              -- user who opened ticket
@@ -392,6 +549,70 @@ class Database:
             );
             """,
             """
+            ALTER TABLE tickets
+                ADD COLUMN IF NOT EXISTS thread_id BIGINT,  -- the ticket's private thread
+                ADD COLUMN IF NOT EXISTS kind TEXT DEFAULT 'support',  -- support or verification
+                ADD COLUMN IF NOT EXISTS last_activity_at TIMESTAMP DEFAULT (NOW() AT TIME ZONE 'utc');
+            """,
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_tickets_thread_id ON tickets (thread_id);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_tickets_open_activity
+                ON tickets (last_activity_at) WHERE status = 'open';
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS ticket_messages (
+                message_id BIGINT PRIMARY KEY,
+                thread_id BIGINT NOT NULL,     -- ticket or verification thread
+                author_id BIGINT,
+                author_name TEXT,
+                content TEXT,
+                attachment_urls TEXT[],
+                created_at TIMESTAMP,
+                edited_at TIMESTAMP,
+                deleted BOOLEAN DEFAULT FALSE
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_ticket_messages_thread ON ticket_messages (thread_id, message_id);
+            """,
+            """
+            ALTER TABLE tickets
+                ADD COLUMN IF NOT EXISTS first_staff_response_at TIMESTAMP,
+                ADD COLUMN IF NOT EXISTS first_responder_id BIGINT;
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS ticket_sla_hourly (
+                hour TIMESTAMP NOT NULL,           -- start of the hour the event happened in
+                staff_id BIGINT NOT NULL,          -- first responder (0 = no staff response)
+                category TEXT NOT NULL,            -- tickets.kind
+                first_responses INT DEFAULT 0,
+                first_response_secs BIGINT DEFAULT 0,
+                resolutions INT DEFAULT 0,
+                resolution_secs BIGINT DEFAULT 0,
+                PRIMARY KEY (hour, staff_id, category)
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS ticket_transcripts (
+                ticket_id INT PRIMARY KEY REFERENCES tickets(id) ON DELETE CASCADE,
+                thread_id BIGINT,
+                opener_id BIGINT,
+                kind TEXT,
+                closed_at TIMESTAMP DEFAULT NOW(),
+                body TEXT NOT NULL,
+                search tsvector GENERATED ALWAYS AS (to_tsvector('english', body)) STORED
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_ticket_transcripts_search ON ticket_transcripts USING GIN (search);
+            """,
+            """
+            -- Verification threads hold ID images and answers; they are never indexed.
+            DELETE FROM ticket_transcripts WHERE kind = 'verification';
+            """,
+            """
             CREATE TABLE IF NOT EXISTS ticket_participants (
                 ticket_id INT REFERENCES tickets(id) ON DELETE CASCADE,
                 user_id BIGINT,
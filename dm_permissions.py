@@ -0,0 +1,117 @@
+# ./dm_permissions.py
+from loguru import logger
+from typing import Dict, Set, Tuple
+
+_ID_BITS = 64
+_ID_MASK = (1 << _ID_BITS) - 1
+
+
+def pair_key(user_a: int, user_b: int) -> int:
+    """
+    Pack an unordered pair of Discord IDs into a single 128-bit int.
+    The smaller ID goes in the high 64 bits, mirroring the table's user1_id < user2_id rule.
+    """
+    low, high = (user_a, user_b) if user_a < user_b else (user_b, user_a)
+    return (low << _ID_BITS) | high
+
+
+def unpack_pair_key(key: int) -> Tuple[int, int]:
+    """Return (user1_id, user2_id) for a packed pair key."""
+    return key >> _ID_BITS, key & _ID_MASK
+
+
+class DMPermissions:
+    """
+    In-memory index of active `open_dm_perms` pairs.
+
+    Pairs are normalized once (smaller ID first) and stored as packed 128-bit keys,
+    so membership checks are a single set lookup with no DB round trip. All writes
+    to `open_dm_perms` should go through `open_pair()` / `close_pair()` so the
+    index stays in sync with the table.
+
+    Attributes:
+        db (Database): The bot's database manager.
+        pairs (set): packed pair keys of every active pair
+        partners (dict): user_id -> set of user_ids they have open DMs with
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.pairs: Set[int] = set()
+        self.partners: Dict[int, Set[int]] = {}
+        self.loaded = False
+
+    async def load(self) -> None:
+        """
+        Load every active pair into memory, replacing any existing state.
+        """
+        rows = await self.db.fetch(
+            "SELECT user1_id, user2_id FROM open_dm_perms WHERE active=TRUE;"
+        )
+        self.pairs.clear()
+        self.partners.clear()
+        for r in rows:
+            self._add(r["user1_id"], r["user2_id"])
+        self.loaded = True
+        logger.info(f"DM permissions loaded: {len(self.pairs)} open pairs.")
+
+    def _add(self, user_a: int, user_b: int) -> None:
+        self.pairs.add(pair_key(user_a, user_b))
+        self.partners.setdefault(user_a, set()).add(user_b)
+        self.partners.setdefault(user_b, set()).add(user_a)
+
+    def _remove(self, user_a: int, user_b: int) -> None:
+        self.pairs.discard(pair_key(user_a, user_b))
+        for user, other in ((user_a, user_b), (user_b, user_a)):
+            others = self.partners.get(user)
+            if others is not None:
+                others.discard(other)
+                if not others:
+                    del self.partners[user]
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def is_open(self, user_a: int, user_b: int) -> bool:
+        """Check if two users currently have open DMs."""
+        return pair_key(user_a, user_b) in self.pairs
+
+    def partners_of(self, user_id: int) -> Set[int]:
+        """Return everyone `user_id` currently has open DMs with."""
+        return set(self.partners.get(user_id, ()))
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    async def open_pair(self, user_a: int, user_b: int, reason: str) -> None:
+        """
+        Adds or reactivates an open DM permission pair between two users.
+        """
+        user1_id, user2_id = unpack_pair_key(pair_key(user_a, user_b))
+        await self.db.execute(
+            """
+            INSERT INTO open_dm_perms (user1_id, user2_id, opened_at, active, reason)
+            VALUES($1, $2, NOW(), TRUE, $3)
+            ON CONFLICT (user1_id, user2_id)
+            DO UPDATE SET active=TRUE, opened_at=NOW(), reason=$3, closed_at=NULL
+            """,
+            user1_id, user2_id, reason
+        )
+        self._add(user1_id, user2_id)
+
+    async def close_pair(self, user_a: int, user_b: int, reason: str) -> None:
+        """
+        Closes an open DM permission pair.
+        """
+        user1_id, user2_id = unpack_pair_key(pair_key(user_a, user_b))
+        await self.db.execute(
+            """
+            UPDATE open_dm_perms
+            SET active=FALSE,
+                closed_at=NOW(),
+                reason=$3
+            WHERE user1_id=$1 AND user2_id=$2 AND active=TRUE
+            """,
+            user1_id, user2_id, reason
+        )
+        self._remove(user1_id, user2_id)
@@ -0,0 +1,126 @@
+# ./funnel.py
+import asyncio
+import datetime
+from loguru import logger
+from typing import List, Optional, Tuple
+
+# Funnel stages in order; /rules funnel reports them in this order.
+FUNNEL_STAGES = [
+    "join",
+    "rules_begin",
+    "rules_page",
+    "rules_accept",
+    "rules_unaccept",
+    "verification_request",
+    "verification_approve",
+]
+FUNNEL_COLUMNS = ["user_id", "event", "detail", "occurred_at"]
+FUNNEL_FLUSH_INTERVAL = 5.0  # Seconds between COPYs of buffered events
+FUNNEL_ROLLUP_INTERVAL = 900.0  # Seconds between daily rollup refreshes
+FUNNEL_MAX_BUFFER = 50_000  # Oldest events are dropped beyond this while the DB is unreachable
+
+# Recompute the rollup rows from the raw events, starting at $1 or at the last rolled-up
+# day if that is earlier (e.g. after downtime). `new_users` counts users
+# whose first-ever event of that kind fell on that day, so summing it over any range gives
+# exact unique users per stage.
+ROLLUP_FUNNEL_SQL = """
+INSERT INTO funnel_daily (day, event, events, users, new_users)
+SELECT e.occurred_at::date AS day,
+       e.event,
+       COUNT(*),
+       COUNT(DISTINCT e.user_id),
+       COUNT(DISTINCT e.user_id) FILTER (
+           WHERE NOT EXISTS (
+               SELECT 1 FROM funnel_events p
+                WHERE p.user_id = e.user_id
+                  AND p.event = e.event
+                  AND p.occurred_at < e.occurred_at::date
+           )
+       )
+  FROM funnel_events e
+ WHERE e.occurred_at >= LEAST($1, COALESCE((SELECT MAX(day) FROM funnel_daily)::timestamp, '-infinity'))
+ GROUP BY 1, 2
+ON CONFLICT (day, event) DO UPDATE
+   SET events = EXCLUDED.events,
+       users = EXCLUDED.users,
+       new_users = EXCLUDED.new_users;
+"""
+
+
+class FunnelRecorder:
+    """
+    Buffered writer for onboarding funnel events (join -> rules -> verification).
+
+    `record()` is synchronous and only appends to an in-memory buffer; a background
+    task COPYs the buffer into the append-only `funnel_events` table every few seconds.
+    Another task periodically recomputes the recent days of `funnel_daily`, which is
+    all the `/rules funnel` command reads.
+
+    Attributes:
+        bot (MoguMoguBot): The bot.
+        buffer (list): (user_id, event, detail, occurred_at) rows awaiting COPY, at most
+            FUNNEL_MAX_BUFFER after a failed flush
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.buffer: List[Tuple[int, str, Optional[str], datetime.datetime]] = []
+        self._lock = asyncio.Lock()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._flush_loop()),
+                asyncio.create_task(self._rollup_loop()),
+            ]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        await self.flush()
+
+    def record(self, user_id: int, event: str, detail: Optional[str] = None) -> None:
+        """Buffer one funnel event; never blocks and never touches the DB."""
+        if event not in FUNNEL_STAGES:
+            logger.warning(f"Unknown funnel event '{event}' ignored.")
+            return
+        self.buffer.append((user_id, event, detail, datetime.datetime.utcnow()))
+
+    async def flush(self) -> None:
+        """COPY buffered events into funnel_events in one batch."""
+        async with self._lock:
+            if not self.buffer:
+                return
+            batch, self.buffer = self.buffer, []
+            try:
+                async with self.bot.db.pool.acquire() as conn:
+                    await conn.copy_records_to_table("funnel_events", records=batch, columns=FUNNEL_COLUMNS)
+            except Exception as e:
+                logger.exception(f"Failed to write {len(batch)} funnel events: {e}")
+                self.buffer[:0] = batch
+                overflow = len(self.buffer) - FUNNEL_MAX_BUFFER
+                if overflow > 0:
+                    del self.buffer[:overflow]
+                    logger.warning(f"Funnel buffer full; dropped the {overflow} oldest events.")
+
+    async def refresh_rollups(self, since: Optional[datetime.date] = None) -> None:
+        """Recompute funnel_daily from `since` (default: yesterday) onwards."""
+        await self.flush()
+        if since is None:
+            since = datetime.datetime.utcnow().date() - datetime.timedelta(days=1)
+        await self.bot.db.execute(ROLLUP_FUNNEL_SQL, datetime.datetime.combine(since, datetime.time.min))
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(FUNNEL_FLUSH_INTERVAL)
+            await self.flush()
+
+    async def _rollup_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh_rollups()
+            except Exception as e:
+                logger.exception(f"Funnel rollup failed: {e}")
+            await asyncio.sleep(FUNNEL_ROLLUP_INTERVAL)
@@ -6,26 +6,42 @@ from loguru import logger
 import discord
 from discord.ext import commands
 from utils import load_json_config
+from config_store import ConfigStore
 from db import Database
+from ownership_graph import OwnershipGraph
+from dm_permissions import DMPermissions
+from panels import PanelRegistry
+from role_index import RoleIndex
+from onboarding import OnboardingQueue
+from funnel import FunnelRecorder
 
 
 class MoguMoguBot(commands.Bot):
     def __init__(
         self,
-        config: Dict[str, Any],
+        config_store: ConfigStore,
         strings: Dict[str, Any],
         theme: Dict[str, Any]
     ):
+        config = config_store.data
         intents = discord.Intents.all()
         super().__init__(
             command_prefix=config.get("prefix", "!"),
             description=strings.get("welcome_message", "Welcome!"),
             intents=intents
         )
-        self.config = config
+        self.config_store = config_store
+        self.config = config  # live view of config_store.data; updated in place on reload
+        config_store.add_listener(lambda keys: self.dispatch("config_changed", keys))
         self.strings = strings
         self.theme = theme
         self.db = Database(config)
+        self.ownership_graph = OwnershipGraph(self.db)
+        self.dm_permissions = DMPermissions(self.db)
+        self.panels = PanelRegistry(self)
+        self.role_index = RoleIndex(self)
+        self.onboarding = OnboardingQueue(self)
+        self.funnel = FunnelRecorder(self)
 
     async def on_ready(self):
         """Event called when the bot connects to Discord."""
@@ -39,12 +55,17 @@ class MoguMoguBot(commands.Bot):
 
     async def close(self) -> None:
         """Close the DB connection then close the bot."""
+        self.config_store.stop()
+        await self.onboarding.close()
+        await self.funnel.close()
         await self.db.close()
         await super().close()
 
 async def main():
     # Asynchronously load config files
-    config = await load_json_config("config.json")
+    config_store = ConfigStore("config.json")
+    await config_store.load()
+    config = config_store.data
     strings = await load_json_config("strings.json")
     theme = await load_json_config("theme.json")
 
@@ -52,10 +73,16 @@ async def main():
         logger.error("No 'token' found in config.json. Cannot start the bot.")
         return
 
-    bot = MoguMoguBot(config, strings, theme)
+    bot = MoguMoguBot(config_store, strings, theme)
 
     # DB connects...
     await bot.db.connect()
+    await bot.ownership_graph.load()
+    await bot.dm_permissions.load()
+    await bot.panels.load()
+    config_store.watch()
+    bot.onboarding.start()
+    bot.funnel.start()
 
     # Then load all cogs in the cogs directory
     for ext in Path("cogs").glob("*.py"):
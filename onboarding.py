@@ -0,0 +1,177 @@
+# ./onboarding.py
+import asyncio
+import time
+from collections import deque
+from loguru import logger
+from typing import Deque, Iterable, List, Set, Tuple
+
+import discord
+
+UNVERIFIED_ROLE = "Unverified"
+ROLE_ASSIGN_DELAY = 0.5  # Seconds between role assignments (on top of the library's 429 handling)
+WALLET_FLUSH_INTERVAL = 2.0  # Seconds between batched wallet inserts
+JOIN_RATE_WINDOW = 60.0  # Seconds of join history used for the join rate
+
+
+class OnboardingQueue:
+    """
+    Work done for every member join, decoupled from the gateway event.
+
+    `on_member_join` only records the join and enqueues work:
+      - the Unverified role is applied by a single worker, one member at a time with a
+        small delay, so a join wave can't burst the REST API;
+      - wallet rows are collected and inserted in one statement every couple of seconds.
+
+    Raid mode pauses the non-essential part (wallet creation; wallets are also created
+    lazily on first use) while the Unverified role keeps being applied. It is switched
+    on automatically when joins in the last minute exceed `raid_join_threshold`, and
+    only switched off by staff.
+
+    Attributes:
+        bot (MoguMoguBot): The bot.
+        role_queue (asyncio.Queue): (guild_id, member_id) awaiting the Unverified role
+        pending_wallets (set): user IDs awaiting a wallet row
+        raid_mode (bool): whether non-essential onboarding is paused
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.role_queue: "asyncio.Queue[Tuple[int, int]]" = asyncio.Queue()
+        self.pending_wallets: Set[int] = set()
+        self.join_times: Deque[float] = deque()
+        self.raid_mode = False
+        self.raid_threshold = bot.config.get("raid_join_threshold", 30)
+        self.total_joins = 0
+        self.roles_applied = 0
+        self.wallets_created = 0
+        self._tasks: List[asyncio.Task] = []
+        bot.add_listener(self.on_member_join, "on_member_join")
+
+    def start(self) -> None:
+        """Start the role worker and the wallet flusher (needs a running loop)."""
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._role_worker()),
+                asyncio.create_task(self._wallet_flusher()),
+            ]
+
+    async def close(self) -> None:
+        """Stop the workers and write any wallets still pending."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self.pending_wallets:
+            try:
+                await self.flush_wallets()
+            except Exception as e:
+                logger.exception(f"Could not write {len(self.pending_wallets)} pending wallets on shutdown: {e}")
+
+    # ------------------------------------------------------------------
+    # Intake
+    # ------------------------------------------------------------------
+    async def on_member_join(self, member: discord.Member) -> None:
+        if member.bot:
+            return
+        self.total_joins += 1
+        self._record_join()
+        self.role_queue.put_nowait((member.guild.id, member.id))
+        self.bot.funnel.record(member.id, "join")
+        self.pending_wallets.add(member.id)
+
+    def _record_join(self) -> None:
+        now = time.monotonic()
+        self.join_times.append(now)
+        while self.join_times and now - self.join_times[0] > JOIN_RATE_WINDOW:
+            self.join_times.popleft()
+        if not self.raid_mode and self.raid_threshold and len(self.join_times) > self.raid_threshold:
+            self.set_raid_mode(True, reason=f"{len(self.join_times)} joins in the last minute")
+
+    def set_raid_mode(self, enabled: bool, reason: str = "") -> None:
+        if self.raid_mode == enabled:
+            return
+        self.raid_mode = enabled
+        logger.warning(f"Raid mode {'enabled' if enabled else 'disabled'}{f': {reason}' if reason else ''}.")
+        self.bot.dispatch("raid_mode_changed", enabled, reason)
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+    @property
+    def join_rate(self) -> int:
+        """Joins during the last JOIN_RATE_WINDOW seconds."""
+        cutoff = time.monotonic() - JOIN_RATE_WINDOW
+        while self.join_times and self.join_times[0] < cutoff:
+            self.join_times.popleft()
+        return len(self.join_times)
+
+    @property
+    def queue_depth(self) -> int:
+        return self.role_queue.qsize()
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    async def _role_worker(self) -> None:
+        while True:
+            guild_id, member_id = await self.role_queue.get()
+            try:
+                await self._apply_unverified(guild_id, member_id)
+            except discord.HTTPException as e:
+                logger.warning(f"Failed to add {UNVERIFIED_ROLE} to {member_id}: {e}")
+            except Exception as e:
+                logger.exception(f"Onboarding role worker error for {member_id}: {e}")
+            finally:
+                self.role_queue.task_done()
+
+    async def _apply_unverified(self, guild_id: int, member_id: int) -> None:
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(member_id) if guild else None
+        if member is None:
+            return  # left before we got to them
+        role = self.bot.role_index.get(guild, UNVERIFIED_ROLE)
+        if role is None or member.get_role(role.id):
+            return
+        await member.add_roles(role, reason="Onboarding")
+        self.roles_applied += 1
+        await asyncio.sleep(ROLE_ASSIGN_DELAY)
+
+    async def _wallet_flusher(self) -> None:
+        while True:
+            await asyncio.sleep(WALLET_FLUSH_INTERVAL)
+            if self.raid_mode or not self.pending_wallets:
+                continue
+            try:
+                await self.flush_wallets()
+            except Exception as e:
+                logger.exception(f"Wallet batch insert failed: {e}")
+
+    async def flush_wallets(self) -> int:
+        user_ids, self.pending_wallets = self.pending_wallets, set()
+        try:
+            created = await self.create_wallets(user_ids)
+        except Exception:
+            self.pending_wallets |= user_ids
+            raise
+        if created:
+            logger.info(f"[Onboarding] Created {created} wallets for new members.")
+        return created
+
+    async def create_wallets(self, user_ids: Iterable[int]) -> int:
+        """Insert a zero-balance wallet for every ID that doesn't have one, in one statement."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+        created = await self.bot.db.fetchval(
+            """
+            WITH inserted AS (
+                INSERT INTO wallets (user_id, balance)
+                SELECT unnest($1::bigint[]), 0
+                ON CONFLICT (user_id) DO NOTHING
+                RETURNING 1
+            )
+            SELECT COUNT(*) FROM inserted;
+            """,
+            user_ids
+        )
+        self.wallets_created += created
+        return created
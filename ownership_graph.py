@@ -0,0 +1,181 @@
+# ./ownership_graph.py
+import datetime
+from collections import deque
+from loguru import logger
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+class OwnershipShare(NamedTuple):
+    """A single owner's stake in a sub."""
+    percentage: int
+    acquired_at: Optional[datetime.datetime]
+
+
+class OwnershipGraph:
+    """
+    In-memory index of the `sub_ownership` table.
+
+    The graph is loaded once at startup and then kept in sync by the code paths that
+    write `sub_ownership` (claim finalization and transfers). Writers re-read the
+    affected sub's rows inside their own transaction and hand them to `replace_sub()`
+    once the transaction has committed, so the index never reflects a rolled-back write.
+
+    Code that derives data from ownership (e.g. cached info embeds) can register a
+    listener with `add_listener()`; it is called with the sub_id after every
+    `replace_sub()`, and with None after a full `load()`.
+
+    Attributes:
+        db (Database): The bot's database manager.
+        subs (dict): sub_id -> {owner_id: OwnershipShare}
+        owned (dict): owner_id -> set of sub_ids
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.subs: Dict[int, Dict[int, OwnershipShare]] = {}
+        self.owned: Dict[int, Set[int]] = {}
+        self.loaded = False
+        self._listeners: List[Callable[[Optional[int]], None]] = []
+
+    def add_listener(self, callback: Callable[[Optional[int]], None]) -> None:
+        """Register a synchronous callback invoked with the sub_id that changed (None = all)."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Optional[int]], None]) -> None:
+        """Unregister a callback previously passed to `add_listener()`."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, sub_id: Optional[int]) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback(sub_id)
+            except Exception as e:
+                logger.exception(f"Ownership graph listener failed for sub {sub_id}: {e}")
+
+    async def load(self) -> None:
+        """
+        Load every `sub_ownership` row into memory, replacing any existing state.
+        """
+        rows = await self.db.fetch(
+            "SELECT sub_id, user_id, percentage, acquired_at FROM sub_ownership;"
+        )
+        self.subs.clear()
+        self.owned.clear()
+        for r in rows:
+            self._add(r["sub_id"], r["user_id"], r["percentage"], r["acquired_at"])
+        self.loaded = True
+        self._notify(None)
+        logger.info(f"Ownership graph loaded: {len(self.subs)} subs, {len(self.owned)} owners.")
+
+    @staticmethod
+    async def fetch_sub(conn, sub_id: int) -> List[Any]:
+        """
+        Read the current ownership rows for a sub on the given connection.
+        Call this inside the writer's transaction and pass the result to `replace_sub()`.
+        """
+        return await conn.fetch(
+            "SELECT user_id, percentage, acquired_at FROM sub_ownership WHERE sub_id=$1;",
+            sub_id
+        )
+
+    def replace_sub(self, sub_id: int, rows: Iterable[Any]) -> None:
+        """
+        Replace everything known about a sub with the given rows
+        (records or dicts with user_id, percentage and acquired_at).
+        """
+        for owner_id in self.subs.pop(sub_id, {}):
+            owner_subs = self.owned.get(owner_id)
+            if owner_subs is not None:
+                owner_subs.discard(sub_id)
+                if not owner_subs:
+                    del self.owned[owner_id]
+        for r in rows:
+            self._add(sub_id, r["user_id"], r["percentage"], r["acquired_at"])
+        self._notify(sub_id)
+
+    def _add(self, sub_id: int, owner_id: int, percentage: Optional[int], acquired_at) -> None:
+        self.subs.setdefault(sub_id, {})[owner_id] = OwnershipShare(percentage or 0, acquired_at)
+        self.owned.setdefault(owner_id, set()).add(sub_id)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def owners_of(self, sub_id: int) -> Dict[int, OwnershipShare]:
+        """Return owner_id -> OwnershipShare for a sub (empty if unowned)."""
+        return dict(self.subs.get(sub_id, {}))
+
+    def owner_ids(self, sub_id: int) -> List[int]:
+        """Return the owner IDs of a sub, largest share first."""
+        return [owner_id for owner_id, _ in self.ranked_owners(sub_id)]
+
+    def ranked_owners(self, sub_id: int) -> List[Tuple[int, OwnershipShare]]:
+        """
+        Return (owner_id, share) pairs ordered by percentage DESC, acquired_at ASC,
+        matching the ordering the SQL queries used.
+        """
+        far_future = datetime.datetime.max
+        return sorted(
+            self.subs.get(sub_id, {}).items(),
+            key=lambda item: (-item[1].percentage, item[1].acquired_at or far_future)
+        )
+
+    def subs_of(self, owner_id: int) -> Set[int]:
+        """Return the sub IDs an owner holds a direct stake in."""
+        return set(self.owned.get(owner_id, ()))
+
+    def percentage(self, sub_id: int, owner_id: int) -> int:
+        """Return the owner's percentage of the sub (0 if none)."""
+        share = self.subs.get(sub_id, {}).get(owner_id)
+        return share.percentage if share else 0
+
+    def is_owner(self, user_id: int, sub_id: int) -> bool:
+        """Check if a user holds any stake in a sub."""
+        return user_id in self.subs.get(sub_id, {})
+
+    def majority_owner(self, sub_id: int) -> Tuple[Optional[int], int]:
+        """
+        Return (owner_id, percentage) for the sub's majority owner (>= 50%), or (None, 0).
+        Ties (e.g. 50/50) go to the earlier acquisition.
+        """
+        ranked = self.ranked_owners(sub_id)
+        if not ranked or ranked[0][1].percentage < 50:
+            return (None, 0)
+        owner_id, share = ranked[0]
+        return (owner_id, share.percentage)
+
+    def has_majority_owner(self, sub_id: int) -> bool:
+        """Check if any owner holds at least 50% of the sub."""
+        return any(s.percentage >= 50 for s in self.subs.get(sub_id, {}).values())
+
+    def subs_owned_transitively(self, owner_id: int) -> Set[int]:
+        """
+        Return every sub owned by `owner_id` directly or indirectly, i.e. subs owned by
+        subs they own, and so on. Breadth-first over the in-memory graph; cycles are safe.
+        """
+        seen: Set[int] = set()
+        queue = deque(self.owned.get(owner_id, ()))
+        while queue:
+            sub_id = queue.popleft()
+            if sub_id in seen:
+                continue
+            seen.add(sub_id)
+            queue.extend(self.owned.get(sub_id, ()))
+        seen.discard(owner_id)
+        return seen
+
+    def owners_transitively(self, sub_id: int) -> Set[int]:
+        """
+        Return every user who owns `sub_id` directly or through a chain of ownership.
+        """
+        seen: Set[int] = set()
+        queue = deque(self.subs.get(sub_id, {}))
+        while queue:
+            owner_id = queue.popleft()
+            if owner_id in seen:
+                continue
+            seen.add(owner_id)
+            queue.extend(self.subs.get(owner_id, {}))
+        seen.discard(sub_id)
+        return seen
@@ -6,6 +6,69 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+USER_BROWSER_QUERY = """
+SELECT 
+    w.balance AS wallet_balance,
+    u.age_range,
+    u.gender_role,
+    u.relationship,
+    u.location,
+    u.orientation,
+    u.dm_status,
+    array_to_string(u.here_for, ', ') AS here_for,
+    array_to_string(u.kinks, ', ') AS kinks
+FROM wallets w
+LEFT JOIN user_roles u ON w.user_id = u.user_id
+WHERE w.user_id = $1;
+"""
+
+
+async def build_user_browser_embed(
+    bot: commands.Bot,
+    guild: discord.Guild,
+    viewer_id: int,
+    target_user: discord.abc.User
+) -> Optional[discord.Embed]:
+    """
+    Build the "User Browser" embed (details, DM status, owners, wallet) for `target_user`
+    as seen by `viewer_id`. Returns None if the target has no wallet row.
+    """
+    record = await bot.db.fetchrow(USER_BROWSER_QUERY, target_user.id)
+    if not record:
+        return None
+
+    owner_names = []
+    for owner_id in bot.ownership_graph.owner_ids(target_user.id):
+        owner_member = guild.get_member(owner_id)
+        owner_names.append(owner_member.display_name if owner_member else str(owner_id))
+    owners_str = ", ".join(owner_names) if owner_names else "None"
+
+    wallet_balance = record["wallet_balance"] or 0
+    dm_status = record["dm_status"] or "Unknown"
+    has_dm_permission = "Yes" if bot.dm_permissions.is_open(viewer_id, target_user.id) else "No"
+
+    details_value = (
+        f"**Age:** *{record['age_range'] or 'Unknown'}*\n"
+        f"**Gender:** *{record['gender_role'] or 'Unknown'}*\n"
+        f"**Relationship:** *{record['relationship'] or 'Unknown'}*\n"
+        f"**Location:** *{record['location'] or 'Unknown'}*\n"
+        f"**Orientation:** *{record['orientation'] or 'Unknown'}*\n"
+        f"**Here For:** *{record['here_for'] or 'Unknown'}*\n"
+        f"**Kinks:** *{record['kinks'] or 'Unknown'}*\n"
+    )
+
+    embed = discord.Embed(
+        title=f"User Browser: {target_user.display_name}",
+        color=discord.Color.gold()
+    )
+    embed.add_field(name="Details", value=details_value, inline=False)
+    embed.add_field(name="DMs", value=f"```{dm_status}```", inline=True)
+    embed.add_field(name="DMs with you?", value=f"```{has_dm_permission}```", inline=True)
+    embed.add_field(name="Owner(s)", value=f"```{owners_str}```", inline=False)
+    embed.add_field(name="Wallet Balance", value=f"```${wallet_balance}```", inline=True)
+    embed.set_thumbnail(url=target_user.display_avatar)
+    return embed
+
 # ------------------------------------------------------
 # Legacy Staff & Sub Views
 # ------------------------------------------------------
@@ -157,18 +220,7 @@ class SingleUserOwnershipView(discord.ui.View):
     async def refresh_button_label(self):
             """Check DB and update the button label, then re‐edit the original DM."""
             # 1) Figure out if your DM is open or not
-            row = await self.bot.db.fetchrow(
-                """
-                SELECT active FROM open_dm_perms
-                 WHERE (user1_id=$1 AND user2_id=$2) OR (user1_id=$2 AND user2_id=$1);
-                """,
-                # If you need the "viewer" or "invoker" ID, you might store that in the DB table
-                # or pass it in. If you only track the target_user in your constructor,
-                # you may need more logic here. For simplicity, assume you know the "viewer" or use
-                # message.author_id if you're only dealing with your own DM.
-                self.target_user.id, self.viewer_user.id 
-            )
-            dm_is_open = bool(row and row["active"])
+            dm_is_open = self.bot.dm_permissions.is_open(self.target_user.id, self.viewer_user.id)
 
             # 2) Update the button label
             request_dm_button = self.get_item("singleuser_request_DMs")
@@ -190,16 +242,8 @@ class SingleUserOwnershipView(discord.ui.View):
         and ownership status.
         """
         # Check whether open DM permissions exist.
-        dm_row = await self.bot.db.fetchrow(
-            """
-            SELECT active
-            FROM open_dm_perms
-            WHERE (user1_id = $1 AND user2_id = $2) OR (user1_id = $2 AND user2_id = $1);
-            """,
-            interaction.user.id, self.target_user.id
-        )
         logger.debug(f"{interaction}")
-        self.dms_active = bool(dm_row and dm_row["active"])
+        self.dms_active = self.bot.dm_permissions.is_open(interaction.user.id, self.target_user.id)
 
         # Update the "Request DMs" button label accordingly.
         request_dm_button = self.get_item("singleuser_request_DMs")
@@ -215,10 +259,7 @@ class SingleUserOwnershipView(discord.ui.View):
             "SELECT gender_role FROM user_roles WHERE user_id = $1;", self.target_user.id
         )
         # Check if the invoker already has ownership of the target.
-        ownership_row = await self.bot.db.fetchrow(
-            "SELECT 1 FROM sub_ownership WHERE sub_id = $1 AND user_id = $2;",
-            self.target_user.id, interaction.user.id
-        )
+        ownership_row = self.bot.ownership_graph.is_owner(interaction.user.id, self.target_user.id)
 
         # Update the "Propose Claim" button: it is enabled only if conditions are met.
         propose_claim_button = self.get_item("singleuser_propose_claim")
@@ -276,16 +317,7 @@ class SingleUserOwnershipView(discord.ui.View):
             return
 
         # Verify that open DM permissions exist between the invoker and the target.
-        row = await self.bot.db.fetchrow(
-            """
-            SELECT 1
-            FROM open_dm_perms
-            WHERE ((user1_id = $1 AND user2_id = $2) OR (user1_id = $2 AND user2_id = $1))
-              AND active = TRUE;
-            """,
-            interaction.user.id, self.target_user.id
-        )
-        if not row:
+        if not self.bot.dm_permissions.is_open(interaction.user.id, self.target_user.id):
             return await interaction.response.send_message(
                 f"DMs are not open between you and {self.target_user.display_name}. You must request DMs first.",
                 ephemeral=True
@@ -582,16 +614,7 @@ class OwnershipBrowserView(discord.ui.View):
         if not self.target_user:
             return await interaction.response.send_message("Select a user first!", ephemeral=True)
 
-        row = await self.bot.db.fetchrow(
-            """
-            SELECT 1
-            FROM open_dm_perms
-            WHERE ((user1_id = $1 AND user2_id = $2) OR (user1_id = $2 AND user2_id = $1))
-              AND active = TRUE;
-            """,
-            interaction.user.id, self.target_user.id
-        )
-        if not row:
+        if not self.bot.dm_permissions.is_open(interaction.user.id, self.target_user.id):
             return await interaction.response.send_message(
                 f"DMs are not open between you and {self.target_user.display_name}. You must request DMs first.",
                 ephemeral=True
@@ -658,70 +681,10 @@ class OwnershipBrowserView(discord.ui.View):
         target_member = interaction.guild.get_member(user_id)
         self.target_user = target_member
 
-        embed = discord.Embed(
-            title=f"User Browser: {target_member.display_name}",
-            color=discord.Color.gold()
-        )
-
-        query = """
-        SELECT 
-            w.balance AS wallet_balance,
-            u.age_range,
-            u.gender_role,
-            u.relationship,
-            u.location,
-            u.orientation,
-            u.dm_status,
-            array_to_string(u.here_for, ', ') AS here_for,
-            array_to_string(u.kinks, ', ') AS kinks,
-            CASE 
-                WHEN dm_perms.user2_id IS NOT NULL THEN 'Yes'
-                ELSE 'No'
-            END AS has_dm_permission,
-            array_agg(o.user_id) AS owners
-        FROM wallets w
-        LEFT JOIN user_roles u ON w.user_id = u.user_id
-        LEFT JOIN open_dm_perms dm_perms 
-            ON (dm_perms.user1_id = $1 AND dm_perms.user2_id = $2)
-            OR (dm_perms.user1_id = $2 AND dm_perms.user2_id = $1)
-        LEFT JOIN sub_ownership o ON o.sub_id = w.user_id
-        WHERE w.user_id = $2
-        GROUP BY w.user_id, u.user_id, dm_perms.user2_id;
-        """
-        record = await self.bot.db.fetchrow(query, interaction.user.id, user_id)
-        if not record:
+        embed = await build_user_browser_embed(self.bot, interaction.guild, interaction.user.id, target_member)
+        if embed is None:
             return
-
-        owners_list = record["owners"] or []
-        owner_names = []
-        for owner_id in owners_list:
-            owner_member = interaction.guild.get_member(owner_id)
-            if owner_member:
-                owner_names.append(owner_member.display_name)
-            else:
-                owner_names.append(str(owner_id))
-        owners_str = ", ".join(owner_names) if owner_names else "None"
-
-        wallet_balance = record["wallet_balance"] or 0
-        dm_status = record["dm_status"] or "Unknown"
-        has_dm_permission = record["has_dm_permission"] or "No"
-
-        details_value = (
-            f"**Age:** *{record['age_range'] or 'Unknown'}*\n"
-            f"**Gender:** *{record['gender_role'] or 'Unknown'}*\n"
-            f"**Relationship:** *{record['relationship'] or 'Unknown'}*\n"
-            f"**Location:** *{record['location'] or 'Unknown'}*\n"
-            f"**Orientation:** *{record['orientation'] or 'Unknown'}*\n"
-            f"**Here For:** *{record['here_for'] or 'Unknown'}*\n"
-            f"**Kinks:** *{record['kinks'] or 'Unknown'}*\n"
-        )
-
-        embed.add_field(name="Details", value=details_value, inline=False)
-        embed.add_field(name="DMs", value=f"```{dm_status}```", inline=True)
-        embed.add_field(name="DMs with you?", value=f"```{has_dm_permission}```", inline=True)
-        embed.add_field(name="Owner(s)", value=f"```{owners_str}```", inline=False)
-        embed.add_field(name="Wallet Balance", value=f"```${wallet_balance}```", inline=True)
-        embed.set_thumbnail(url=target_member.display_avatar)
+        has_dm_permission = "Yes" if self.bot.dm_permissions.is_open(interaction.user.id, user_id) else "No"
 
         # Update the Request DMs button label based on current DM permissions.
         request_dm_button = self.get_item("browseview_request_dm_btn")
@@ -0,0 +1,127 @@
+# ./panels.py
+import hashlib
+import json
+from loguru import logger
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import discord
+
+PANEL_KEY_PREFIX = "panel:"
+
+
+class PanelHandle(NamedTuple):
+    """Where a pinned bot panel lives and what it last rendered."""
+    channel_id: int
+    message_id: int
+    content_hash: Optional[str]
+
+
+def panel_hash(content: Optional[str] = None,
+               embed: Optional[discord.Embed] = None,
+               view: Optional[discord.ui.View] = None) -> str:
+    """Stable hash of everything a panel message renders."""
+    payload = {
+        "content": content,
+        "embed": embed.to_dict() if embed else None,
+        "components": view.to_components() if view else None,
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PanelRegistry:
+    """
+    Registry of long-lived bot messages ("panels") such as the support splash,
+    the pinned rules and the role selection message.
+
+    Each panel is stored in `server_config` under `panel:<name>` as
+    {"channel_id", "message_id", "content_hash"}. `publish()` edits the stored message
+    only when the rendered content hash changed, sends a new message if the old one
+    is gone, and never reads channel history.
+
+    Attributes:
+        bot (MoguMoguBot): The bot, used to re-attach persistent views.
+        db (Database): The bot's database manager.
+        panels (dict): panel name -> PanelHandle
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.db = bot.db
+        self.panels: Dict[str, PanelHandle] = {}
+
+    async def load(self) -> None:
+        """Load every registered panel in one query."""
+        rows = await self.db.fetch(
+            "SELECT key, value::text AS value FROM server_config WHERE key LIKE $1;",
+            f"{PANEL_KEY_PREFIX}%"
+        )
+        self.panels.clear()
+        for r in rows:
+            data = json.loads(r["value"])
+            self.panels[r["key"][len(PANEL_KEY_PREFIX):]] = PanelHandle(
+                data["channel_id"], data["message_id"], data.get("content_hash")
+            )
+        logger.info(f"Loaded {len(self.panels)} panel handles.")
+
+    def get(self, name: str) -> Optional[PanelHandle]:
+        return self.panels.get(name)
+
+    async def _save(self, name: str, handle: PanelHandle) -> None:
+        await self.db.execute(
+            "INSERT INTO server_config (key, value) VALUES ($1, $2::jsonb) "
+            "ON CONFLICT (key) DO UPDATE SET value=EXCLUDED.value;",
+            f"{PANEL_KEY_PREFIX}{name}",
+            json.dumps(handle._asdict())
+        )
+        self.panels[name] = handle
+
+    async def forget(self, name: str) -> None:
+        """Drop a panel from the registry (the message itself is left alone)."""
+        await self.db.execute("DELETE FROM server_config WHERE key=$1;", f"{PANEL_KEY_PREFIX}{name}")
+        self.panels.pop(name, None)
+
+    async def publish(
+        self,
+        name: str,
+        channel: discord.abc.Messageable,
+        content: Optional[str] = None,
+        embed: Optional[discord.Embed] = None,
+        view: Optional[discord.ui.View] = None,
+        legacy: Optional[Tuple[int, int]] = None,
+        force_new: bool = False
+    ) -> discord.PartialMessage:
+        """
+        Make sure panel `name` shows the given content in `channel`.
+
+        - Same channel and same content hash: no API call; the view is re-attached.
+        - Same channel, changed content: one edit.
+        - Unknown panel, other channel, deleted message or `force_new`: one send.
+
+        `legacy` is an optional (channel_id, message_id) pair from the old config.json
+        keys, adopted the first time a panel is published.
+        """
+        new_hash = panel_hash(content, embed, view)
+        handle = self.panels.get(name)
+        if handle is None and legacy and all(legacy):
+            handle = PanelHandle(legacy[0], legacy[1], None)
+
+        if handle is not None and handle.channel_id == channel.id and not force_new:
+            msg = channel.get_partial_message(handle.message_id)
+            if handle.content_hash == new_hash:
+                if view is not None and view.is_persistent():
+                    self.bot.add_view(view, message_id=handle.message_id)
+                logger.debug(f"Panel '{name}' unchanged; re-attached to {handle.message_id}.")
+                return msg
+            try:
+                await msg.edit(content=content, embed=embed, view=view)
+                await self._save(name, PanelHandle(channel.id, handle.message_id, new_hash))
+                logger.debug(f"Panel '{name}' content changed; edited {handle.message_id}.")
+                return msg
+            except discord.NotFound:
+                logger.info(f"Panel '{name}' message {handle.message_id} is gone; sending a new one.")
+
+        sent = await channel.send(content=content, embed=embed, view=view)
+        await self._save(name, PanelHandle(channel.id, sent.id, new_hash))
+        logger.info(f"Panel '{name}' posted as message {sent.id} in channel {channel.id}.")
+        return channel.get_partial_message(sent.id)
@@ -0,0 +1,121 @@
+# ./role_index.py
+from loguru import logger
+from typing import Dict, FrozenSet, Iterable, Optional, Union
+
+import discord
+
+DEFAULT_STAFF_ROLES = ["Owner", "Underboss", "The Company", "Consigliere"]
+
+
+class GuildRoles:
+    """Lookup tables for one guild's roles."""
+
+    __slots__ = ("by_id", "by_name", "staff_ids", "staff_mentions")
+
+    def __init__(self, guild: discord.Guild, staff_roles: Iterable[Union[int, str]]):
+        self.by_id: Dict[int, discord.Role] = {}
+        self.by_name: Dict[str, discord.Role] = {}
+        # guild.roles is ordered by position; the first match wins, like discord.utils.get
+        for role in guild.roles:
+            self.by_id[role.id] = role
+            self.by_name.setdefault(role.name, role)
+
+        staff = []
+        for name_or_id in staff_roles:
+            role = self.by_id.get(name_or_id) if isinstance(name_or_id, int) else self.by_name.get(name_or_id)
+            if role is not None and role not in staff:
+                staff.append(role)
+        self.staff_ids: FrozenSet[int] = frozenset(role.id for role in staff)
+        self.staff_mentions: str = " ".join(role.mention for role in staff)
+
+
+class RoleIndex:
+    """
+    Per-guild index of roles by name and ID, plus the configured staff roles.
+
+    Guilds are indexed on ready / join / availability and re-indexed whenever a role
+    is created, updated or deleted, so lookups never scan `guild.roles`. A guild
+    that hasn't been indexed yet is indexed on first use.
+
+    Attributes:
+        bot (MoguMoguBot): The bot; its config provides `staff_roles` (names or IDs).
+        guilds (dict): guild_id -> GuildRoles
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.staff_roles = bot.config.get("staff_roles", DEFAULT_STAFF_ROLES)
+        self.guilds: Dict[int, GuildRoles] = {}
+        bot.add_listener(self.on_ready, "on_ready")
+        bot.add_listener(self.index_guild, "on_guild_join")
+        bot.add_listener(self.index_guild, "on_guild_available")
+        bot.add_listener(self.on_guild_remove, "on_guild_remove")
+        bot.add_listener(self.on_guild_role_change, "on_guild_role_create")
+        bot.add_listener(self.on_guild_role_change, "on_guild_role_delete")
+        bot.add_listener(self.on_guild_role_update, "on_guild_role_update")
+        bot.add_listener(self.on_config_changed, "on_config_changed")
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    async def on_ready(self) -> None:
+        for guild in self.bot.guilds:
+            self._index(guild)
+        logger.info(f"Role index built for {len(self.guilds)} guild(s).")
+
+    async def index_guild(self, guild: discord.Guild) -> None:
+        self._index(guild)
+
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        self.guilds.pop(guild.id, None)
+
+    async def on_guild_role_change(self, role: discord.Role) -> None:
+        self._index(role.guild)
+
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role) -> None:
+        # Position/permission changes don't affect lookups; the Role object is updated in place.
+        if before.name != after.name:
+            self._index(after.guild)
+
+    async def on_config_changed(self, keys) -> None:
+        if "staff_roles" in keys:
+            self.staff_roles = self.bot.config.get("staff_roles", DEFAULT_STAFF_ROLES)
+            for guild in self.bot.guilds:
+                self._index(guild)
+
+    def _index(self, guild: discord.Guild) -> GuildRoles:
+        entry = GuildRoles(guild, self.staff_roles)
+        self.guilds[guild.id] = entry
+        return entry
+
+    def _entry(self, guild: discord.Guild) -> GuildRoles:
+        entry = self.guilds.get(guild.id)
+        return entry if entry is not None else self._index(guild)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def get(self, guild: discord.Guild, name: str) -> Optional[discord.Role]:
+        """Return the guild's role with this name (None if there is none)."""
+        return self._entry(guild).by_name.get(name)
+
+    def get_by_id(self, guild: discord.Guild, role_id: int) -> Optional[discord.Role]:
+        return self._entry(guild).by_id.get(role_id)
+
+    def staff_role_ids(self, guild: discord.Guild) -> FrozenSet[int]:
+        """IDs of the configured staff roles that exist in the guild."""
+        return self._entry(guild).staff_ids
+
+    def staff_mentions(self, guild: discord.Guild) -> str:
+        """Mention string for every configured staff role present in the guild."""
+        return self._entry(guild).staff_mentions
+
+    def is_staff(self, member: discord.Member) -> bool:
+        """Check if the member has any of the configured staff roles."""
+        staff_ids = self._entry(member.guild).staff_ids
+        return any(role.id in staff_ids for role in member.roles)
+
+    def has_role(self, member: discord.Member, name: str) -> bool:
+        """Check if the member has the guild's role with this name."""
+        role = self.get(member.guild, name)
+        return role is not None and member.get_role(role.id) is not None
@@ -4,6 +4,8 @@ import csv
 import aiohttp
 import asyncio
 import aiofiles
+import os
+import tempfile
 
 from discord.ext import commands
 from discord import Guild
@@ -37,14 +39,34 @@ async def write_json_config(file: str, config: Dict[str, Any]) -> None:
     """
     Asynchronously write a dictionary to a JSON file.
 
+    The data is written to a temp file in the same directory, fsynced and renamed over
+    `file` in a worker thread, so readers never see a half-written file.
+
     Parameters:
         file (str): The path to the JSON file.
         config (dict): The configuration data to write.
     """
+    def write_atomic_sync(filepath: str, text: str):
+        directory = os.path.dirname(os.path.abspath(filepath))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+                fp.write(text)
+                fp.flush()
+                os.fsync(fp.fileno())
+            # mkstemp creates the file as 0600; keep the permissions of the file being replaced.
+            try:
+                os.chmod(tmp_path, os.stat(filepath).st_mode & 0o777)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
     try:
-        async with aiofiles.open(file, 'w', encoding='utf-8') as f:
-            # Use json.dumps with indent for readability
-            await f.write(json.dumps(config, indent=4))
+        # Use json.dumps with indent for readability
+        await asyncio.to_thread(write_atomic_sync, file, json.dumps(config, indent=4))
         logger.info(f"Configuration successfully written to {file}.")
     except Exception as e:
         logger.exception(f"Failed to write JSON config to {file}: {e}")